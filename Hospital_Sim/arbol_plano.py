@@ -0,0 +1,145 @@
+from array import array
+from paciente import COLUMNAS_SINTOMAS
+
+# Marca de hoja en los arreglos de hijos (igual que sklearn.tree._tree.TREE_LEAF)
+HOJA = -1
+# Clave del .npz con el sha256 del .pkl del que se exportó el árbol
+CLAVE_HUELLA = 'sha256_pickle'
+
+
+def exportar_arbol(clasificador, codificador):
+    """
+    Convierte un DecisionTreeClassifier ajustado en arreglos planos.
+
+    Las columnas se reindexan al orden de COLUMNAS_SINTOMAS usando feature_names_in_,
+    y la clase de cada nodo ya es el índice de su etiqueta final (predict + inverse_transform).
+
+    Args:
+        clasificador: DecisionTreeClassifier ajustado
+        codificador: LabelEncoder con el que se codificaron las clases
+    Returns:
+        Diccionario de arreglos NumPy: columna, umbral, izquierdo, derecho, clase, etiquetas
+    """
+    import numpy as np
+    arbol = clasificador.tree_
+    nombres = getattr(clasificador, "feature_names_in_", None)
+    if clasificador.n_features_in_ != len(COLUMNAS_SINTOMAS):
+        raise ValueError(f"El modelo espera {clasificador.n_features_in_} columnas, "
+                         f"se esperaban {len(COLUMNAS_SINTOMAS)}")
+    if nombres is None:
+        nombres = COLUMNAS_SINTOMAS
+    if sorted(nombres) != sorted(COLUMNAS_SINTOMAS):
+        raise ValueError(f"Columnas del modelo desconocidas: {list(nombres)}")
+    columna_del_modelo = np.array([COLUMNAS_SINTOMAS.index(nombre) for nombre in nombres])
+
+    hojas = arbol.children_left == HOJA
+    columna = np.where(hojas, HOJA, columna_del_modelo[np.maximum(arbol.feature, 0)])
+    # Mismo desempate que predict: argmax de la distribución del nodo (primer máximo).
+    # classes_ son los códigos del LabelEncoder, es decir, índices en codificador.classes_
+    clase = clasificador.classes_.take(np.argmax(arbol.value[:, 0, :], axis=1))
+    return {
+        'columna': columna.astype(np.int32),
+        'umbral': arbol.threshold.astype(np.float64),
+        'izquierdo': arbol.children_left.astype(np.int32),
+        'derecho': arbol.children_right.astype(np.int32),
+        'clase': clase.astype(np.int32),
+        'etiquetas': np.asarray(codificador.classes_, dtype=str),
+    }
+
+
+def guardar_arbol(ruta, arreglos, huella=None):
+    """
+    Guarda los arreglos de exportar_arbol en un .npz (sin pickle).
+
+    Args:
+        ruta: Archivo .npz de salida
+        arreglos: Diccionario devuelto por exportar_arbol
+        huella: sha256 del .pkl del que se exportó; modelos.cargar_arbol lo compara con el
+            .pkl actual para descartar un .npz desactualizado
+    """
+    import numpy as np
+    if huella is not None:
+        arreglos = {**arreglos, CLAVE_HUELLA: np.array(huella)}
+    np.savez(ruta, **arreglos)
+
+
+def leer_huella(ruta):
+    """sha256 del .pkl de origen guardado en el .npz (None si se guardó sin huella)."""
+    import numpy as np
+    with np.load(ruta, allow_pickle=False) as datos:
+        return str(datos[CLAVE_HUELLA]) if CLAVE_HUELLA in datos.files else None
+
+
+class ArbolPlano:
+    """
+    Evaluador de un árbol de decisión exportado con exportar_arbol.
+
+    Reproduce predict de sklearn: la entrada se redondea a float32 y se compara
+    `x <= umbral` contra el umbral float64, igual que sklearn.tree. No requiere
+    sklearn ni joblib; una fila se evalúa en Python puro y un lote con NumPy.
+    """
+
+    def __init__(self, columna, umbral, izquierdo, derecho, clase, etiquetas):
+        self.columna = columna
+        self.umbral = umbral
+        self.izquierdo = izquierdo
+        self.derecho = derecho
+        self.clase = clase
+        self.etiquetas = etiquetas
+        # Copias en listas de Python para el recorrido de una sola fila
+        self._nodos = list(zip(columna.tolist(), umbral.tolist(), izquierdo.tolist(), derecho.tolist()))
+        self._etiqueta_hoja = [str(etiquetas[c]) for c in clase.tolist()]
+
+    @classmethod
+    def cargar(cls, ruta, mmap_mode=None):
+        """
+        Args:
+            ruta: .npz escrito por guardar_arbol
+            mmap_mode: Modo de memory-mapping de np.load (None = cargar en memoria)
+        """
+        import numpy as np
+        with np.load(ruta, mmap_mode=mmap_mode, allow_pickle=False) as datos:
+            return cls(datos['columna'], datos['umbral'], datos['izquierdo'], datos['derecho'],
+                       datos['clase'], datos['etiquetas'])
+
+    @property
+    def profundidad(self):
+        def bajar(nodo):
+            if self.izquierdo[nodo] == HOJA:
+                return 0
+            return 1 + max(bajar(int(self.izquierdo[nodo])), bajar(int(self.derecho[nodo])))
+        return bajar(0)
+
+    def predecir_fila(self, fila):
+        """Etiqueta para una fila (secuencia de 5 números en el orden de COLUMNAS_SINTOMAS)."""
+        valores = array('f', fila) # Redondeo a float32, como hace sklearn con la entrada
+        nodos = self._nodos
+        nodo = 0
+        columna, umbral, izquierdo, derecho = nodos[0]
+        while izquierdo != HOJA:
+            nodo = izquierdo if valores[columna] <= umbral else derecho
+            columna, umbral, izquierdo, derecho = nodos[nodo]
+        return self._etiqueta_hoja[nodo]
+
+    def predecir_lote(self, matriz):
+        """
+        Etiquetas para un arreglo (n, 5); avanza todas las filas un nivel por iteración.
+
+        Returns:
+            Arreglo NumPy de etiquetas
+        """
+        import numpy as np
+        X = np.asarray(matriz, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != len(COLUMNAS_SINTOMAS):
+            raise ValueError(f"Se esperaba una matriz (n, {len(COLUMNAS_SINTOMAS)}), se recibió {X.shape}")
+        filas = np.arange(len(X))
+        nodos = np.zeros(len(X), dtype=np.int32)
+        activos = self.izquierdo[nodos] != HOJA
+        while activos.any():
+            n = nodos[activos]
+            va_izquierda = X[filas[activos], self.columna[n]] <= self.umbral[n]
+            nodos[activos] = np.where(va_izquierda, self.izquierdo[n], self.derecho[n])
+            activos = self.izquierdo[nodos] != HOJA
+        return self.etiquetas.take(self.clase.take(nodos))
@@ -1,37 +1,351 @@
 import asyncio 
-import random
+import heapq
+import itertools
 import logging 
+from metricas import latencias_etapa
+from puntos_control import puntos_control
+from trazas import trazador
+from logs import etapa
+from paciente import ETIQUETAS_PRIORIDAD
+from duraciones import duraciones
 
 
 logger = logging.getLogger(__name__)
 
-camas_disponibles = asyncio.Semaphore(3) 
+# Prioridad de triage -> nivel numérico (menor = más urgente)
+PRIORIDAD_NUMERICA = {etiqueta: int(codigo) for codigo, etiqueta in ETIQUETAS_PRIORIDAD.items()}
+PRIORIDAD_DESCONOCIDA = len(PRIORIDAD_NUMERICA) # Pacientes sin triage van al final
+
+# Recursos del hospital y su capacidad inicial
+CAPACIDADES_DEFECTO = {
+    "uci": 2,          # Cuidados intensivos
+    "general": 3,      # Hospitalización general
+    "observacion": 2,  # Camas de observación
+    "medicos": 4,      # Médicos disponibles para iniciar tratamiento
+}
+POOLS_CAMAS = ("uci", "general", "observacion")
+# Segundos de espera que equivalen a subir un nivel de prioridad (evita la inanición de "Baja")
+ENVEJECIMIENTO_DEFECTO = 30.0
+
+
+def _ahora():
+    """Reloj del event loop (virtual con --tiempo-virtual)."""
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return None
+
+
+class PlanificadorPrioridad:
+    """
+    Recurso de capacidad limitada que se asigna por prioridad de triage y orden de llegada.
+
+    Los pacientes en espera viven en un heap ordenado por
+    `llegada + nivel_prioridad * envejecimiento`. Es equivalente a que cada paciente
+    suba un nivel de prioridad por cada `envejecimiento` segundos de espera, pero la
+    clave no cambia con el tiempo, así que encolar y despachar son O(log n).
+    Las esperas canceladas se descartan de forma perezosa al despachar.
+
+    La capacidad se puede cambiar en caliente y el planificador lleva contadores de
+    utilización (unidades ocupadas integradas en el tiempo) y de espera.
+    """
+
+    def __init__(self, capacidad=CAPACIDADES_DEFECTO["general"], envejecimiento=ENVEJECIMIENTO_DEFECTO, nombre=None):
+        """
+        Args:
+            capacidad: Número de unidades del recurso (camas, médicos...)
+            envejecimiento: Segundos de espera por nivel de prioridad (float('inf') = prioridad estricta)
+            nombre: Nombre del recurso para reportes
+        """
+        if capacidad < 0:
+            raise ValueError("La capacidad no puede ser negativa")
+        self.nombre = nombre
+        self._capacidad = capacidad
+        self.envejecimiento = envejecimiento
+        self._en_uso = 0
+        self._esperando = 0
+        self._cola = [] # Heap de (clave, secuencia, future, llegada)
+        self._secuencia = itertools.count()
+
+        # Contadores de utilización
+        self.asignaciones = 0
+        self.asignaciones_con_espera = 0
+        self.max_esperando = 0
+        self.espera_total = 0.0
+        self._ocupacion_acumulada = 0.0 # unidades ocupadas x segundo
+        self._capacidad_acumulada = 0.0 # unidades disponibles x segundo
+        self._ultimo_cambio = None
+
+    @property
+    def capacidad(self):
+        return self._capacidad
+
+    @capacidad.setter
+    def capacidad(self, nueva):
+        """Redimensiona el recurso sin detener la simulación.
+        Al crecer se atiende de inmediato a quienes esperan; al reducirse, las
+        unidades en uso se devuelven normalmente y no se reasignan hasta bajar del nuevo límite."""
+        if nueva < 0:
+            raise ValueError("La capacidad no puede ser negativa")
+        self._contabilizar(_ahora())
+        self._capacidad = nueva
+        self._despachar()
+
+    @property
+    def en_uso(self):
+        return self._en_uso
+
+    @property
+    def esperando(self):
+        return self._esperando
+
+    def _contabilizar(self, ahora):
+        """Integra ocupación y capacidad desde el último cambio."""
+        if ahora is None:
+            return
+        if self._ultimo_cambio is not None:
+            intervalo = ahora - self._ultimo_cambio
+            self._ocupacion_acumulada += self._en_uso * intervalo
+            self._capacidad_acumulada += self._capacidad * intervalo
+        self._ultimo_cambio = ahora
+
+    def _clave(self, nivel, llegada):
+        if self.envejecimiento == float('inf'):
+            return (nivel, llegada)
+        return (llegada + nivel * self.envejecimiento, 0)
+
+    async def adquirir(self, nivel=PRIORIDAD_DESCONOCIDA):
+        """
+        Espera una unidad del recurso según el nivel de prioridad (0 = más urgente).
+
+        Returns:
+            Segundos de espera en la cola, o None si la unidad estaba libre
+        """
+        loop = asyncio.get_running_loop()
+        if self._en_uso < self._capacidad and not self._esperando:
+            self._contabilizar(loop.time())
+            self._en_uso += 1
+            self.asignaciones += 1
+            return None
+
+        llegada = loop.time()
+        futuro = loop.create_future()
+        heapq.heappush(self._cola, (self._clave(nivel, llegada), next(self._secuencia), futuro, llegada))
+        self._esperando += 1
+        if self._esperando > self.max_esperando:
+            self.max_esperando = self._esperando
+        try:
+            return await futuro
+        except asyncio.CancelledError:
+            if futuro.cancelled():
+                # Cancelado mientras esperaba: la entrada del heap se descarta al despachar
+                self._esperando -= 1
+            else:
+                # Ya se le había asignado la unidad: devolverla a la siguiente espera
+                self.liberar()
+            raise
+
+    def liberar(self):
+        """Devuelve una unidad y la entrega a la espera de mayor prioridad."""
+        self._contabilizar(_ahora())
+        self._en_uso -= 1
+        self._despachar()
+
+    def _despachar(self):
+        ahora = None
+        while self._en_uso < self._capacidad and self._cola:
+            _, _, futuro, llegada = heapq.heappop(self._cola)
+            if futuro.done():
+                continue
+            if ahora is None:
+                ahora = _ahora()
+                self._contabilizar(ahora)
+            espera = ahora - llegada if ahora is not None else 0.0
+            futuro.set_result(espera)
+            self._esperando -= 1
+            self._en_uso += 1
+            self.asignaciones += 1
+            self.asignaciones_con_espera += 1
+            self.espera_total += espera
+
+    def descontar_asignacion(self, espera=None):
+        """Revierte los contadores de una asignación (con la espera que retornó adquirir)."""
+        self.asignaciones -= 1
+        if espera is not None:
+            self.asignaciones_con_espera -= 1
+            self.espera_total -= espera
+
+    def contadores(self):
+        """Capacidad y contadores de utilización acumulados (para puntos de control)."""
+        self._contabilizar(_ahora())
+        return {'capacidad': self._capacidad, 'asignaciones': self.asignaciones,
+                'asignaciones_con_espera': self.asignaciones_con_espera, 'max_esperando': self.max_esperando,
+                'espera_total': self.espera_total, 'ocupacion_acumulada': self._ocupacion_acumulada,
+                'capacidad_acumulada': self._capacidad_acumulada}
+
+    def restaurar_contadores(self, contadores):
+        """Retoma la capacidad y los contadores de contadores(); la integración sigue desde ahora."""
+        self.capacidad = contadores['capacidad']
+        self.asignaciones = contadores['asignaciones']
+        self.asignaciones_con_espera = contadores['asignaciones_con_espera']
+        self.max_esperando = contadores['max_esperando']
+        self.espera_total = contadores['espera_total']
+        self._ocupacion_acumulada = contadores['ocupacion_acumulada']
+        self._capacidad_acumulada = contadores['capacidad_acumulada']
+
+    def solicitar(self, nivel=PRIORIDAD_DESCONOCIDA):
+        """Uso: `async with planificador.solicitar(nivel) as espera: ...` (espera como en adquirir)."""
+        return _Solicitud(self, nivel)
+
+    def resumen(self):
+        """Contadores de utilización hasta el instante actual."""
+        self._contabilizar(_ahora())
+        return {
+            'capacidad': self._capacidad,
+            'en_uso': self._en_uso,
+            'esperando': self._esperando,
+            'max_esperando': self.max_esperando,
+            'asignaciones': self.asignaciones,
+            'asignaciones_con_espera': self.asignaciones_con_espera,
+            'espera_media': self.espera_total / self.asignaciones if self.asignaciones else 0.0,
+            'utilizacion': (self._ocupacion_acumulada / self._capacidad_acumulada
+                            if self._capacidad_acumulada else 0.0),
+        }
+
+
+class _Solicitud:
+    __slots__ = ("planificador", "nivel")
+
+    def __init__(self, planificador, nivel):
+        self.planificador = planificador
+        self.nivel = nivel
+
+    async def __aenter__(self):
+        return await self.planificador.adquirir(self.nivel)
+
+    async def __aexit__(self, *exc):
+        self.planificador.liberar()
+        return False
+
+
+class RegistroRecursos:
+    """
+    Conjunto de recursos con nombre (UCI, sala general, observación, médicos), cada
+    uno con su propio PlanificadorPrioridad y capacidad ajustable en caliente.
+    """
+
+    def __init__(self, capacidades=None, envejecimiento=ENVEJECIMIENTO_DEFECTO):
+        self.envejecimiento = envejecimiento
+        self._recursos = {}
+        for nombre, capacidad in (capacidades or CAPACIDADES_DEFECTO).items():
+            self.registrar(nombre, capacidad)
+
+    def registrar(self, nombre, capacidad):
+        if nombre in self._recursos:
+            raise ValueError(f"El recurso '{nombre}' ya existe")
+        self._recursos[nombre] = PlanificadorPrioridad(capacidad, self.envejecimiento, nombre)
+        return self._recursos[nombre]
+
+    def __getitem__(self, nombre):
+        return self._recursos[nombre]
+
+    def __contains__(self, nombre):
+        return nombre in self._recursos
+
+    def __iter__(self):
+        return iter(self._recursos)
+
+    def redimensionar(self, nombre, capacidad):
+        """Cambia la capacidad de un recurso sin reiniciar la simulación."""
+        anterior = self._recursos[nombre].capacidad
+        self._recursos[nombre].capacidad = capacidad
+        logger.info(f"Recurso '{nombre}' redimensionado de {anterior} a {capacidad}")
+
+    def resumen(self):
+        return {nombre: recurso.resumen() for nombre, recurso in self._recursos.items()}
+
+    def contadores(self):
+        return {nombre: recurso.contadores() for nombre, recurso in self._recursos.items()}
+
+    def restaurar_contadores(self, contadores):
+        for nombre, datos in contadores.items():
+            if nombre in self._recursos:
+                self._recursos[nombre].restaurar_contadores(datos)
+
+    def cuello_de_botella(self):
+        """Nombre del recurso con mayor utilización (y mayor espera media en caso de empate)."""
+        resumen = self.resumen()
+        if not resumen:
+            return None
+        return max(resumen, key=lambda n: (resumen[n]['utilizacion'], resumen[n]['espera_media']))
+
+
+def seleccionar_pool(prioridad, diagnostico):
+    """
+    Decide a qué tipo de cama va un paciente según su triage y diagnóstico.
+
+    Returns:
+        'uci', 'general' u 'observacion'
+    """
+    if prioridad == "Crítica" or diagnostico == "COVID-19":
+        return "uci"
+    if prioridad == "Baja":
+        return "observacion"
+    return "general"
+
+
+recursos = RegistroRecursos()
+
+
+def reiniciar_recursos(capacidades=None, envejecimiento=ENVEJECIMIENTO_DEFECTO):
+    """Crea un registro de recursos vacío para una nueva corrida."""
+    global recursos
+    recursos = RegistroRecursos(capacidades, envejecimiento)
+    return recursos
 
 async def asignar_cama_async(paciente, actualizar_estadisticas_func):
-    logger.info(f"Paciente {paciente.id} [CAMA]: Esperando cama disponible...")
+    logger.info("Esperando cama disponible...", extra=etapa('cama', paciente.id))
 
     try:
-        # Intentar adquirir el semáforo asíncrono
-        async with camas_disponibles:
-            logger.info(f"Paciente {paciente.id} [CAMA]: Cama asignada - Iniciando tratamiento")
+        # Esperar cama del tipo adecuado según la prioridad y el diagnóstico
+        nivel = PRIORIDAD_NUMERICA.get(paciente.prioridad, PRIORIDAD_DESCONOCIDA)
+        pool = seleccionar_pool(paciente.prioridad, paciente.diagnostico)
+        loop = asyncio.get_running_loop()
+        inicio = loop.time()
+        async with recursos[pool].solicitar(nivel) as espera:
+            asignada = loop.time()
+            latencias_etapa.registrar('espera_cama', asignada - inicio)
+            # Si la corrida se reanuda antes de terminar el tratamiento, la etapa se repite
+            puntos_control.anotar(paciente, 'latencias', 'espera_cama', asignada - inicio)
+            puntos_control.anotar(paciente, 'recursos', pool, espera)
+            trazador.registrar('espera_cama', paciente.id, inicio, asignada - inicio, {'recurso': pool})
+            logger.info(f"Cama asignada ({pool}) - Esperando médico", extra=etapa('cama', paciente.id))
 
             # Registrar cama asignada
-            await actualizar_estadisticas_func('cama_asignada')
+            actualizar_estadisticas_func('cama_asignada')
+
+            # El tratamiento necesita además un médico disponible
+            async with recursos["medicos"].solicitar(nivel) as espera:
+                puntos_control.anotar(paciente, 'recursos', "medicos", espera)
+                logger.info("Médico asignado - Iniciando tratamiento", extra=etapa('cama', paciente.id))
 
-            # Simular tiempo de tratamiento
-            tiempo_tratamiento = random.uniform(2, 5)
-            await asyncio.sleep(tiempo_tratamiento) # Usar await asyncio.sleep
+                # Simular tiempo de tratamiento
+                tiempo_tratamiento = duraciones.muestrear('tratamiento')
+                await asyncio.sleep(tiempo_tratamiento) # Usar await asyncio.sleep
 
-            logger.info(f"Paciente {paciente.id} [TRATAMIENTO]: Tratamiento completado en {tiempo_tratamiento:.1f}s")
+            # El tratamiento cuenta desde la asignación de cama (incluye la espera de médico)
+            latencias_etapa.registrar('tratamiento', loop.time() - asignada)
+            trazador.registrar('tratamiento', paciente.id, asignada, loop.time() - asignada, {'recurso': pool})
+            logger.info(f"Tratamiento completado en {tiempo_tratamiento:.1f}s", extra=etapa('tratamiento', paciente.id))
             paciente.estado = "tratamiento_completado" # Nuevo estado para indicar fin del tratamiento
             return True  # Indica que sí recibió cama
 
     except asyncio.CancelledError:
-        logger.warning(f"Paciente {paciente.id} [CAMA]: Tarea de asignación/tratamiento cancelada.")
+        logger.warning("Tarea de asignación/tratamiento cancelada.", extra=etapa('cama', paciente.id))
         paciente.estado = "cama_cancelada"
         return False # No recibió cama si fue cancelado
     except Exception as e:
-         logger.error(f"Paciente {paciente.id} [ERROR]: Error en asignación/tratamiento: {type(e).__name__} - {e}", exc_info=True)
+         logger.error(f"Error en asignación/tratamiento: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error', paciente.id))
          paciente.estado = "error_cama"
-         await actualizar_estadisticas_func('error_cama')
+         actualizar_estadisticas_func('error_cama')
          return False # No recibió cama si hubo error
\ No newline at end of file
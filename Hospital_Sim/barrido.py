@@ -0,0 +1,276 @@
+"""
+Barrido de parámetros para planificación de capacidad (Monte Carlo).
+
+Corre réplicas independientes de la simulación (tiempo virtual, una semilla por
+réplica) sobre la grilla de capacidades, tasas de llegada y distribuciones de
+tiempos de etapa, repartidas entre procesos que se reutilizan de una réplica a
+la siguiente con los modelos ya cargados. Cada réplica devuelve solo un resumen
+chico; los resúmenes se acumulan a medida que llegan y al final se imprime una
+tabla por configuración con la media y el intervalo de confianza de cada medida.
+
+Uso (desde Hospital_Sim/):
+    python barrido.py 2000 --replicas 30 --capacidad observacion=2,3,4 --tasas 2 3.3 \\
+        --tiempos uniforme exponencial --salida replicas.csv
+"""
+import argparse
+import csv
+import itertools
+import logging # Importar logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from asignacion_recursos import CAPACIDADES_DEFECTO, POOLS_CAMAS
+from duraciones import DISTRIBUCIONES, DISTRIBUCION_DEFECTO
+from llegadas import TIPOS_LLEGADAS, TASA_DEFECTO
+from logs import configurar_logging, vaciar_logs
+from visualizacion import mostrar_barrido
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+NIVEL_CONFIANZA_DEFECTO = 0.95
+PACIENTES_DEFECTO = 2000
+REPLICAS_DEFECTO = 30
+
+# Medidas de cada réplica (ver resumir_replica)
+MEDIDAS = ('espera_cama', 'espera_cama_p95', 'utilizacion_camas', 'cola_max', 'altas_hora', 'tiempo_simulado')
+
+
+class Acumulador:
+    """Media y varianza en streaming (Welford): memoria constante por medida y configuración."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+
+    def agregar(self, valor):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (valor - self.media)
+
+    def desviacion(self):
+        return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def intervalo(self, confianza=NIVEL_CONFIANZA_DEFECTO):
+        """Semiancho del intervalo de confianza de la media (t de Student; 0 con menos de 2 réplicas)."""
+        if self.n < 2:
+            return 0.0
+        from scipy.stats import t # scipy (requirements.txt); solo al resumir el barrido
+        return t.ppf((1 + confianza) / 2, self.n - 1) * self.desviacion() / math.sqrt(self.n)
+
+
+def crear_grilla(capacidades, tasas, distribuciones, escalas):
+    """
+    Producto cartesiano de los parámetros del barrido.
+
+    Args:
+        capacidades: Diccionario recurso -> lista de capacidades (los demás recursos usan CAPACIDADES_DEFECTO)
+        tasas: Llegadas por segundo
+        distribuciones: Distribuciones de tiempos de etapa (ver duraciones.DISTRIBUCIONES)
+        escalas: Factores sobre los tiempos de etapa
+    Returns:
+        Lista de configuraciones {'capacidades', 'tasa_llegadas', 'distribucion_tiempos', 'escala_tiempos'}
+    """
+    recursos = list(capacidades)
+    grilla = []
+    for valores, tasa, distribucion, escala in itertools.product(
+            itertools.product(*(capacidades[r] for r in recursos)), tasas, distribuciones, escalas):
+        grilla.append({'capacidades': {**CAPACIDADES_DEFECTO, **dict(zip(recursos, valores))},
+                       'tasa_llegadas': tasa, 'distribucion_tiempos': distribucion, 'escala_tiempos': escala})
+    return grilla
+
+
+def etiqueta_configuracion(configuracion, recursos):
+    """Texto corto de una configuración, p. ej. 'observacion=3 λ=2 exponencial'."""
+    partes = [f"{r}={configuracion['capacidades'][r]}" for r in recursos]
+    partes.append(f"λ={configuracion['tasa_llegadas']:.3g}")
+    partes.append(configuracion['distribucion_tiempos'])
+    if configuracion['escala_tiempos'] != 1.0:
+        partes.append(f"x{configuracion['escala_tiempos']:g}")
+    return " ".join(partes)
+
+
+def resumir_replica(resultado):
+    """Medidas de una réplica a partir del resultado de main.main."""
+    camas = [resultado['recursos'][pool] for pool in POOLS_CAMAS]
+    capacidad = sum(datos['capacidad'] for datos in camas)
+    tiempo_simulado = resultado['tiempo_simulado']
+    espera = resultado['latencias']['espera_cama']
+    return {
+        'espera_cama': espera['promedio'],
+        'espera_cama_p95': espera['p95'],
+        'utilizacion_camas': (sum(datos['utilizacion'] * datos['capacidad'] for datos in camas) / capacidad
+                              if capacidad else 0.0),
+        'cola_max': max(datos['max_esperando'] for datos in camas),
+        'altas_hora': resultado['estadisticas'].get('alta', 0) / tiempo_simulado * 3600 if tiempo_simulado else 0.0,
+        'tiempo_simulado': tiempo_simulado,
+    }
+
+
+def _inicializar_proceso(directorio, mmap_mode, nivel_log):
+    """Inicializador de los procesos del barrido: logging propio, main importado y modelos cargados una vez."""
+    configurar_logging(nivel_log, en_cola=False)
+    from modelos import inicializar_trabajador
+    import main # Importa la simulación completa antes de la primera réplica
+    inicializar_trabajador(directorio, mmap_mode)
+
+
+def _ejecutar_replica(indice, replica, configuracion, num_pacientes, semilla, opciones):
+    """Corre en un proceso del pool: una réplica completa en tiempo virtual, sin executor aparte."""
+    import main
+    from tiempo_virtual import ejecutar_con_tiempo_virtual
+    random.seed(f"{semilla}-{replica}") # Misma semilla por réplica en todas las configuraciones
+    inicio = time.perf_counter()
+    resultado = ejecutar_con_tiempo_virtual(main.main(num_pacientes, ejecutor="en-linea", reporte=False,
+                                                      **configuracion, **opciones))
+    medidas = resumir_replica(resultado)
+    medidas['tiempo_real'] = time.perf_counter() - inicio
+    return indice, replica, medidas
+
+
+def barrer(grilla, replicas, num_pacientes, procesos=None, semilla=0, salida=None,
+           confianza=NIVEL_CONFIANZA_DEFECTO, nivel_log="WARNING", **opciones):
+    """
+    Corre `replicas` réplicas de cada configuración de la grilla en paralelo.
+
+    Las tareas se envían réplica por réplica (todas las configuraciones de la
+    réplica 0, luego las de la 1...), así que los resultados parciales cubren
+    pronto toda la grilla. Los procesos son independientes y solo intercambian
+    parámetros y resúmenes, por lo que el tiempo total escala casi linealmente
+    con los procesos mientras haya más réplicas que procesos.
+
+    Args:
+        grilla: Configuraciones (ver crear_grilla)
+        replicas: Réplicas por configuración
+        num_pacientes: Pacientes por réplica
+        procesos: Procesos del pool (por defecto, uno por CPU)
+        semilla: Semilla base; la réplica r usa f"{semilla}-{r}" en todas las configuraciones
+        salida: CSV opcional con una fila por réplica, escrita a medida que terminan
+        confianza: Nivel de los intervalos de confianza
+        nivel_log: Nivel de logging dentro de los procesos
+        **opciones: Demás argumentos de main.main (llegadas, modo_inferencia, dir_modelos, ...)
+    Returns:
+        Lista con una fila por configuración: la configuración, 'replicas' y por cada medida
+        su media y su semiancho de intervalo ('<medida>' y '<medida>_ic')
+    """
+    procesos = max(1, procesos or os.cpu_count() or 1)
+    acumulados = [{medida: Acumulador() for medida in MEDIDAS + ('tiempo_real',)} for _ in grilla]
+    total = len(grilla) * replicas
+    logger.info(f"Barrido: {len(grilla)} configuraciones x {replicas} réplicas de {num_pacientes} pacientes "
+                f"en {procesos} procesos")
+
+    archivo = escritor = None
+    if salida is not None:
+        archivo = open(salida, "w", newline="", encoding="utf-8")
+        escritor = csv.writer(archivo)
+        escritor.writerow(['configuracion', 'replica', *[f"capacidad_{r}" for r in CAPACIDADES_DEFECTO],
+                           'tasa_llegadas', 'distribucion_tiempos', 'escala_tiempos', *MEDIDAS, 'tiempo_real'])
+    inicio = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                                 initargs=(opciones.get('dir_modelos'), opciones.get('mmap_modelos'),
+                                           nivel_log)) as executor:
+            futuros = [executor.submit(_ejecutar_replica, indice, replica, configuracion, num_pacientes,
+                                       semilla, opciones)
+                       for replica in range(replicas) for indice, configuracion in enumerate(grilla)]
+            for terminadas, futuro in enumerate(as_completed(futuros), 1):
+                indice, replica, medidas = futuro.result()
+                for medida, valor in medidas.items():
+                    acumulados[indice][medida].agregar(valor)
+                if escritor is not None:
+                    configuracion = grilla[indice]
+                    escritor.writerow([indice, replica, *configuracion['capacidades'].values(),
+                                       configuracion['tasa_llegadas'], configuracion['distribucion_tiempos'],
+                                       configuracion['escala_tiempos'], *(medidas[m] for m in MEDIDAS),
+                                       medidas['tiempo_real']])
+                    archivo.flush()
+                if terminadas % max(1, total // 20) == 0 or terminadas == total:
+                    transcurrido = time.perf_counter() - inicio
+                    logger.info(f"Réplicas: {terminadas}/{total} ({terminadas / transcurrido:.1f}/s)")
+    finally:
+        if archivo is not None:
+            archivo.close()
+    tiempo_total = time.perf_counter() - inicio
+    trabajo = sum(acumulado['tiempo_real'].media * acumulado['tiempo_real'].n for acumulado in acumulados)
+    logger.info(f"⏱️ Barrido completado en {tiempo_total:.2f} s ({total / tiempo_total:.1f} réplicas/s, "
+                f"eficiencia paralela {trabajo / (tiempo_total * procesos):.0%})")
+
+    filas = []
+    for configuracion, acumulado in zip(grilla, acumulados):
+        fila = dict(configuracion, replicas=acumulado['espera_cama'].n)
+        for medida in MEDIDAS:
+            fila[medida] = acumulado[medida].media
+            fila[f"{medida}_ic"] = acumulado[medida].intervalo(confianza)
+        filas.append(fila)
+    return filas
+
+
+def leer_grilla_capacidades(valores):
+    """Convierte ['observacion=2,3,4', ...] en {'observacion': [2, 3, 4], ...}."""
+    capacidades = {}
+    for valor in valores:
+        nombre, _, cantidades = valor.partition("=")
+        if nombre not in CAPACIDADES_DEFECTO or not cantidades:
+            raise ValueError(f"Capacidad inválida '{valor}'; use RECURSO=N[,N...] con RECURSO en "
+                             f"{list(CAPACIDADES_DEFECTO)}")
+        capacidades[nombre] = [int(cantidad) for cantidad in cantidades.split(",")]
+    return capacidades
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("num_pacientes", nargs="?", type=int, default=PACIENTES_DEFECTO,
+                        help=f"Pacientes por réplica (por defecto {PACIENTES_DEFECTO})")
+    parser.add_argument("--replicas", type=int, default=REPLICAS_DEFECTO,
+                        help=f"Réplicas por configuración (por defecto {REPLICAS_DEFECTO})")
+    parser.add_argument("--capacidad", action="append", default=[], metavar="RECURSO=N[,N...]",
+                        help="Capacidades a barrer de un recurso (uci, general, observacion, medicos); se puede "
+                             "repetir. Los recursos no indicados usan la capacidad por defecto")
+    parser.add_argument("--tasas", type=float, nargs="+", default=[TASA_DEFECTO],
+                        help=f"Tasas de llegada a barrer, en llegadas/s (por defecto {TASA_DEFECTO:.2f})")
+    parser.add_argument("--llegadas", choices=[t for t in TIPOS_LLEGADAS if t != "uniforme"], default="poisson",
+                        help="Modelo de llegadas de las réplicas (por defecto 'poisson')")
+    parser.add_argument("--tiempos", choices=DISTRIBUCIONES, nargs="+", default=[DISTRIBUCION_DEFECTO],
+                        help=f"Distribuciones de tiempos de etapa a barrer (por defecto '{DISTRIBUCION_DEFECTO}')")
+    parser.add_argument("--escala-tiempos", type=float, nargs="+", default=[1.0],
+                        help="Factores sobre los tiempos de etapa a barrer (por defecto 1)")
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos del barrido (por defecto, uno por CPU)")
+    parser.add_argument("--semilla", type=int, default=0,
+                        help="Semilla base; la réplica r usa la misma semilla en todas las configuraciones")
+    parser.add_argument("--confianza", type=float, default=NIVEL_CONFIANZA_DEFECTO,
+                        help=f"Nivel de los intervalos de confianza (por defecto {NIVEL_CONFIANZA_DEFECTO:g})")
+    parser.add_argument("--salida", default=None, metavar="ARCHIVO",
+                        help="Escribe una fila CSV por réplica a medida que terminan")
+    parser.add_argument("--modo-inferencia", choices=["tabla", "lotes", "ejecutor"], default="tabla",
+                        help="Modo de inferencia de cada réplica (por defecto 'tabla')")
+    parser.add_argument("--modelos-dir", default=None,
+                        help="Directorio con los modelos .pkl (por defecto, el directorio del código)")
+    parser.add_argument("--nivel-log", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Nivel de logging del barrido (por defecto INFO; las réplicas usan WARNING)")
+    return parser
+
+
+if __name__ == "__main__":
+    args = crear_parser().parse_args()
+    configurar_logging(args.nivel_log, en_cola=False)
+    try:
+        capacidades = leer_grilla_capacidades(args.capacidad)
+        if args.replicas < 1:
+            raise ValueError("Hace falta al menos una réplica por configuración")
+        if not 0 < args.confianza < 1:
+            raise ValueError(f"Nivel de confianza inválido: {args.confianza}")
+        grilla = crear_grilla(capacidades, args.tasas, args.tiempos, args.escala_tiempos)
+        filas = barrer(grilla, args.replicas, args.num_pacientes, args.procesos, args.semilla, args.salida,
+                       args.confianza, llegadas=args.llegadas, modo_inferencia=args.modo_inferencia,
+                       dir_modelos=args.modelos_dir)
+        vaciar_logs()
+        mostrar_barrido(filas, [etiqueta_configuracion(c, capacidades) for c in grilla], args.confianza)
+    except ValueError as e:
+        logger.error(f"Configuración inválida: {e}")
+    except KeyboardInterrupt:
+        logger.info("\nBarrido interrumpido por el usuario.")
@@ -0,0 +1,2 @@
+# Benchmarks de la simulación hospitalaria.
+# Ejecutar desde Hospital_Sim/, por ejemplo: python -m benchmarks.bench_inferencia_lotes
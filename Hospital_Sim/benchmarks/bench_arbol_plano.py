@@ -0,0 +1,120 @@
+"""
+Árboles de triage y diagnóstico: predict de sklearn contra el evaluador plano
+(arbol_plano.ArbolPlano), por llamada de una fila y por lote, y el costo de cargar
+los modelos en un intérprete nuevo desde los .pkl (sklearn) o desde los .npz.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_arbol_plano --llamadas 20000 --lote 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.comun import imprimir_tabla
+from paciente import COLUMNAS_SINTOMAS
+
+DIRECTORIO_SIM = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELOS = (
+    ("triage", "modelo_triage.pkl", "label_prioridad.pkl", "arbol_triage.npz"),
+    ("diagnostico", "modelo_diagnostico.pkl", "label_enfermedad.pkl", "arbol_diagnostico.npz"),
+)
+
+
+def _por_llamada(funcion, argumentos):
+    """Microsegundos promedio por llamada de funcion sobre cada argumento."""
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcion(argumento)
+    return (time.perf_counter() - inicio) / len(argumentos) * 1e6
+
+
+def comparar(nombre, archivo_modelo, archivo_etiquetas, llamadas, lote, rng):
+    import joblib
+    from arbol_plano import ArbolPlano, exportar_arbol
+
+    modelo = joblib.load(os.path.join(DIRECTORIO_SIM, archivo_modelo))
+    codificador = joblib.load(os.path.join(DIRECTORIO_SIM, archivo_etiquetas))
+    arbol = ArbolPlano(**exportar_arbol(modelo, codificador))
+    matriz = rng.integers(0, 2, size=(lote, len(COLUMNAS_SINTOMAS))).astype(np.float32)
+    filas = matriz.tolist()
+    # Para sklearn, mismo orden de columnas con el que se entrenó
+    orden = [COLUMNAS_SINTOMAS.index(c) for c in getattr(modelo, "feature_names_in_", COLUMNAS_SINTOMAS)]
+
+    def sklearn_fila(fila):
+        return codificador.inverse_transform(modelo.predict(np.asarray([fila], dtype=np.float32)[:, orden]))[0]
+
+    def sklearn_lote(m):
+        return codificador.inverse_transform(modelo.predict(m[:, orden]))
+
+    esperado = sklearn_lote(matriz)
+    iguales = bool((arbol.predecir_lote(matriz) == esperado).all()
+                   and all(arbol.predecir_fila(f) == e for f, e in zip(filas, esperado)))
+
+    repeticiones = max(1, llamadas // lote)
+    una_fila = [filas[i % lote] for i in range(min(llamadas, 2000))] # sklearn es lento por llamada
+    return {
+        'modelo': nombre,
+        'nodos': len(arbol.umbral),
+        'sklearn_fila_us': _por_llamada(sklearn_fila, una_fila),
+        'plano_fila_us': _por_llamada(arbol.predecir_fila, [filas[i % lote] for i in range(llamadas)]),
+        'sklearn_lote_us': _por_llamada(sklearn_lote, [matriz] * repeticiones) / lote,
+        'plano_lote_us': _por_llamada(arbol.predecir_lote, [matriz] * repeticiones) / lote,
+        'identicos': iguales,
+    }
+
+
+def _carga_en_subproceso(directorio):
+    """Carga ambos modelos en un intérprete nuevo; retorna ms de import+carga y si se importó sklearn."""
+    codigo = (
+        "import sys, time, json, warnings; warnings.filterwarnings('ignore', message='Trying to unpickle estimator'); inicio = time.perf_counter()\n"
+        "import modelos, triage_ia, diagnostico_ia\n"
+        f"modelos.configurar_modelos({directorio!r})\n"
+        "triage_ia.cargar_modelos(); diagnostico_ia.cargar_modelos()\n"
+        "triage_ia.clasificar_prioridad_lote([[1, 1, 0, 0, 1]]); diagnostico_ia.diagnosticar_lote([[1, 1, 0, 0, 1]])\n"
+        "print(json.dumps([(time.perf_counter() - inicio) * 1000, 'sklearn' in sys.modules]))"
+    )
+    proceso = subprocess.run([sys.executable, "-c", codigo], cwd=DIRECTORIO_SIM,
+                             capture_output=True, text=True, check=True)
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def medir_carga(repeticiones):
+    filas = []
+    with tempfile.TemporaryDirectory() as solo_pkl, tempfile.TemporaryDirectory() as solo_npz:
+        for _, archivo_modelo, archivo_etiquetas, archivo_arbol in MODELOS:
+            for archivo in (archivo_modelo, archivo_etiquetas):
+                shutil.copy(os.path.join(DIRECTORIO_SIM, archivo), solo_pkl)
+            shutil.copy(os.path.join(DIRECTORIO_SIM, archivo_arbol), solo_npz)
+        for formato, directorio in (("pkl (sklearn)", solo_pkl), ("npz (plano)", solo_npz)):
+            mediciones = [_carga_en_subproceso(directorio) for _ in range(repeticiones)]
+            filas.append({'formato': formato, 'carga_ms_min': min(ms for ms, _ in mediciones),
+                          'sklearn': "sí" if mediciones[-1][1] else "no"})
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llamadas", type=int, default=20_000)
+    parser.add_argument("--lote", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Arranques en frío por formato")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.semilla)
+    filas = [comparar(nombre, modelo, etiquetas, args.llamadas, args.lote, rng)
+             for nombre, modelo, etiquetas, _ in MODELOS]
+    imprimir_tabla("PREDICCIÓN: µs POR FILA", filas,
+                   ['modelo', 'sklearn_fila_us', 'plano_fila_us', 'sklearn_lote_us', 'plano_lote_us', 'identicos'])
+    imprimir_tabla("CARGA EN FRÍO (import + carga + primera predicción)", medir_carga(args.repeticiones),
+                   ['formato', 'carga_ms_min', 'sklearn'])
+
+
+if __name__ == "__main__":
+    main()
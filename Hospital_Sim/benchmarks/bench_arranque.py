@@ -0,0 +1,87 @@
+"""
+Mide el costo de arranque del simulador al estilo de `python -X importtime`.
+
+Importa cada módulo en un intérprete nuevo, suma el tiempo acumulado de las
+importaciones de primer nivel, lista los módulos más costosos e indica si se
+cargaron dependencias pesadas (sklearn, pandas, joblib, numpy).
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_arranque --repeticiones 5 --json arranque.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DIRECTORIO_SIM = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULOS_PESADOS = ("sklearn", "pandas", "joblib", "numpy")
+OBJETIVOS = ("main", "triage_ia", "diagnostico_ia", "inferencia", "visualizacion")
+
+
+def _importtime(modulo):
+    """Ejecuta `python -X importtime -c 'import <modulo>'` y retorna (entradas, módulos pesados cargados)."""
+    codigo = (f"import sys, json; import {modulo}; "
+              f"print(json.dumps([m for m in {MODULOS_PESADOS!r} if m in sys.modules]))")
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                             cwd=DIRECTORIO_SIM, capture_output=True, text=True, check=True)
+    entradas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        # Formato: "import time:  propio |  acumulado |   <sangría>modulo"
+        propio, acumulado, nombre = linea[len("import time:"):].split("|")
+        nombre = nombre.rstrip()[1:]
+        profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+        entradas.append({'modulo': nombre.strip(), 'propio_us': int(propio), 'acumulado_us': int(acumulado),
+                         'nivel': profundidad})
+    pesados = json.loads(proceso.stdout.strip().splitlines()[-1])
+    return entradas, pesados
+
+
+def medir(modulo, repeticiones):
+    totales = []
+    entradas = []
+    pesados = []
+    for _ in range(repeticiones):
+        entradas, pesados = _importtime(modulo)
+        nivel_minimo = min(e['nivel'] for e in entradas)
+        totales.append(sum(e['acumulado_us'] for e in entradas if e['nivel'] == nivel_minimo))
+    propios = [e for e in entradas if e['modulo'] == modulo]
+    return {
+        'modulo': modulo,
+        'total_ms_mediana': statistics.median(totales) / 1000,
+        'total_ms_min': min(totales) / 1000,
+        'propio_ms': (propios[0]['acumulado_us'] / 1000) if propios else None,
+        'dependencias_pesadas': pesados,
+        'mas_costosos': sorted(({'modulo': e['modulo'], 'acumulado_ms': e['acumulado_us'] / 1000}
+                                for e in entradas), key=lambda e: -e['acumulado_ms'])[:10],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulos", nargs="+", default=list(OBJETIVOS))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--json", default=None, help="Archivo donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultados = [medir(modulo, args.repeticiones) for modulo in args.modulos]
+
+    print("\n" + "=" * 72)
+    print("COSTO DE ARRANQUE (python -X importtime)".center(72))
+    print("=" * 72)
+    for r in resultados:
+        pesados = ", ".join(r['dependencias_pesadas']) or "ninguna"
+        print(f"{r['modulo']:<16} mediana {r['total_ms_mediana']:>9.1f} ms | "
+              f"min {r['total_ms_min']:>9.1f} ms | pesadas: {pesados}")
+    print("=" * 72)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Escalamiento del barrido de parámetros (barrido.py): réplicas/s según el número de
+procesos, con las mismas réplicas en cada corrida. La fila 'subproceso' es la
+referencia de lanzar un `python main.py N --tiempo-virtual` por réplica (importar
+y cargar modelos en cada una), medida sobre unas pocas réplicas.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_barrido --pacientes 2000 --replicas 64 --procesos 1 2 4 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from barrido import barrer, crear_grilla
+from logs import configurar_logging
+from benchmarks.comun import imprimir_tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--replicas", type=int, default=64)
+    parser.add_argument("--procesos", type=int, nargs="+", default=None,
+                        help="Procesos a probar (por defecto 1, 2, 4... hasta el número de CPU)")
+    parser.add_argument("--subprocesos", type=int, default=4,
+                        help="Réplicas de referencia con un proceso nuevo cada una (0 = no medir)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    configurar_logging("WARNING", en_cola=False)
+    cpus = os.cpu_count() or 1
+    procesos = args.procesos or sorted({1, cpus} | {2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus})
+    grilla = crear_grilla({}, [3.0], ["uniforme"], [1.0])
+
+    filas = []
+    if args.subprocesos:
+        inicio = time.perf_counter()
+        for replica in range(args.subprocesos):
+            subprocess.run([sys.executable, "-W", "ignore", "main.py", str(args.pacientes), "--tiempo-virtual",
+                            "--llegadas", "poisson", "--tasa-llegadas", "3", "--ejecutor", "en-linea",
+                            "--semilla", str(replica), "--nivel-log", "ERROR"],
+                           check=True, stdout=subprocess.DEVNULL)
+        total = time.perf_counter() - inicio
+        filas.append({'modo': "subproceso", 'procesos': 1, 'replicas/s': args.subprocesos / total})
+    for n in procesos:
+        inicio = time.perf_counter()
+        barrer(grilla, args.replicas, args.pacientes, n, args.semilla, llegadas="poisson")
+        total = time.perf_counter() - inicio
+        filas.append({'modo': "barrido", 'procesos': n, 'tiempo_s': total, 'replicas/s': args.replicas / total})
+    base = next(fila for fila in filas if fila['modo'] == "barrido")
+    for fila in filas:
+        fila['aceleracion'] = fila['replicas/s'] / base['replicas/s']
+        fila['eficiencia'] = fila['aceleracion'] / fila['procesos']
+    imprimir_tabla(f"BARRIDO ({args.replicas} réplicas de {args.pacientes} pacientes, {cpus} CPU)", filas,
+                   ['modo', 'procesos', 'tiempo_s', 'replicas/s', 'aceleracion', 'eficiencia'])
+
+
+if __name__ == "__main__":
+    main()
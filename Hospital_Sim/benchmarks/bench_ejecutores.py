@@ -0,0 +1,74 @@
+"""
+Elige el backend de ejecución (ejecucion.crear_ejecutor) más rápido para una
+carga dada: mide pacientes/s y latencia de triage + diagnóstico con cada backend,
+en modo 'ejecutor' (una tarea por paciente y etapa) y en modo 'lotes' con cada
+tamaño de lote, y recomienda la combinación con mayor rendimiento.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_ejecutores --pacientes 2000 --lotes 1 8 32 128
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from paciente import Paciente
+from inferencia import crear_inferencia
+from ejecucion import crear_ejecutor, BACKENDS
+from benchmarks.comun import resumen_latencias, imprimir_tabla
+
+
+async def _medir(modo, executor, pacientes, max_lote, ventana):
+    inferencia = await crear_inferencia(modo, executor, max_lote, ventana)
+    latencias = []
+
+    async def un_paciente(paciente):
+        inicio = time.perf_counter()
+        paciente.prioridad = await inferencia.clasificar(paciente)
+        await inferencia.diagnosticar(paciente)
+        latencias.append(time.perf_counter() - inicio)
+
+    inicio_total = time.perf_counter()
+    await asyncio.gather(*(un_paciente(Paciente(i + 1)) for i in range(pacientes)))
+    await inferencia.cerrar()
+    total = time.perf_counter() - inicio_total
+    return {**resumen_latencias(latencias), 'pacientes/s': pacientes / total}
+
+
+async def _backend(backend, args):
+    filas = []
+    with crear_ejecutor(backend, args.trabajadores) as executor:
+        await _medir("ejecutor", executor, 50, 1, 0) # Calentar: arranque de trabajadores y carga de modelos
+        configuraciones = [("ejecutor", 1)] + [("lotes", lote) for lote in args.lotes]
+        for modo, lote in configuraciones:
+            fila = await _medir(modo, executor, args.pacientes, lote, args.ventana_ms / 1000)
+            filas.append({'backend': backend, 'modo': modo, 'lote': lote if modo == "lotes" else '-', **fila})
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--ventana-ms", type=float, default=5.0)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--trabajadores", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    filas = []
+    for backend in args.backends:
+        random.seed(args.semilla) # Mismos síntomas para cada backend
+        filas.extend(asyncio.run(_backend(backend, args)))
+    imprimir_tabla(f"BACKENDS DE EJECUCIÓN ({args.pacientes} pacientes en ráfaga)", filas,
+                   ['backend', 'modo', 'lote', 'p50_ms', 'p99_ms', 'pacientes/s'])
+
+    mejor = max(filas, key=lambda f: f['pacientes/s'])
+    opciones = f"--ejecutor {mejor['backend']} --modo-inferencia {mejor['modo']}"
+    if mejor['modo'] == "lotes":
+        opciones += f" --lote-max {mejor['lote']}"
+    print(f"Más rápido: {opciones} ({mejor['pacientes/s']:.0f} pacientes/s)")
+
+
+if __name__ == "__main__":
+    main()
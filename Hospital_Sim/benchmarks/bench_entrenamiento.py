@@ -0,0 +1,69 @@
+"""
+Generación de datos sintéticos: el bucle original (cinco random.randint y una
+cadena if/elif por fila) contra el generador vectorizado de modelo_entrenamiento,
+y entrenamiento secuencial contra paralelo de los dos árboles.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_entrenamiento --filas 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import modelo_entrenamiento
+from benchmarks.comun import imprimir_tabla
+
+
+def _generar_bucle(n):
+    """Réplica del bucle de generar_datos anterior (sin construir el DataFrame)."""
+    sintomas, enfermedades, prioridades = [], [], []
+    for _ in range(n):
+        fiebre, tos, dolor, fatiga, respirar = (random.randint(0, 1) for _ in range(5))
+        if respirar and fiebre:
+            enfermedad, prioridad = "COVID-19", "Crítica"
+        elif fiebre and tos:
+            enfermedad, prioridad = "Gripe", "Alta"
+        elif dolor and fatiga:
+            enfermedad, prioridad = "Infección", "Media"
+        else:
+            enfermedad, prioridad = "Común", "Baja"
+        sintomas.append([fiebre, tos, dolor, fatiga, respirar])
+        enfermedades.append(enfermedad)
+        prioridades.append(prioridad)
+    return sintomas
+
+
+def _cronometrar(funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    funcion(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--filas-entrenamiento", type=int, default=1_000_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    filas = []
+    for n in args.filas:
+        bucle = _cronometrar(_generar_bucle, n)
+        vectorizado = _cronometrar(modelo_entrenamiento.generar_datos, n, args.semilla)
+        filas.append({'filas': n, 'bucle_s': bucle, 'vectorizado_s': vectorizado, 'aceleracion': bucle / vectorizado})
+    imprimir_tabla("GENERACIÓN DE DATOS SINTÉTICOS", filas, ['filas', 'bucle_s', 'vectorizado_s', 'aceleracion'])
+
+    filas = []
+    with tempfile.TemporaryDirectory() as salida:
+        for procesos in (1, 2):
+            resultado = modelo_entrenamiento.entrenar_modelos(args.filas_entrenamiento, args.semilla, salida, procesos)
+            filas.append({'procesos': procesos, 'entrenamiento_s': resultado['tiempos']['entrenamiento'],
+                          'total_s': sum(v for k, v in resultado['tiempos'].items() if not k.startswith('arbol_'))})
+    imprimir_tabla(f"ENTRENAMIENTO ({args.filas_entrenamiento} filas, {os.cpu_count()} CPU)", filas,
+                   ['procesos', 'entrenamiento_s', 'total_s'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Eventos de estadística por segundo: el esquema original (asyncio.Lock alrededor
+de un defaultdict, llamado con await) contra estadisticas.Estadisticas en el
+hilo del event loop.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_estadisticas --eventos 1000000
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from estadisticas import Estadisticas
+from benchmarks.comun import imprimir_tabla
+
+ETAPAS = ('registro', 'triage', 'diagnostico', 'cama_asignada', 'alta', 'observacion')
+logger = logging.getLogger(__name__)
+
+
+async def _original(eventos):
+    """Réplica del actualizar_estadistica_global anterior."""
+    estadisticas = defaultdict(int)
+    lock = asyncio.Lock()
+
+    async def actualizar(etapa, cantidad=1):
+        async with lock:
+            estadisticas[etapa] += cantidad
+            logger.debug(f"Estadística '{etapa}' actualizada a {estadisticas[etapa]}")
+
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        await actualizar(ETAPAS[i % len(ETAPAS)])
+    return time.perf_counter() - inicio
+
+
+async def _bucle(eventos):
+    estadisticas = Estadisticas()
+    incrementar = estadisticas.incrementar
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        incrementar(ETAPAS[i % len(ETAPAS)])
+    duracion = time.perf_counter() - inicio
+    assert sum(estadisticas.instantanea().values()) == eventos
+    return duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    filas = []
+    for nombre, duracion in (
+        ("lock_asyncio", asyncio.run(_original(args.eventos))),
+        ("bucle_sin_lock", asyncio.run(_bucle(args.eventos))),
+    ):
+        filas.append({'variante': nombre, 'eventos': args.eventos, 'segundos': duracion,
+                      'eventos/s': args.eventos / duracion})
+    imprimir_tabla("Actualizaciones de estadísticas", filas, ['variante', 'eventos', 'segundos', 'eventos/s'])
+
+
+if __name__ == "__main__":
+    main()
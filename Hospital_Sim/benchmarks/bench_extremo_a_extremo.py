@@ -0,0 +1,168 @@
+"""
+Benchmark de extremo a extremo: simulaciones completas (simular_llegadas_async y
+flujo_paciente_async vía main.main) en tiempo virtual y con semilla fija, para
+cada combinación de número de pacientes, capacidad de camas y configuración de
+ejecución. Cada corrida se hace en un intérprete nuevo para medir su pico de
+memoria (ru_maxrss) sin arrastrar el de las anteriores.
+
+Registra pacientes/s, percentiles de latencia por etapa (segundos simulados) y
+pico de memoria, y guarda todo en JSON junto con el commit, para comparar
+resultados entre commits con --comparar.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_extremo_a_extremo --pacientes 1000 10000 100000 --json resultados.json
+    python -m benchmarks.bench_extremo_a_extremo --pacientes 10000 --json nuevo.json --comparar resultados.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.comun import imprimir_tabla
+
+DIRECTORIO_SIM = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CAPACIDADES = {
+    'defecto': {"uci": 2, "general": 3, "observacion": 2, "medicos": 4},
+    'amplia': {"uci": 8, "general": 12, "observacion": 8, "medicos": 16},
+}
+# nombre -> (modo de inferencia, backend de ejecución)
+EJECUCIONES = {
+    'tabla/en-linea': ("tabla", "en-linea"),
+    'lotes/en-linea': ("lotes", "en-linea"),
+    'lotes/procesos': ("lotes", "procesos"),
+    'ejecutor/procesos': ("ejecutor", "procesos"),
+}
+# Una regresión se marca si el rendimiento cae o el pico de memoria sube más que esto
+# (los percentiles son en tiempo simulado: con la misma semilla solo cambian si cambia el comportamiento)
+TOLERANCIA_REGRESION = 0.10
+
+
+def correr_configuracion(configuracion):
+    """Corre una simulación en este proceso y retorna sus métricas (se llama con --una)."""
+    import random
+    import resource
+    from logs import configurar_logging
+    from tiempo_virtual import ejecutar_con_tiempo_virtual
+    import main as simulacion
+
+    configurar_logging("WARNING", en_cola=False)
+    random.seed(configuracion['semilla'])
+    modo, ejecutor = EJECUCIONES[configuracion['ejecucion']]
+    resultado = ejecutar_con_tiempo_virtual(simulacion.main(
+        configuracion['pacientes'], modo, capacidades=CAPACIDADES[configuracion['capacidad']],
+        ejecutor=ejecutor, reporte=False))
+    return {
+        **configuracion,
+        'tiempo_real_s': resultado['tiempo_real'],
+        'tiempo_simulado_s': resultado['tiempo_simulado'],
+        'pacientes_por_s': configuracion['pacientes'] / resultado['tiempo_real'],
+        'altas': resultado['estadisticas'].get('alta', 0),
+        'excepciones': resultado['resumen']['excepciones'],
+        'latencias': {etapa: {k: datos[k] for k in ('total', 'promedio', 'p50', 'p95', 'p99', 'max')}
+                      for etapa, datos in resultado['latencias'].items()},
+        # En Linux ru_maxrss está en KiB; en hijos, el del trabajador más grande
+        'memoria_pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'memoria_pico_trabajador_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def _en_subproceso(configuracion):
+    proceso = subprocess.run([sys.executable, "-m", "benchmarks.bench_extremo_a_extremo",
+                              "--una", json.dumps(configuracion)],
+                             cwd=DIRECTORIO_SIM, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Falló {configuracion}:\n{proceso.stderr[-2000:]}")
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def commit_actual():
+    """Hash del commit de HEAD (con '-sucio' si hay cambios sin commitear), o None fuera de git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=DIRECTORIO_SIM, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=DIRECTORIO_SIM,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-sucio" if sucio else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _clave(resultado):
+    return (resultado['pacientes'], resultado['capacidad'], resultado['ejecucion'])
+
+
+def comparar(actuales, anteriores):
+    """Filas de comparación contra un JSON anterior (mismas configuraciones)."""
+    previos = {_clave(r): r for r in anteriores['resultados']}
+    filas = []
+    for actual in actuales:
+        previo = previos.get(_clave(actual))
+        if previo is None:
+            continue
+        rendimiento = actual['pacientes_por_s'] / previo['pacientes_por_s']
+        p99_previo = previo['latencias']['espera_cama']['p99']
+        p99 = actual['latencias']['espera_cama']['p99'] / p99_previo if p99_previo else 1.0
+        memoria = actual['memoria_pico_mb'] / previo['memoria_pico_mb']
+        regresion = rendimiento < 1 - TOLERANCIA_REGRESION or memoria > 1 + TOLERANCIA_REGRESION
+        filas.append({'pacientes': actual['pacientes'], 'capacidad': actual['capacidad'],
+                      'ejecucion': actual['ejecucion'], 'rendimiento_x': rendimiento,
+                      'p99_cama_x': p99, 'memoria_x': memoria, 'regresion': "sí" if regresion else "no"})
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--capacidades", nargs="+", choices=list(CAPACIDADES), default=list(CAPACIDADES))
+    parser.add_argument("--ejecuciones", nargs="+", choices=list(EJECUCIONES), default=list(EJECUCIONES))
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Archivo donde guardar los resultados")
+    parser.add_argument("--comparar", default=None, metavar="JSON",
+                        help="Resultados anteriores contra los que comparar")
+    parser.add_argument("--una", default=None, help=argparse.SUPPRESS) # Uso interno: una configuración
+    args = parser.parse_args()
+
+    if args.una:
+        print(json.dumps(correr_configuracion(json.loads(args.una))))
+        return
+
+    resultados = []
+    for pacientes in args.pacientes:
+        for capacidad in args.capacidades:
+            for ejecucion in args.ejecuciones:
+                resultados.append(_en_subproceso({'pacientes': pacientes, 'capacidad': capacidad,
+                                                  'ejecucion': ejecucion, 'semilla': args.semilla}))
+
+    filas = [{'pacientes': r['pacientes'], 'capacidad': r['capacidad'], 'ejecucion': r['ejecucion'],
+              'pacientes/s': r['pacientes_por_s'], 'p50_cama_s': r['latencias']['espera_cama']['p50'],
+              'p99_cama_s': r['latencias']['espera_cama']['p99'], 'memoria_mb': r['memoria_pico_mb']}
+             for r in resultados]
+    imprimir_tabla("EXTREMO A EXTREMO (tiempo virtual)", filas,
+                   ['pacientes', 'capacidad', 'ejecucion', 'pacientes/s', 'p50_cama_s', 'p99_cama_s', 'memoria_mb'])
+
+    documento = {
+        'commit': commit_actual(),
+        'fecha': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'semilla': args.semilla,
+        'resultados': resultados,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(documento, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anteriores = json.load(f)
+        imprimir_tabla(f"COMPARACIÓN CONTRA {anteriores.get('commit') or args.comparar}",
+                       comparar(resultados, anteriores),
+                       ['pacientes', 'capacidad', 'ejecucion', 'rendimiento_x', 'p99_cama_x', 'memoria_x', 'regresion'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Escalamiento de la simulación distribuida (simulacion_distribuida.py): rendimiento
+en pacientes/s según el número de fragmentos (procesos), con tiempo virtual y la
+misma carga total en cada corrida.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_fragmentos --pacientes 50000 --fragmentos 1 2 4 8
+"""
+import argparse
+import os
+
+from logs import configurar_logging
+from simulacion_distribuida import simular_distribuida
+from benchmarks.comun import imprimir_tabla
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=50_000)
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=None,
+                        help="Fragmentos a probar (por defecto 1, 2, 4... hasta el número de CPU)")
+    parser.add_argument("--modo-inferencia", default="tabla")
+    parser.add_argument("--ejecutor", default="en-linea")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    configurar_logging("WARNING", en_cola=False)
+    cpus = os.cpu_count() or 1
+    fragmentos = args.fragmentos or sorted({1, cpus} | {2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus})
+
+    filas = []
+    for n in fragmentos:
+        resultado = simular_distribuida(args.pacientes, n, semilla=args.semilla, tiempo_virtual=True,
+                                        nivel_log="WARNING", reporte=False,
+                                        modo_inferencia=args.modo_inferencia, ejecutor=args.ejecutor)
+        filas.append({'fragmentos': n, 'tiempo_s': resultado['tiempo_real'],
+                      'pacientes/s': args.pacientes / resultado['tiempo_real'],
+                      'altas': resultado['estadisticas'].get('alta', 0)})
+    for fila in filas:
+        fila['aceleracion'] = filas[0]['tiempo_s'] / fila['tiempo_s']
+    imprimir_tabla(f"SIMULACIÓN DISTRIBUIDA ({args.pacientes} pacientes, {cpus} CPU)", filas,
+                   ['fragmentos', 'tiempo_s', 'pacientes/s', 'aceleracion', 'altas'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara la latencia de triage + diagnóstico por paciente entre la ruta original
+(una ida y vuelta al ProcessPoolExecutor por etapa), los micro-lotes de
+inferencia.LoteInferencia y la tabla precalculada inferencia.TablaInferencia.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_inferencia_lotes --solicitudes 2000 --lote-max 32 --ventana-ms 5
+"""
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from paciente import Paciente
+from inferencia import crear_inferencia
+from benchmarks.comun import resumen_latencias, imprimir_tabla
+
+
+async def _medir(modo, executor, solicitudes, max_lote, ventana, intervalo):
+    inferencia = await crear_inferencia(modo, executor, max_lote, ventana)
+    latencias = []
+
+    async def un_paciente(paciente):
+        inicio = time.perf_counter()
+        paciente.prioridad = await inferencia.clasificar(paciente)
+        await inferencia.diagnosticar(paciente)
+        latencias.append(time.perf_counter() - inicio)
+
+    inicio_total = time.perf_counter()
+    tareas = []
+    for i in range(solicitudes):
+        tareas.append(asyncio.create_task(un_paciente(Paciente(i + 1))))
+        if intervalo:
+            await asyncio.sleep(intervalo)
+    await asyncio.gather(*tareas)
+    await inferencia.cerrar()
+    total = time.perf_counter() - inicio_total
+
+    fila = {'modo': modo, **resumen_latencias(latencias)}
+    fila['pacientes/s'] = solicitudes / total
+    return fila
+
+
+async def _ejecutar(args):
+    filas = []
+    with ProcessPoolExecutor(max_workers=args.trabajadores) as executor:
+        # Calentar los trabajadores para no medir la carga inicial de modelos
+        await _medir("ejecutor", executor, 50, args.lote_max, args.ventana_ms / 1000, 0)
+        for modo in ("ejecutor", "lotes", "tabla"):
+            filas.append(await _medir(modo, executor, args.solicitudes, args.lote_max,
+                                      args.ventana_ms / 1000, args.intervalo_ms / 1000))
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument("--lote-max", type=int, default=32)
+    parser.add_argument("--ventana-ms", type=float, default=5.0)
+    parser.add_argument("--intervalo-ms", type=float, default=0.0,
+                        help="Separación entre llegadas (0 = ráfaga)")
+    parser.add_argument("--trabajadores", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    filas = asyncio.run(_ejecutar(args))
+    imprimir_tabla(f"Latencia triage+diagnóstico ({args.solicitudes} pacientes)", filas,
+                   ['modo', 'n', 'p50_ms', 'p99_ms', 'max_ms', 'pacientes/s'])
+
+
+if __name__ == "__main__":
+    main()
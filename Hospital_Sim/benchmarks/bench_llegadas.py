@@ -0,0 +1,58 @@
+"""
+Fuentes de llegadas (llegadas.py): filas/s y pico de memoria al generar llegadas
+con cada modelo y al reproducir una traza CSV en streaming. La memoria debe
+mantenerse constante aunque la traza tenga decenas de millones de filas.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_llegadas --filas 1000000 10000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from llegadas import crear_llegadas, escribir_llegadas_csv, leer_llegadas_csv, TIPOS_LLEGADAS
+from benchmarks.comun import imprimir_tabla
+
+
+def _consumir(fuente):
+    """Recorre una fuente sin retener filas; retorna (filas/s, pico de memoria en MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    contador = iter(range(1, 1 << 62))
+    deque(zip(fuente, contador), maxlen=0)
+    total = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    filas = next(contador) - 1
+    return filas / total, pico / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--directorio", default=None, help="Dónde escribir las trazas (por defecto, un temporal)")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    filas = []
+    with tempfile.TemporaryDirectory(dir=args.directorio) as directorio:
+        for n in args.filas:
+            for tipo in TIPOS_LLEGADAS:
+                por_s, pico = _consumir(crear_llegadas(tipo, n))
+                filas.append({'fuente': tipo, 'filas': n, 'filas/s': por_s, 'pico_mb': pico})
+            ruta = os.path.join(directorio, f"traza_{n}.csv")
+            escribir_llegadas_csv(ruta, crear_llegadas("poisson", n))
+            por_s, pico = _consumir(leer_llegadas_csv(ruta))
+            filas.append({'fuente': "csv", 'filas': n, 'filas/s': por_s, 'pico_mb': pico,
+                          'archivo_mb': os.path.getsize(ruta) / 2 ** 20})
+            os.remove(ruta)
+    imprimir_tabla("FUENTES DE LLEGADAS", filas, ['fuente', 'filas', 'filas/s', 'pico_mb', 'archivo_mb'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Rendimiento del logging por paciente: el ColoredFormatter anterior (regex sobre
+el texto, escritura síncrona) contra logs.FormateadorConsola con la etapa y el
+paciente en `extra`, escribiendo en el hilo del llamador o vía QueueHandler.
+
+Para cada paciente se emiten los mismos mensajes INFO que el flujo real. La
+columna `llamador_s` es el tiempo que pasa el hilo que loguea (el event loop en
+la simulación); `total_s` incluye vaciar la cola.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_logging --pacientes 10000 50000
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+
+from logs import FormateadorConsola, FormateadorJSON, ManejadorCola, etapa
+from visualizacion import COLORES, COLOR_ETAPA, EMOJI_ETAPA, EtapaPaciente
+from benchmarks.comun import imprimir_tabla
+
+# (etapa, mensaje) emitidos por un paciente típico a nivel INFO
+MENSAJES = (
+    ('simulacion', "Paciente llega al hospital."),
+    ('simulacion', "Iniciando flujo..."),
+    ('registro', "Registrado en 1.21s | Avg: 1.25s"),
+    ('triage', "Iniciando triaje..."),
+    ('triage', "Prioridad Media"),
+    ('diagnostico', "Iniciando diagnóstico..."),
+    ('cama', "Esperando cama disponible..."),
+    ('cama', "Cama asignada (general) - Esperando médico"),
+    ('cama', "Médico asignado - Iniciando tratamiento"),
+    ('tratamiento', "Tratamiento completado en 3.4s"),
+    ('seguimiento', "Iniciando etapa de seguimiento..."),
+    ('seguimiento', "Resultado: estable (2.1s)"),
+    ('alta', "Alta médica completada"),
+    ('simulacion', "Flujo completado con estado final 'alta'."),
+)
+
+
+class _FormateadorLegado(logging.Formatter):
+    """Copia congelada de main.ColoredFormatter antes de logs.py."""
+
+    LOG_FORMAT = "%(message)s"
+
+    def __init__(self, fmt=LOG_FORMAT):
+        super().__init__(fmt)
+        self.fmt = fmt
+        self.time_fmt = "%H:%M:%S.%f"[:-3]
+
+    def formatTime(self, record, datefmt=None):
+        ct = self.converter(record.created)
+        t = time.strftime(self.time_fmt, ct)
+        s = "%s,%03d" % (t, record.msecs)
+        return f"{COLORES['orange']}{s}{COLORES['reset']}"
+
+    def format(self, record):
+        original_message = super().format(record)
+        match = re.match(r"Paciente (\d+) \[([A-Z_]+)\]: (.*)", original_message)
+
+        etapa_key = 'simulacion'
+        paciente_id = None
+        mensaje_limpio = original_message
+
+        if match:
+            paciente_id = match.group(1)
+            etapa_mayusculas = match.group(2)
+            mensaje_limpio = match.group(3)
+            etapa_key = etapa_mayusculas.lower()
+            if etapa_key not in COLOR_ETAPA and etapa_mayusculas.lower() in map(str.lower, EtapaPaciente.__args__):
+                etapa_key = etapa_mayusculas.lower()
+            elif etapa_mayusculas.lower() not in map(str.lower, EtapaPaciente.__args__):
+                if record.levelno >= logging.ERROR:
+                    etapa_key = 'error'
+                else:
+                    etapa_key = 'simulacion'
+
+        color = COLOR_ETAPA.get(etapa_key, COLORES['reset'])
+        emoji = EMOJI_ETAPA.get(etapa_key, '')
+        level_name = record.levelname
+
+        is_error_or_generic = (
+            not match or
+            record.levelno >= logging.ERROR or
+            etapa_key in ['error', 'error_registro', 'error_diagnostico', 'error_cama', 'error_seguimiento', 'error_desconocido',
+                          'flujo_cancelado', 'registro_cancelado', 'cama_cancelada', 'seguimiento_cancelado', 'error_triage',
+                          'error_ejecutor_diagnostico', 'error_ejecutor_cama', 'error_ejecutor_seguimiento']
+        )
+
+        if is_error_or_generic:
+            error_color = COLOR_ETAPA.get(etapa_key if etapa_key in COLOR_ETAPA else 'error', COLORES['red'])
+            error_emoji = EMOJI_ETAPA.get(etapa_key if etapa_key in EMOJI_ETAPA else 'error', '❌')
+            formatted_message = f"{error_emoji} [{level_name}] {error_color}{original_message}{COLORES['reset']}"
+        else:
+            paciente_part = f" Paciente {paciente_id}" if paciente_id else ""
+            formatted_message = f"{emoji} [{level_name}] {color}{paciente_part} [{etapa_mayusculas}]{COLORES['reset']}: {mensaje_limpio}"
+
+        return f"{self.formatTime(record)} {formatted_message}"
+
+
+def _logger(manejadores):
+    logger = logging.getLogger("bench_logging")
+    logger.handlers = list(manejadores)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _emitir_legado(logger, pacientes):
+    for paciente_id in range(1, pacientes + 1):
+        for nombre, mensaje in MENSAJES:
+            logger.info(f"Paciente {paciente_id} [{nombre.upper()}]: {mensaje}")
+
+
+def _emitir_estructurado(logger, pacientes):
+    for paciente_id in range(1, pacientes + 1):
+        for nombre, mensaje in MENSAJES:
+            logger.info(mensaje, extra=etapa(nombre, paciente_id))
+
+
+def _sincrono(formateador, emitir, pacientes, salida):
+    manejador = logging.StreamHandler(salida)
+    manejador.setFormatter(formateador)
+    logger = _logger([manejador])
+    inicio = time.perf_counter()
+    emitir(logger, pacientes)
+    manejador.flush()
+    duracion = time.perf_counter() - inicio
+    return duracion, duracion
+
+
+def _en_cola(destinos, pacientes):
+    cola = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(cola, *destinos, respect_handler_level=True)
+    logger = _logger([ManejadorCola(cola)])
+    listener.start()
+    inicio = time.perf_counter()
+    _emitir_estructurado(logger, pacientes)
+    llamador = time.perf_counter() - inicio
+    listener.stop()
+    return llamador, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, nargs="+", default=[10000])
+    args = parser.parse_args()
+
+    filas = []
+    with open(os.devnull, "w", encoding="utf-8") as salida:
+        for n in args.pacientes:
+            registros = n * len(MENSAJES)
+            casos = {
+                'legado': _sincrono(_FormateadorLegado(), _emitir_legado, n, salida),
+                'extra': _sincrono(FormateadorConsola(), _emitir_estructurado, n, salida),
+            }
+            consola = logging.StreamHandler(salida)
+            consola.setFormatter(FormateadorConsola())
+            casos['extra+cola'] = _en_cola([consola], n)
+            json_lineas = logging.StreamHandler(salida)
+            json_lineas.setFormatter(FormateadorJSON())
+            casos['extra+cola+json'] = _en_cola([consola, json_lineas], n)
+
+            for nombre, (llamador, total) in casos.items():
+                filas.append({'pacientes': n, 'modo': nombre, 'llamador_s': llamador, 'total_s': total,
+                              'registros/s': registros / total, 'us/reg llamador': llamador / registros * 1e6})
+
+    imprimir_tabla("THROUGHPUT DE LOGGING (salida a /dev/null)", filas,
+                   ['pacientes', 'modo', 'llamador_s', 'total_s', 'registros/s', 'us/reg llamador'])
+
+
+if __name__ == "__main__":
+    main()
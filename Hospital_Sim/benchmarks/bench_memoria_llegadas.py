@@ -0,0 +1,55 @@
+"""
+Pico de memoria (RSS) de la simulación según el número de pacientes, con y sin
+ventana de pacientes en vuelo (--max-en-vuelo). Cada corrida se hace en un
+proceso nuevo y en tiempo virtual para que el pico sea comparable.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_memoria_llegadas --pacientes 10000 50000 100000 --ventanas 0 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.comun import imprimir_tabla
+
+DIRECTORIO_SIM = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CODIGO = """
+import contextlib, io, json, logging, random, resource, sys
+import main as simulacion
+from tiempo_virtual import ejecutar_con_tiempo_virtual
+logging.getLogger().setLevel(logging.WARNING)
+random.seed({semilla})
+with contextlib.redirect_stdout(io.StringIO()):
+    r = ejecutar_con_tiempo_virtual(simulacion.main({pacientes}, max_en_vuelo={ventana}))
+print(json.dumps({{'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'real_s': r['tiempo_real'], 'max_en_vuelo': r['resumen']['max_en_vuelo']}}))
+"""
+
+
+def correr(pacientes, ventana, semilla):
+    codigo = _CODIGO.format(pacientes=pacientes, ventana=ventana, semilla=semilla)
+    proceso = subprocess.run([sys.executable, "-W", "ignore", "-c", codigo], cwd=DIRECTORIO_SIM,
+                             capture_output=True, text=True, check=True)
+    datos = json.loads(proceso.stdout.strip().splitlines()[-1])
+    return {'pacientes': pacientes, 'ventana': ventana or 'sin límite', 'en_vuelo_max': datos['max_en_vuelo'],
+            'rss_pico_mb': datos['rss_mb'], 'real_s': datos['real_s']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--ventanas", type=int, nargs="+", default=[0, 1000],
+                        help="Valores de --max-en-vuelo a comparar (0 = sin límite)")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    filas = [correr(n, v, args.semilla) for v in args.ventanas for n in args.pacientes]
+    imprimir_tabla("Pico de RSS vs. número de pacientes", filas,
+                   ['pacientes', 'ventana', 'en_vuelo_max', 'rss_pico_mb', 'real_s'])
+
+
+if __name__ == "__main__":
+    main()
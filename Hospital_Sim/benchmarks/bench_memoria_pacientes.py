@@ -0,0 +1,81 @@
+"""
+Memoria por paciente y bytes enviados al executor: la clase Paciente anterior
+(__dict__ + diccionario de síntomas + cadenas) contra el Paciente compacto
+(__slots__, máscara de síntomas, códigos IntEnum) y PacienteBatch (arreglo
+estructurado de NumPy).
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_memoria_pacientes --pacientes 100000
+"""
+import argparse
+import pickle
+import random
+import tracemalloc
+
+import numpy  # noqa: F401 (importado antes de medir, para no contar el import en PacienteBatch)
+
+from paciente import Paciente, PacienteBatch
+from benchmarks.comun import imprimir_tabla
+
+
+class _PacienteLegado:
+    """Copia congelada de paciente.Paciente antes de la representación compacta."""
+
+    def __init__(self, id, sintomas=None):
+        self.id = id
+        self.sintomas = sintomas if sintomas else self.generar_sintomas()
+        self.prioridad = None
+        self.diagnostico = None
+        self.estado = "registrado"
+
+    def generar_sintomas(self):
+        return {
+            "fiebre": random.randint(0, 1),
+            "tos": random.randint(0, 1),
+            "dolor": random.randint(0, 1),
+            "fatiga": random.randint(0, 1),
+            "respirar": random.randint(0, 1)
+        }
+
+
+def _completar(pacientes):
+    # Valores típicos tras triage y diagnóstico
+    for paciente in pacientes:
+        paciente.prioridad = "Media"
+        paciente.diagnostico = "Gripe"
+        paciente.estado = "diagnosticado"
+    return pacientes
+
+
+def _medir(construir):
+    tracemalloc.start()
+    objeto = construir()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, actual
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.pacientes
+
+    legado, bytes_legado = _medir(lambda: _completar([_PacienteLegado(i + 1) for i in range(n)]))
+    compacto, bytes_compacto = _medir(lambda: _completar([Paciente(i + 1) for i in range(n)]))
+    lote, bytes_lote = _medir(lambda: PacienteBatch.desde_pacientes(compacto))
+
+    filas = [
+        {'representacion': 'Paciente anterior', 'bytes/paciente': bytes_legado / n,
+         'pickle/paciente': len(pickle.dumps(legado[0]))},
+        {'representacion': 'Paciente __slots__', 'bytes/paciente': bytes_compacto / n,
+         'pickle/paciente': len(pickle.dumps(compacto[0]))},
+        {'representacion': 'PacienteBatch', 'bytes/paciente': bytes_lote / n,
+         'pickle/paciente': len(pickle.dumps(lote.datos)) / n},
+    ]
+    imprimir_tabla(f"MEMORIA POR PACIENTE ({n} pacientes)", filas,
+                   ['representacion', 'bytes/paciente', 'pickle/paciente'])
+
+
+if __name__ == "__main__":
+    main()
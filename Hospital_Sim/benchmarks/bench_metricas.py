@@ -0,0 +1,59 @@
+"""
+Costo de registrar latencias: la lista original (append + sum/len por registro,
+O(n) por paciente) contra metricas.HistogramaLatencia (O(1), memoria constante),
+y error relativo de los percentiles del histograma frente a los exactos.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_metricas --registros 20000 50000
+"""
+import argparse
+import random
+import time
+
+from metricas import HistogramaLatencia
+from benchmarks.comun import imprimir_tabla, percentil
+
+
+def _lista(valores):
+    """Réplica del registro anterior: append y promedio completo en cada paciente."""
+    tiempos = []
+    inicio = time.perf_counter()
+    for valor in valores:
+        tiempos.append(valor)
+        sum(tiempos) / len(tiempos)
+    return time.perf_counter() - inicio
+
+
+def _histograma(valores):
+    histograma = HistogramaLatencia()
+    inicio = time.perf_counter()
+    for valor in valores:
+        histograma.registrar(valor)
+        histograma.media
+    return time.perf_counter() - inicio, histograma
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, nargs="+", default=[10000, 20000, 50000])
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    filas = []
+    for n in args.registros:
+        # Distribución con cola larga, parecida a las esperas de cama
+        valores = [rng.lognormvariate(0, 1.5) for _ in range(n)]
+        t_lista = _lista(valores)
+        t_hist, histograma = _histograma(valores)
+        error = max(abs(histograma.percentil(q) - percentil(valores, q)) / percentil(valores, q)
+                    for q in (50, 95, 99))
+        filas.append({'registros': n, 'lista_s': t_lista, 'histograma_s': t_hist,
+                      'aceleracion': t_lista / t_hist, 'error_pct_max': error * 100})
+
+    imprimir_tabla("REGISTRO DE LATENCIAS: LISTA vs HISTOGRAMA", filas,
+                   ['registros', 'lista_s', 'histograma_s', 'aceleracion', 'error_pct_max'])
+
+
+if __name__ == "__main__":
+    main()
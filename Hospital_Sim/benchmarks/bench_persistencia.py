@@ -0,0 +1,65 @@
+"""
+Rendimiento del registro persistente (persistencia.RegistroPersistente): registros
+por segundo y latencia del acuse según el tamaño máximo del lote de group commit.
+Con lote 1 cada registro es su propia transacción (un fsync del WAL por paciente).
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_persistencia --pacientes 20000 --lotes 1 16 128 1024
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from paciente import Paciente
+from persistencia import RegistroPersistente
+from benchmarks.comun import resumen_latencias, imprimir_tabla
+
+
+async def _medir(ruta, pacientes, lote, espera, concurrencia):
+    registro = RegistroPersistente()
+    registro.abrir(ruta, lote, espera)
+    latencias = []
+    siguiente = iter(range(1, pacientes + 1))
+
+    async def cliente():
+        # Cada cliente registra pacientes uno tras otro, como flujos concurrentes del hospital
+        for id in siguiente:
+            paciente = Paciente(id)
+            inicio = time.perf_counter()
+            await registro.registrar(paciente)
+            registro.transicion(paciente, 'registro')
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio_total = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    await registro.cerrar()
+    total = time.perf_counter() - inicio_total
+    return {**resumen_latencias(latencias), 'registros/s': pacientes / total,
+            'transacciones': registro.lotes, 'filas/tx': registro.filas / max(registro.lotes, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=20_000)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 16, 128, 1024])
+    parser.add_argument("--espera-ms", type=float, default=2.0,
+                        help="Espera máxima del escritor para completar un lote")
+    parser.add_argument("--concurrencia", type=int, default=1000,
+                        help="Flujos que registran pacientes a la vez")
+    parser.add_argument("--directorio", default=None, help="Dónde crear las bases (por defecto, un temporal)")
+    args = parser.parse_args()
+
+    filas = []
+    with tempfile.TemporaryDirectory(dir=args.directorio) as directorio:
+        for lote in args.lotes:
+            ruta = os.path.join(directorio, f"registro_{lote}.db")
+            fila = asyncio.run(_medir(ruta, args.pacientes, lote, args.espera_ms / 1000, args.concurrencia))
+            filas.append({'lote': lote, **fila})
+    imprimir_tabla(f"REGISTRO PERSISTENTE ({args.pacientes} pacientes, {args.concurrencia} concurrentes)", filas,
+                   ['lote', 'registros/s', 'p50_ms', 'p99_ms', 'transacciones', 'filas/tx'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Distribución del tiempo de espera por cama según la prioridad de triage, bajo
+carga, comparando el asyncio.Semaphore FIFO original con PlanificadorPrioridad
+(con y sin envejecimiento). Corre en tiempo virtual y no necesita los modelos.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_planificador_camas --pacientes 20000 --camas 3 --carga 1.1
+"""
+import argparse
+import asyncio
+import random
+
+from asignacion_recursos import PlanificadorPrioridad, PRIORIDAD_NUMERICA
+from tiempo_virtual import ejecutar_con_tiempo_virtual
+from benchmarks.comun import percentil, imprimir_tabla
+
+# Proporción aproximada de cada prioridad con síntomas binarios uniformes
+PESOS_PRIORIDAD = {"Crítica": 0.25, "Alta": 0.19, "Media": 0.14, "Baja": 0.42}
+TRATAMIENTO = (2, 5) # segundos, igual que asignar_cama_async
+
+
+class _SolicitudFIFO:
+    """Adaptador para usar asyncio.Semaphore con la misma interfaz que PlanificadorPrioridad."""
+
+    def __init__(self, capacidad):
+        self.semaforo = asyncio.Semaphore(capacidad)
+
+    def solicitar(self, nivel):
+        return self.semaforo
+
+
+async def _simular(recurso, pacientes, camas, carga, semilla):
+    rng = random.Random(semilla)
+    loop = asyncio.get_running_loop()
+    esperas = {prioridad: [] for prioridad in PRIORIDAD_NUMERICA}
+    # Tasa de llegada = carga * tasa de servicio total
+    media_llegadas = (sum(TRATAMIENTO) / 2) / camas / carga
+
+    async def paciente(prioridad):
+        llegada = loop.time()
+        async with recurso.solicitar(PRIORIDAD_NUMERICA[prioridad]):
+            esperas[prioridad].append(loop.time() - llegada)
+            await asyncio.sleep(rng.uniform(*TRATAMIENTO))
+
+    tareas = []
+    prioridades, pesos = list(PESOS_PRIORIDAD), list(PESOS_PRIORIDAD.values())
+    for _ in range(pacientes):
+        tareas.append(asyncio.create_task(paciente(rng.choices(prioridades, pesos)[0])))
+        await asyncio.sleep(rng.expovariate(1 / media_llegadas))
+    await asyncio.gather(*tareas)
+    return esperas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=20000)
+    parser.add_argument("--camas", type=int, default=3)
+    parser.add_argument("--carga", type=float, default=0.95,
+                        help="Tasa de llegadas / capacidad de servicio (>1 = saturado)")
+    parser.add_argument("--envejecimiento", type=float, default=30.0)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    variantes = {
+        'fifo': lambda: _SolicitudFIFO(args.camas),
+        'prioridad': lambda: PlanificadorPrioridad(args.camas, float('inf')),
+        f'envej_{args.envejecimiento:g}s': lambda: PlanificadorPrioridad(args.camas, args.envejecimiento),
+    }
+    filas = []
+    for nombre, crear in variantes.items():
+        async def correr():
+            return await _simular(crear(), args.pacientes, args.camas, args.carga, args.semilla)
+        esperas = ejecutar_con_tiempo_virtual(correr())
+        for prioridad, valores in esperas.items():
+            filas.append({'planificador': nombre, 'prioridad': prioridad, 'n': len(valores),
+                          'p50_s': percentil(valores, 50), 'p95_s': percentil(valores, 95),
+                          'max_s': max(valores, default=0.0)})
+
+    imprimir_tabla(f"Espera por cama ({args.pacientes} pacientes, {args.camas} camas, carga {args.carga:g})",
+                   filas, ['planificador', 'prioridad', 'n', 'p50_s', 'p95_s', 'max_s'])
+
+
+if __name__ == "__main__":
+    main()
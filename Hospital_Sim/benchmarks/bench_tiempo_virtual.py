@@ -0,0 +1,46 @@
+"""
+Compara el tiempo real (de pared) contra el tiempo simulado en modo --tiempo-virtual.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_tiempo_virtual --pacientes 1000 10000 100000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import random
+
+import main as simulacion
+from tiempo_virtual import ejecutar_con_tiempo_virtual
+from benchmarks.comun import imprimir_tabla
+
+
+def correr(num_pacientes, semilla, modo_inferencia):
+    """Ejecuta una simulación completa en tiempo virtual y retorna sus tiempos."""
+    random.seed(semilla)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tiempos = ejecutar_con_tiempo_virtual(simulacion.main(num_pacientes, modo_inferencia))
+    return {
+        'pacientes': num_pacientes,
+        'real_s': tiempos['tiempo_real'],
+        'simulado_s': tiempos['tiempo_simulado'],
+        'aceleracion': tiempos['tiempo_simulado'] / tiempos['tiempo_real'],
+        'pacientes/s': num_pacientes / tiempos['tiempo_real'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--modo-inferencia", default="tabla", choices=["tabla", "lotes", "ejecutor"])
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    filas = [correr(n, args.semilla, args.modo_inferencia) for n in args.pacientes]
+    imprimir_tabla("Tiempo real vs. tiempo simulado", filas,
+                   ['pacientes', 'real_s', 'simulado_s', 'aceleracion', 'pacientes/s'])
+
+
+if __name__ == "__main__":
+    main()
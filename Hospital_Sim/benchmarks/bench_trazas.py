@@ -0,0 +1,64 @@
+"""
+Sobrecosto de las trazas: costo por llamada de Trazador.registrar desactivado y
+activado, y una simulación completa en tiempo virtual sin trazas y con trazas.
+
+Uso (desde Hospital_Sim/):
+    python -m benchmarks.bench_trazas --pacientes 5000 --modo-inferencia lotes
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+
+import main as simulacion
+from tiempo_virtual import ejecutar_con_tiempo_virtual
+from trazas import Trazador
+from benchmarks.comun import imprimir_tabla
+
+
+def _por_llamada(activo, llamadas):
+    trazador = Trazador()
+    trazador.configurar(activo)
+    inicio = time.perf_counter()
+    for i in range(llamadas):
+        trazador.registrar('registro', i, 0.0, 1.0)
+    return (time.perf_counter() - inicio) / llamadas * 1e9
+
+
+def _simulacion(num_pacientes, modo_inferencia, semilla, traza):
+    random.seed(semilla)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tiempos = ejecutar_con_tiempo_virtual(simulacion.main(num_pacientes, modo_inferencia, traza=traza))
+    return tiempos['tiempo_real']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=5000)
+    parser.add_argument("--modo-inferencia", default="lotes", choices=["tabla", "lotes", "ejecutor"])
+    parser.add_argument("--llamadas", type=int, default=1_000_000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    imprimir_tabla("Trazador.registrar (ns por llamada)", [
+        {'trazas': 'desactivadas', 'ns/llamada': _por_llamada(False, args.llamadas)},
+        {'trazas': 'activadas', 'ns/llamada': _por_llamada(True, args.llamadas)},
+    ], ['trazas', 'ns/llamada'])
+
+    with tempfile.TemporaryDirectory() as directorio:
+        sin_trazas = _simulacion(args.pacientes, args.modo_inferencia, args.semilla, None)
+        con_trazas = _simulacion(args.pacientes, args.modo_inferencia, args.semilla,
+                                 os.path.join(directorio, "traza.json"))
+    imprimir_tabla(f"Simulación de {args.pacientes} pacientes ({args.modo_inferencia}, tiempo virtual)", [
+        {'trazas': 'desactivadas', 'real_s': sin_trazas, 'sobrecosto_%': 0.0},
+        {'trazas': 'activadas', 'real_s': con_trazas, 'sobrecosto_%': (con_trazas / sin_trazas - 1) * 100},
+    ], ['trazas', 'real_s', 'sobrecosto_%'])
+
+
+if __name__ == "__main__":
+    main()
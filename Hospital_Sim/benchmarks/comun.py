@@ -0,0 +1,42 @@
+# Utilidades compartidas por los benchmarks
+import math
+import warnings
+
+# Los .pkl del repositorio pueden venir de otra versión de sklearn: se ignora solo ese
+# aviso (sklearn.exceptions.InconsistentVersionWarning). Se reconoce por su mensaje para
+# no importar sklearn aquí, lo que inflaría la memoria y el arranque que miden los benchmarks
+warnings.filterwarnings("ignore", message="Trying to unpickle estimator", category=UserWarning)
+
+
+def percentil(valores, q):
+    """Percentil q (0-100) por rango más cercano sobre una lista de valores."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(q / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def resumen_latencias(valores):
+    """Resumen p50/p99/max en milisegundos de una lista de latencias en segundos."""
+    return {
+        'n': len(valores),
+        'p50_ms': percentil(valores, 50) * 1000,
+        'p99_ms': percentil(valores, 99) * 1000,
+        'max_ms': (max(valores) if valores else 0.0) * 1000,
+    }
+
+
+def imprimir_tabla(titulo, filas, columnas):
+    """Imprime una tabla simple con las columnas indicadas de cada fila (dict)."""
+    print("\n" + "=" * 72)
+    print(titulo.center(72))
+    print("=" * 72)
+    print(" | ".join(f"{c:>14}" for c in columnas))
+    for fila in filas:
+        celdas = []
+        for c in columnas:
+            valor = fila.get(c, '')
+            celdas.append(f"{valor:>14.3f}" if isinstance(valor, float) else f"{str(valor):>14}")
+        print(" | ".join(celdas))
+    print("=" * 72)
@@ -1,47 +1,92 @@
-import joblib
-import pandas as pd
 import logging # Importar logging
+from paciente import vector_sintomas
+from modelos import cargar_arbol, directorio_modelos, modo_mmap
+from logs import etapa
 
 # Configurar un logger
 logger = logging.getLogger(__name__)
 
-# Cargar modelo pre-entrenado
-try:
-    modelo_diagnostico = joblib.load("modelo_diagnostico.pkl")
-    label_enfermedad = joblib.load("label_enfermedad.pkl")
-    logger.info("Modelos de diagnóstico cargados exitosamente.")
-except FileNotFoundError:
-     logger.critical("Modelos de diagnóstico no encontrados. Ejecute modelo_entrenamiento.py primero.", exc_info=True)
-     raise ImportError("Modelos de diagnóstico no encontrados. Ejecute modelo_entrenamiento.py primero")
-except Exception as e:
-    logger.critical(f"Error al cargar modelos de diagnóstico: {type(e).__name__} - {str(e)}", exc_info=True)
-    raise # Re-lanzar la excepción
+arbol_diagnostico = None # ArbolPlano que sirve todas las predicciones
+_origen_modelos = None # (directorio, mmap_mode) de los modelos cargados
 
 
-def diagnosticar_sincrono(sintomas):
-    df = pd.DataFrame([sintomas])
-    codigo = modelo_diagnostico.predict(df)[0]
-    return label_enfermedad.inverse_transform([codigo])[0]
+def cargar_modelos(forzar=False):
+    """
+    Carga el modelo de diagnóstico desde el directorio configurado en modelos.py
+    (ver modelos.cargar_arbol).
+    No hace nada si ya están cargados desde el mismo origen, salvo con forzar=True.
+    """
+    global arbol_diagnostico, _origen_modelos
+    origen = (directorio_modelos(), modo_mmap())
+    if not forzar and _origen_modelos == origen:
+        return
+    arbol_diagnostico = cargar_arbol("diagnostico")
+    _origen_modelos = origen
+
+
+def obtener_modelos():
+    """
+    Accesor perezoso del árbol de diagnóstico (ArbolPlano).
+    La carga ocurre en la primera inferencia, no al importar el módulo.
+    """
+    if arbol_diagnostico is None:
+        cargar_modelos()
+    return arbol_diagnostico
+
+
+def _arbol(modelos):
+    return modelos.diagnostico if modelos is not None else obtener_modelos()
+
+
+def diagnosticar_matriz(matriz, modelos=None):
+    """
+    Ruta rápida de inferencia: recorre el árbol plano con NumPy, un nivel por iteración.
+
+    Args:
+        matriz: Fila (5,) o arreglo (n, 5) con los síntomas en el orden de COLUMNAS_SINTOMAS
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
+    Returns:
+        Arreglo NumPy con el diagnóstico (texto) de cada fila
+    """
+    return _arbol(modelos).predecir_lote(matriz)
+
+
+def diagnosticar_sincrono(sintomas, modelos=None):
+    return _arbol(modelos).predecir_fila(vector_sintomas(sintomas))
+
+
+def diagnosticar_lote(matriz, modelos=None):
+    """
+    Diagnostica varios pacientes con una sola pasada por el árbol.
+
+    Args:
+        matriz: Arreglo (n, 5) con los síntomas en el orden de COLUMNAS_SINTOMAS
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
+    Returns:
+        Lista con el diagnóstico de cada fila
+    """
+    return diagnosticar_matriz(matriz, modelos).tolist()
 
 
-def diagnosticar_paciente_sincrono(paciente):
+def diagnosticar_paciente_sincrono(paciente, modelos=None):
     """
     Realiza diagnóstico para un solo paciente y actualiza su estado.
     Diseñado para ejecutarse en un executor (síncrono).
 
     Args:
         paciente: Objeto Paciente
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
     Returns:
         Objeto Paciente con diagnóstico actualizado
     """
     try:
-        paciente.diagnostico = diagnosticar_sincrono(paciente.sintomas)
+        paciente.diagnostico = diagnosticar_sincrono(paciente.sintomas, modelos)
         paciente.estado = "diagnosticado"
         # El log se hará en main.py después de obtener el resultado
         # logger.info(f"Paciente {paciente.id} [DIAGNOSTICO]: {paciente.diagnostico}")
         return paciente
     except Exception as e:
-         logger.error(f"Paciente {paciente.id} [ERROR]: Error en diagnóstico: {type(e).__name__} - {e}", exc_info=True)
+         logger.error(f"Error en diagnóstico: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error', paciente.id))
          paciente.estado = "error_diagnostico"
          return paciente # Retornar paciente incluso con error
 
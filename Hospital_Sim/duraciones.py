@@ -0,0 +1,56 @@
+import math
+import random
+
+# Rangos (mínimo, máximo) en segundos de las etapas con duración simulada
+RANGOS_DEFECTO = {
+    'registro': (0.5, 2.0),    # Latencia de red/DB del registro (sin --bd)
+    'tratamiento': (2.0, 5.0), # Tratamiento con cama y médico asignados
+    'seguimiento': (1.0, 3.0), # Latencia del seguimiento
+    'observacion': (1.0, 3.0), # Observación adicional antes del alta
+}
+DISTRIBUCIONES = ("uniforme", "exponencial", "lognormal")
+DISTRIBUCION_DEFECTO = "uniforme"
+SIGMA_LOGNORMAL = 0.5 # Coeficiente de variación ~0.53
+
+
+class DuracionesEtapa:
+    """
+    Distribución de las duraciones simuladas de cada etapa.
+
+    Todas las distribuciones tienen la media del rango de RANGOS_DEFECTO multiplicada
+    por `escala`, así que cambiar de distribución cambia la variabilidad sin cambiar
+    la carga media. 'uniforme' hace exactamente los mismos sorteos que antes de
+    poder elegirla, y las corridas con semilla no cambian.
+    """
+
+    def __init__(self):
+        self.configurar()
+
+    def configurar(self, distribucion=DISTRIBUCION_DEFECTO, escala=1.0):
+        """
+        Args:
+            distribucion: 'uniforme', 'exponencial' (misma media) o 'lognormal' (misma media, sigma SIGMA_LOGNORMAL)
+            escala: Factor sobre todas las duraciones
+        """
+        if distribucion not in DISTRIBUCIONES:
+            raise ValueError(f"Distribución de tiempos desconocida '{distribucion}'; use una de {DISTRIBUCIONES}")
+        if not escala > 0:
+            raise ValueError(f"Escala de tiempos inválida: {escala}")
+        self.distribucion = distribucion
+        self.escala = escala
+        self._rangos = {nombre: (minimo * escala, maximo * escala)
+                        for nombre, (minimo, maximo) in RANGOS_DEFECTO.items()}
+        self._medias = {nombre: (minimo + maximo) / 2 for nombre, (minimo, maximo) in self._rangos.items()}
+
+    def muestrear(self, etapa):
+        """Duración en segundos de una ejecución de la etapa."""
+        if self.distribucion == "uniforme":
+            return random.uniform(*self._rangos[etapa])
+        media = self._medias[etapa]
+        if self.distribucion == "exponencial":
+            return random.expovariate(1 / media)
+        return random.lognormvariate(math.log(media) - SIGMA_LOGNORMAL ** 2 / 2, SIGMA_LOGNORMAL)
+
+
+# Duraciones de la simulación (main.py las configura en cada corrida)
+duraciones = DuracionesEtapa()
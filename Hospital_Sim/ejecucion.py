@@ -0,0 +1,92 @@
+import os
+import sys
+import logging # Importar logging
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from modelos import inicializar_trabajador
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+# Backends para las llamadas CPU bound (triage, diagnóstico, tablas de inferencia)
+BACKENDS = ("procesos", "hilos", "hilos-libres", "en-linea")
+BACKEND_DEFECTO = "procesos"
+MAX_HILOS_DEFECTO = 4 # Con GIL, más hilos solo agregan cambios de contexto
+
+
+def gil_activo():
+    """True salvo en un intérprete free-threaded (PEP 703) con el GIL desactivado."""
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class EjecutorEnLinea(Executor):
+    """
+    Executor que ejecuta cada tarea en el momento, en el hilo que la envía.
+
+    Con el event loop como único hilo, la inferencia corre en línea sin IPC ni
+    cambios de hilo; conviene cuando cada tarea dura microsegundos (árbol plano,
+    tabla precalculada) y el costo de enviarla a otro proceso domina.
+    """
+
+    def __init__(self, initializer=None, initargs=()):
+        self._cerrado = False
+        if initializer is not None:
+            initializer(*initargs)
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self._cerrado:
+            raise RuntimeError("No se pueden enviar tareas a un executor cerrado")
+        futuro = Future()
+        try:
+            futuro.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            futuro.set_exception(e)
+        return futuro
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._cerrado = True
+
+
+def crear_ejecutor(backend=BACKEND_DEFECTO, trabajadores=None, max_tareas_por_hijo=None,
+                   directorio=None, mmap_mode=None):
+    """
+    Crea el executor de las llamadas CPU bound; cada trabajador carga los modelos al iniciar.
+
+    Los hilos de un pool comparten los modelos del proceso. Las tareas versionadas
+    reciben los de su versión desde el caché de modelos.asegurar_modelos, que nunca
+    reemplaza los modelos de una versión ya cargada, así que un cambio de versión no
+    altera a las tareas de otros hilos que ya están corriendo.
+
+    Args:
+        backend: 'procesos' (ProcessPoolExecutor), 'hilos' (ThreadPoolExecutor; útil cuando
+                 NumPy/sklearn liberan el GIL en lotes grandes), 'hilos-libres' (un hilo por CPU,
+                 pensado para Python free-threaded) o 'en-linea' (sin pool, en el event loop)
+        trabajadores: Procesos o hilos del pool (None = valor por defecto del backend)
+        max_tareas_por_hijo: Tareas tras las que se reemplaza cada proceso (solo 'procesos')
+        directorio: Directorio de modelos para el inicializador
+        mmap_mode: Modo de memory-mapping de los modelos
+    Returns:
+        concurrent.futures.Executor (usable como context manager)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de ejecución desconocido: {backend}; use uno de {BACKENDS}")
+    if trabajadores is not None and trabajadores < 1:
+        raise ValueError("trabajadores debe ser al menos 1")
+    if max_tareas_por_hijo is not None and backend != "procesos":
+        raise ValueError("max_tareas_por_hijo solo aplica al backend 'procesos'")
+    nivel_log = logging.getLevelName(logging.getLogger().getEffectiveLevel()) # Para trabajadores creados con spawn
+    inicializacion = {'initializer': inicializar_trabajador, 'initargs': (directorio, mmap_mode, nivel_log)}
+
+    if backend == "procesos":
+        # Con max_tasks_per_child, Python usa 'spawn': los procesos nuevos vuelven a cargar los modelos
+        return ProcessPoolExecutor(max_workers=trabajadores, max_tasks_per_child=max_tareas_por_hijo,
+                                   **inicializacion)
+    if backend == "hilos":
+        return ThreadPoolExecutor(max_workers=trabajadores or min(MAX_HILOS_DEFECTO, os.cpu_count() or 1),
+                                  thread_name_prefix="inferencia", **inicializacion)
+    if backend == "hilos-libres":
+        if gil_activo():
+            logger.warning("El intérprete tiene el GIL activo: 'hilos-libres' no ejecutará en paralelo "
+                           "el código Python puro (use un build free-threaded, p. ej. python3.13t)")
+        return ThreadPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1,
+                                  thread_name_prefix="inferencia-libre", **inicializacion)
+    return EjecutorEnLinea(**inicializacion)
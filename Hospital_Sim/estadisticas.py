@@ -0,0 +1,35 @@
+from collections import defaultdict
+
+
+class Estadisticas:
+    """
+    Contadores de eventos por etapa sin lock.
+
+    - Todas las etapas corren en el hilo del event loop, así que `incrementar` es
+      un simple `dict[clave] += n`: las corrutinas no se intercalan dentro de esa
+      operación y no hace falta ningún lock.
+    - Otros procesos (trabajadores, fragmentos de simulación) envían su
+      `instantanea()` y se suman con `fusionar`.
+    """
+
+    def __init__(self):
+        self._principal = defaultdict(int)
+
+    def incrementar(self, clave, cantidad=1):
+        """Incrementa un contador desde el hilo del event loop."""
+        self._principal[clave] += cantidad
+
+    def fusionar(self, contadores):
+        """Suma contadores externos (p. ej. la instantánea de otro proceso)."""
+        for clave, cantidad in contadores.items():
+            self._principal[clave] += cantidad
+
+    def instantanea(self):
+        """Copia de los contadores."""
+        return dict(self._principal)
+
+    def get(self, clave, defecto=0):
+        return self._principal.get(clave, defecto)
+
+    def limpiar(self):
+        self._principal.clear()
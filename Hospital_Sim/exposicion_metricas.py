@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+import logging # Importar logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+INTERVALO_METRICAS_DEFECTO = 1.0 # segundos reales entre muestras
+HOST_METRICAS = "127.0.0.1" # Solo localhost
+PREFIJO = "hospital"
+
+
+def _etiquetas(**etiquetas):
+    return "{" + ",".join(f'{clave}="{valor}"' for clave, valor in etiquetas.items()) + "}"
+
+
+def formato_prometheus(muestra):
+    """Convierte una muestra (ver ExposicionMetricas) al formato de texto de Prometheus 0.0.4."""
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, valores):
+        lineas.append(f"# HELP {PREFIJO}_{nombre} {ayuda}")
+        lineas.append(f"# TYPE {PREFIJO}_{nombre} {tipo}")
+        for etiquetas, valor in valores:
+            lineas.append(f"{PREFIJO}_{nombre}{etiquetas} {valor if isinstance(valor, int) else f'{valor:.6g}'}")
+
+    metrica("eventos_total", "counter", "Eventos por etapa (estadisticas_globales).",
+            [(_etiquetas(etapa=etapa), n) for etapa, n in sorted(muestra['eventos'].items())])
+    metrica("pacientes_en_etapa", "gauge", "Pacientes dentro de cada etapa ('hospital' = en el flujo).",
+            [(_etiquetas(etapa=etapa), n) for etapa, n in muestra['en_etapa'].items()])
+    for campo, tipo, ayuda in (('capacidad', "gauge", "Capacidad del recurso."),
+                               ('en_uso', "gauge", "Unidades del recurso ocupadas."),
+                               ('esperando', "gauge", "Pacientes esperando el recurso."),
+                               ('utilizacion', "gauge", "Utilización acumulada del recurso (0-1)."),
+                               ('asignaciones', "counter", "Asignaciones del recurso.")):
+        nombre = f"recurso_{campo}_total" if tipo == "counter" else f"recurso_{campo}"
+        metrica(nombre, tipo, ayuda,
+                [(_etiquetas(recurso=recurso), datos[campo]) for recurso, datos in muestra['recursos'].items()])
+    lineas.append(f"# HELP {PREFIJO}_latencia_segundos Latencia por etapa (segundos del reloj del event loop).")
+    lineas.append(f"# TYPE {PREFIJO}_latencia_segundos summary")
+    for etapa, datos in muestra['latencias'].items():
+        for cuantil in ('p50', 'p95', 'p99'):
+            lineas.append(f"{PREFIJO}_latencia_segundos{_etiquetas(etapa=etapa, quantile=int(cuantil[1:]) / 100)} "
+                          f"{datos[cuantil]:.6g}")
+        lineas.append(f"{PREFIJO}_latencia_segundos_count{_etiquetas(etapa=etapa)} {datos['total']}")
+        lineas.append(f"{PREFIJO}_latencia_segundos_sum{_etiquetas(etapa=etapa)} "
+                      f"{datos['promedio'] * datos['total']:.6g}")
+    metrica("cola_ejecutor", "gauge", "Tareas enviadas al executor de inferencia que aún no terminaron.",
+            [("", muestra['cola_ejecutor'])])
+    metrica("lag_event_loop_segundos", "gauge", "Retraso del event loop en atender la última muestra.",
+            [("", muestra['lag_loop'])])
+    metrica("lag_event_loop_max_segundos", "gauge", "Retraso máximo del event loop en la corrida.",
+            [("", muestra['lag_loop_max'])])
+    metrica("tiempo_simulado_segundos", "gauge", "Reloj del event loop desde el inicio (virtual o real).",
+            [("", muestra['tiempo_simulado'])])
+    metrica("tiempo_real_segundos", "gauge", "Segundos reales desde el inicio.", [("", muestra['tiempo_real'])])
+    return "\n".join(lineas) + "\n"
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    exposicion = None # Se asigna en una subclase por servidor
+
+    def do_GET(self):
+        muestra = self.exposicion.ultima
+        if self.path == "/metrics":
+            cuerpo, tipo = formato_prometheus(muestra).encode(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path in ("/", "/json"):
+            cuerpo, tipo = json.dumps(muestra, ensure_ascii=False).encode(), "application/json"
+        else:
+            self.send_error(404, "Use /metrics (Prometheus) o /json")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        logger.debug("HTTP " + formato % args)
+
+
+class ExposicionMetricas:
+    """
+    Métricas en vivo de una corrida: endpoint HTTP local (Prometheus en /metrics,
+    JSON en /json) y/o un archivo JSON que se reescribe en cada muestra.
+
+    Las etapas no hacen nada extra por evento: un hilo muestreador pide cada
+    `intervalo` segundos reales una muestra al event loop (call_soon_threadsafe),
+    y `recolectar` la arma ahí, donde los contadores son consistentes. El tiempo
+    entre el pedido y la atención es el lag del event loop. El servidor HTTP corre
+    en sus propios hilos y solo lee la última muestra, así que un scrape nunca
+    toca el event loop; funciona igual con --tiempo-virtual.
+    """
+
+    def __init__(self, recolectar, puerto=None, archivo_json=None, intervalo=INTERVALO_METRICAS_DEFECTO):
+        """
+        Args:
+            recolectar: Función sin argumentos (corre en el event loop) que retorna un diccionario con
+                        eventos, en_etapa, recursos, latencias, cola_ejecutor y tiempo_simulado
+            puerto: Puerto HTTP en localhost (None = sin servidor; 0 = uno libre)
+            archivo_json: Archivo con la última muestra (None = sin archivo)
+            intervalo: Segundos reales entre muestras
+        """
+        if intervalo <= 0:
+            raise ValueError("El intervalo de métricas debe ser positivo")
+        self.recolectar = recolectar
+        self.puerto = puerto
+        self.archivo_json = archivo_json
+        self.intervalo = intervalo
+        self.ultima = {}
+        self.muestras = 0
+        self._lag_max = 0.0
+        self._inicio = None
+        self._loop = None
+        self._servidor = None
+        self._hilos = []
+        self._detener = threading.Event()
+        self._lista = threading.Event()
+
+    def iniciar(self, loop):
+        """Toma la primera muestra y arranca el muestreador y el servidor (llamar desde el event loop)."""
+        self._loop = loop
+        self._inicio = time.perf_counter()
+        self._muestrear(self._inicio)
+        if self.puerto is not None:
+            manejador = type("ManejadorMetricas", (_Manejador,), {'exposicion': self})
+            self._servidor = ThreadingHTTPServer((HOST_METRICAS, self.puerto), manejador)
+            self._servidor.daemon_threads = True
+            self.puerto = self._servidor.server_address[1]
+            self._hilos.append(threading.Thread(target=self._servidor.serve_forever, args=(0.2,),
+                                                name="metricas-http", daemon=True))
+            logger.info(f"Métricas en http://{HOST_METRICAS}:{self.puerto}/metrics (JSON en /json)")
+        self._hilos.append(threading.Thread(target=self._muestreador, name="metricas-muestreo", daemon=True))
+        for hilo in self._hilos:
+            hilo.start()
+
+    def _muestreador(self):
+        while not self._detener.wait(self.intervalo):
+            self._lista.clear()
+            try:
+                self._loop.call_soon_threadsafe(self._muestrear, time.perf_counter())
+            except RuntimeError:
+                return # Event loop cerrado
+            # Un solo pedido pendiente a la vez: si el loop está bloqueado no se acumulan
+            while not self._lista.wait(0.05):
+                if self._detener.is_set():
+                    return
+            if self.archivo_json:
+                self._escribir_json()
+
+    def _muestrear(self, pedido):
+        """Corre en el event loop."""
+        ahora = time.perf_counter()
+        lag = ahora - pedido
+        self._lag_max = max(self._lag_max, lag)
+        muestra = self.recolectar()
+        muestra.update(instante=time.time(), tiempo_real=ahora - self._inicio, lag_loop=lag,
+                       lag_loop_max=self._lag_max)
+        self.ultima = muestra # Reemplazo atómico: los hilos HTTP leen la muestra completa
+        self.muestras += 1
+        self._lista.set()
+
+    def _escribir_json(self):
+        temporal = f"{self.archivo_json}.tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.ultima, f, ensure_ascii=False)
+            os.replace(temporal, self.archivo_json)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir {self.archivo_json}: {e}")
+
+    def detener(self):
+        """Toma la muestra final, la escribe y detiene los hilos (llamar desde el event loop)."""
+        self._detener.set()
+        self._muestrear(time.perf_counter())
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+        for hilo in self._hilos:
+            hilo.join()
+        if self.archivo_json:
+            self._escribir_json()
+        logger.info(f"Métricas: {self.muestras} muestras, lag máximo del event loop {self._lag_max * 1000:.1f} ms")
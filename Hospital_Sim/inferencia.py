@@ -0,0 +1,385 @@
+import asyncio
+import logging # Importar logging
+from collections import Counter
+from functools import lru_cache, partial
+from paciente import (COLUMNAS_SINTOMAS, vector_sintomas, empaquetar_sintomas, PacienteBatch,
+                      ETIQUETAS_PRIORIDAD, ETIQUETAS_DIAGNOSTICO)
+from triage_ia import clasificar_prioridad, clasificar_prioridad_lote
+from diagnostico_ia import diagnosticar_paciente_sincrono, diagnosticar_lote
+from trazas import trazador
+from metricas import tareas_executor
+from modelos import directorio_modelos, ejecutar_con_modelos
+from registro_modelos import VersionModelos, VERSION_LOCAL
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+# Valores por defecto del agrupador de inferencias
+MAX_LOTE_DEFECTO = 32
+VENTANA_LOTE_DEFECTO = 0.005 # segundos
+
+# Tabla precalculada: solo se enumeran conjuntos de síntomas binarios pequeños (2^n filas)
+MAX_COLUMNAS_TABLA = 16
+MAX_MEMO_DEFECTO = 1024
+
+
+def inferir_lote(matriz, modelos=None):
+    """
+    Ejecuta triage y diagnóstico sobre la misma matriz de síntomas.
+
+    Args:
+        matriz: Arreglo (n, 5) con los síntomas en el orden de COLUMNAS_SINTOMAS
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
+    Returns:
+        Lista de tuplas (prioridad, diagnóstico), una por fila
+    """
+    return list(zip(clasificar_prioridad_lote(matriz, modelos), diagnosticar_lote(matriz, modelos)))
+
+
+async def enviar_a_executor(loop, executor, nombre, paciente_id, funcion, *args, atributos=None):
+    """trazador.ejecutar_en contando la tarea en metricas.tareas_executor hasta que termina."""
+    with tareas_executor:
+        return await trazador.ejecutar_en(loop, executor, nombre, paciente_id, funcion, *args, atributos=atributos)
+
+
+def matriz_combinaciones(num_columnas=len(COLUMNAS_SINTOMAS)):
+    """Enumera las 2^n combinaciones binarias; la fila k tiene el bit i de k en la columna i."""
+    import numpy as np
+    indices = np.arange(2 ** num_columnas)[:, None]
+    return ((indices >> np.arange(num_columnas)) & 1).astype(np.float32)
+
+
+# Columnas de PacienteBatch que escriben los lotes: método que las asigna y etiqueta de cada código
+COLUMNAS_LOTE = {
+    'prioridad': (PacienteBatch.asignar_prioridades, ETIQUETAS_PRIORIDAD),
+    'diagnostico': (PacienteBatch.asignar_diagnosticos, ETIQUETAS_DIAGNOSTICO),
+}
+
+
+def evaluar_lote(funcion_lote, columna, lote, modelos=None):
+    """
+    Corre en el trabajador: evalúa funcion_lote sobre la matriz de síntomas del
+    PacienteBatch y escribe los resultados en su columna.
+
+    Args:
+        funcion_lote: Función de lote (p. ej. clasificar_prioridad_lote)
+        columna: Columna de PacienteBatch que recibe los resultados
+        lote: PacienteBatch a evaluar
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
+    Returns:
+        La columna de códigos (int8, un byte por paciente), o la lista de etiquetas
+        si alguna no tiene código (p. ej. la de un modelo reentrenado)
+    """
+    resultados = funcion_lote(lote.matriz_sintomas(), modelos=modelos)
+    try:
+        COLUMNAS_LOTE[columna][0](lote, resultados)
+    except KeyError:
+        return list(resultados)
+    return lote.datos[columna]
+
+
+class TablaInferencia:
+    """
+    Resultados de inferencia precalculados para todas las combinaciones de síntomas binarios.
+
+    Con 5 síntomas binarios solo existen 32 entradas posibles, así que cada
+    predicción se resuelve indexando una lista con la máscara de bits. Para
+    conjuntos de síntomas no binarios (o demasiadas columnas para enumerar) se
+    recurre a una caché LRU acotada sobre funcion_lote.
+    """
+
+    def __init__(self, funcion_lote=inferir_lote, resultados=None, max_memo=MAX_MEMO_DEFECTO):
+        """
+        Args:
+            funcion_lote: Función que recibe una matriz (n, 5) y retorna n resultados
+            resultados: Resultados ya calculados para matriz_combinaciones() (opcional)
+            max_memo: Tamaño máximo de la caché LRU de respaldo
+        """
+        self.funcion_lote = funcion_lote
+        self.tabla = None
+        if len(COLUMNAS_SINTOMAS) <= MAX_COLUMNAS_TABLA:
+            if resultados is None:
+                resultados = funcion_lote(matriz_combinaciones())
+            if len(resultados) != 2 ** len(COLUMNAS_SINTOMAS):
+                raise ValueError(f"Se esperaban {2 ** len(COLUMNAS_SINTOMAS)} resultados, se recibieron {len(resultados)}")
+            self.tabla = list(resultados)
+        self._memo = lru_cache(maxsize=max_memo)(self._predecir_fila)
+
+    def _predecir_fila(self, fila):
+        import numpy as np
+        return self.funcion_lote(np.asarray([fila], dtype=np.float32))[0]
+
+    def predecir(self, sintomas_dict):
+        """Retorna el resultado para un diccionario de síntomas en O(1)."""
+        if self.tabla is not None:
+            indice = empaquetar_sintomas(sintomas_dict)
+            if indice is not None:
+                return self.tabla[indice]
+        return self._memo(tuple(vector_sintomas(sintomas_dict)))
+
+    def predecir_paciente(self, paciente):
+        """Como predecir, indexando directamente con la máscara de síntomas del paciente."""
+        mascara = paciente.mascara_sintomas
+        if mascara is not None and self.tabla is not None:
+            return self.tabla[mascara]
+        return self.predecir(paciente.sintomas)
+
+
+class LoteInferencia:
+    """
+    Agrupa solicitudes de inferencia pendientes y las resuelve con una sola
+    llamada vectorizada en el executor.
+
+    Un lote se despacha cuando alcanza `max_lote` solicitudes o cuando vence la
+    ventana de espera contada desde la primera solicitud pendiente. Con síntomas
+    binarios el lote viaja como PacienteBatch (8 bytes por paciente): el
+    trabajador arma la matriz con matriz_sintomas, escribe los resultados en la
+    columna `columna` y devuelve solo esa columna de códigos.
+    """
+
+    def __init__(self, funcion_lote, executor, max_lote=MAX_LOTE_DEFECTO, ventana=VENTANA_LOTE_DEFECTO,
+                 nombre="inferencia", version=None, columna=None):
+        """
+        Args:
+            funcion_lote: Función (picklable) que recibe una matriz (n, 5) y retorna una lista de n resultados
+            executor: Executor donde se ejecuta funcion_lote
+            max_lote: Número máximo de solicitudes por lote
+            ventana: Tiempo máximo (segundos) que espera un lote incompleto antes de despacharse
+            nombre: Nombre de la etapa en las trazas
+            version: VersionModelos con la que se evalúan los lotes (None = la que tenga cargada el trabajador)
+            columna: Columna de PacienteBatch con el resultado ('prioridad' o 'diagnostico'; None = sin
+                     PacienteBatch, los resultados vuelven como lista)
+        """
+        if columna is not None and columna not in COLUMNAS_LOTE:
+            raise ValueError(f"Columna de lote desconocida '{columna}'; use una de {list(COLUMNAS_LOTE)}")
+        if max_lote < 1:
+            raise ValueError("max_lote debe ser al menos 1")
+        if ventana < 0:
+            raise ValueError("ventana no puede ser negativa")
+        self.funcion_lote = funcion_lote
+        self.executor = executor
+        self.max_lote = max_lote
+        self.ventana = ventana
+        self.nombre = nombre
+        self.version = version
+        self.columna = columna
+        self._pendientes = [] # Lista de (paciente, future)
+        self._temporizador = None
+        self._lotes_en_curso = set()
+
+    async def predecir(self, paciente):
+        """Encola un paciente y espera el resultado de sus síntomas."""
+        resultado, _ = await self.predecir_con_version(paciente)
+        return resultado
+
+    async def predecir_con_version(self, paciente):
+        """Como predecir, pero retorna (resultado, VersionModelos que lo produjo)."""
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((paciente, futuro))
+
+        if len(self._pendientes) >= self.max_lote:
+            self._despachar()
+        elif self._temporizador is None:
+            self._temporizador = loop.call_later(self.ventana, self._despachar)
+
+        return await futuro
+
+    def _despachar(self):
+        """Saca las solicitudes pendientes y lanza su ejecución como un solo lote."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        if not self._pendientes:
+            return
+
+        # La versión se fija al despachar: un cambio de versión no afecta a los lotes ya enviados
+        lote, self._pendientes = self._pendientes, []
+        tarea = asyncio.get_running_loop().create_task(self._ejecutar(lote, self.version))
+        self._lotes_en_curso.add(tarea)
+        tarea.add_done_callback(self._lotes_en_curso.discard)
+
+    async def _ejecutar(self, lote, version):
+        import numpy as np
+        loop = asyncio.get_running_loop()
+        pacientes = [paciente for paciente, _ in lote]
+        if self.columna is not None and all(p.mascara_sintomas is not None for p in pacientes):
+            funcion, argumentos = evaluar_lote, (self.funcion_lote, self.columna, PacienteBatch.desde_pacientes(pacientes))
+        else:
+            filas = [vector_sintomas(paciente.sintomas) for paciente in pacientes]
+            funcion, argumentos = self.funcion_lote, (np.asarray(filas, dtype=np.float32),)
+        if version is not None:
+            funcion, argumentos = ejecutar_con_modelos, (version.directorio, funcion, *argumentos)
+        try:
+            resultados = await enviar_a_executor(loop, self.executor, self.nombre, None, funcion, *argumentos,
+                                                 atributos={'lote': len(lote)})
+        except Exception as e:
+            logger.error(f"Error al ejecutar lote de {len(lote)} inferencias: {type(e).__name__} - {e}")
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        if isinstance(resultados, np.ndarray): # Columna de códigos de PacienteBatch
+            etiquetas = COLUMNAS_LOTE[self.columna][1]
+            resultados = [etiquetas[codigo] for codigo in resultados.tolist()]
+        for (_, futuro), resultado in zip(lote, resultados):
+            # El paciente pudo haber sido cancelado mientras esperaba el lote
+            if not futuro.done():
+                futuro.set_result((resultado, version))
+
+    async def cerrar(self):
+        """Despacha lo pendiente y espera a que terminen los lotes en curso."""
+        self._despachar()
+        if self._lotes_en_curso:
+            await asyncio.gather(*self._lotes_en_curso, return_exceptions=True)
+
+
+class ServicioInferencia:
+    """
+    Base de los servicios de inferencia: versión de modelos en servicio y cuántas
+    predicciones sirvió cada versión.
+
+    Cada predicción usa la versión vigente al momento de enviarla, y el paciente
+    guarda en version_modelos cuál fue.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.predicciones_por_version = Counter()
+
+    def _anotar(self, paciente, version):
+        paciente.version_modelos = version.numero
+        self.predicciones_por_version[version.etiqueta] += 1
+
+    async def cambiar_version(self, version):
+        """Las tareas ya enviadas terminan con su versión; las siguientes usan la nueva."""
+        self.version = version
+
+    async def cerrar(self):
+        pass
+
+
+class InferenciaPorPaciente(ServicioInferencia):
+    """Ruta original: una ida y vuelta al executor por paciente y por etapa."""
+
+    def __init__(self, executor, version):
+        super().__init__(version)
+        self.executor = executor
+
+    async def clasificar(self, paciente):
+        loop = asyncio.get_running_loop()
+        version = self.version
+        prioridad = await enviar_a_executor(loop, self.executor, "triage", paciente.id, ejecutar_con_modelos,
+                                            version.directorio, clasificar_prioridad, paciente.sintomas)
+        self._anotar(paciente, version)
+        return prioridad
+
+    async def diagnosticar(self, paciente):
+        loop = asyncio.get_running_loop()
+        version = self.version
+        paciente = await enviar_a_executor(loop, self.executor, "diagnostico", paciente.id, ejecutar_con_modelos,
+                                           version.directorio, diagnosticar_paciente_sincrono, paciente)
+        self._anotar(paciente, version)
+        return paciente
+
+
+class InferenciaAgrupada(ServicioInferencia):
+    """Triage y diagnóstico servidos por micro-lotes (ver LoteInferencia)."""
+
+    def __init__(self, executor, version, max_lote=MAX_LOTE_DEFECTO, ventana=VENTANA_LOTE_DEFECTO):
+        super().__init__(version)
+        self.lote_triage = LoteInferencia(clasificar_prioridad_lote, executor, max_lote, ventana, "triage", version,
+                                          "prioridad")
+        self.lote_diagnostico = LoteInferencia(diagnosticar_lote, executor, max_lote, ventana, "diagnostico", version,
+                                               "diagnostico")
+
+    async def cambiar_version(self, version):
+        self.version = self.lote_triage.version = self.lote_diagnostico.version = version
+
+    async def clasificar(self, paciente):
+        prioridad, version = await self.lote_triage.predecir_con_version(paciente)
+        self._anotar(paciente, version)
+        return prioridad
+
+    async def diagnosticar(self, paciente):
+        # Los errores del lote se propagan y main.py los trata como error de executor
+        paciente.diagnostico, version = await self.lote_diagnostico.predecir_con_version(paciente)
+        paciente.estado = "diagnosticado"
+        self._anotar(paciente, version)
+        return paciente
+
+    async def cerrar(self):
+        await self.lote_triage.cerrar()
+        await self.lote_diagnostico.cerrar()
+
+
+def _funcion_version(version):
+    """inferir_lote atada a los modelos de una versión (picklable, para el executor)."""
+    return partial(ejecutar_con_modelos, version.directorio, inferir_lote)
+
+
+async def calcular_tabla(executor, version):
+    """Calcula en el executor la TablaInferencia de una versión con un único predict de 2^n filas."""
+    funcion = _funcion_version(version)
+    with tareas_executor:
+        resultados = await asyncio.get_running_loop().run_in_executor(executor, funcion, matriz_combinaciones())
+    return TablaInferencia(funcion, resultados)
+
+
+class InferenciaTabla(ServicioInferencia):
+    """
+    Triage y diagnóstico servidos desde TablaInferencia, en línea sobre el event loop.
+
+    La tabla y su versión se reemplazan juntas en una sola asignación, así que cada
+    predicción lee una pareja consistente sin pausar a los pacientes en vuelo.
+    """
+
+    def __init__(self, tabla, version, executor=None):
+        super().__init__(version)
+        self.executor = executor
+        self._activa = (tabla, version)
+
+    @property
+    def tabla(self):
+        return self._activa[0]
+
+    async def cambiar_version(self, version):
+        # La tabla nueva se calcula aparte; mientras tanto se sigue sirviendo la anterior
+        self._activa = (await calcular_tabla(self.executor, version), version)
+        self.version = version
+
+    async def clasificar(self, paciente):
+        tabla, version = self._activa
+        self._anotar(paciente, version)
+        return tabla.predecir_paciente(paciente)[0]
+
+    async def diagnosticar(self, paciente):
+        tabla, version = self._activa
+        paciente.diagnostico = tabla.predecir_paciente(paciente)[1]
+        paciente.estado = "diagnosticado"
+        self._anotar(paciente, version)
+        return paciente
+
+
+async def crear_inferencia(modo, executor, max_lote=MAX_LOTE_DEFECTO, ventana=VENTANA_LOTE_DEFECTO, version=None):
+    """
+    Crea el servicio de inferencia usado por el flujo de pacientes.
+
+    Args:
+        modo: 'tabla' (resultados precalculados), 'lotes' (micro-lotes vectorizados)
+              o 'ejecutor' (una llamada por paciente)
+        executor: Executor para las llamadas CPU bound
+        max_lote: Tamaño máximo de lote (solo modo 'lotes')
+        ventana: Ventana de espera en segundos (solo modo 'lotes')
+        version: VersionModelos inicial (por defecto, el directorio de modelos configurado)
+    """
+    version = version or VersionModelos(VERSION_LOCAL, directorio_modelos())
+    if modo == "tabla":
+        # La tabla se calcula una sola vez por versión en el executor
+        return InferenciaTabla(await calcular_tabla(executor, version), version, executor)
+    if modo == "lotes":
+        return InferenciaAgrupada(executor, version, max_lote, ventana)
+    if modo == "ejecutor":
+        return InferenciaPorPaciente(executor, version)
+    raise ValueError(f"Modo de inferencia desconocido: {modo}")
@@ -0,0 +1,293 @@
+import csv
+import math
+import os
+import random
+import logging # Importar logging
+from datetime import datetime
+from paciente import COLUMNAS_SINTOMAS, validar_mascara
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+# Fuentes de llegadas: iterables (perezosos) de tuplas (instante, id, sintomas), con
+# instante en segundos desde el inicio de la simulación, en orden no decreciente, y
+# sintomas como máscara de bits, diccionario o None (None = aleatorios).
+TIPOS_LLEGADAS = ("uniforme", "poisson", "horaria")
+TIPO_LLEGADAS_DEFECTO = "uniforme"
+TASA_DEFECTO = 1 / 0.3 # llegadas/s: la media del intervalo uniforme(0.1, 0.5)
+TAMANO_BLOQUE = 65_536 # Filas por bloque al leer Parquet
+
+# Tasa relativa por hora del día (media 1): madrugada tranquila, pico a media mañana y al anochecer
+PERFIL_URGENCIAS = (0.45, 0.35, 0.3, 0.28, 0.3, 0.4, 0.6, 0.9, 1.25, 1.5, 1.6, 1.55,
+                    1.45, 1.4, 1.4, 1.35, 1.35, 1.4, 1.45, 1.4, 1.25, 1.05, 0.8, 0.62)
+
+
+def llegadas_uniformes(num_pacientes, primer_id=1, factor_intervalo=1.0, minimo=0.1, maximo=0.5,
+                       despues_de=None):
+    """
+    Intervalos uniformes entre minimo y maximo segundos (el modelo original de la simulación).
+
+    En los generadores, despues_de es el instante de la llegada anterior al continuar
+    una corrida (puntos de control); sin él, la primera llegada es en el instante 0.
+    """
+    instante = 0.0 if despues_de is None else despues_de
+    for i in range(num_pacientes):
+        if i or despues_de is not None:
+            instante += random.uniform(minimo, maximo) * factor_intervalo
+        yield instante, primer_id + i, None
+
+
+def llegadas_poisson(num_pacientes, tasa=TASA_DEFECTO, primer_id=1, factor_intervalo=1.0, despues_de=None):
+    """Proceso de Poisson homogéneo: intervalos exponenciales de media 1/tasa segundos."""
+    tasa = tasa / factor_intervalo
+    instante = 0.0 if despues_de is None else despues_de
+    for i in range(num_pacientes):
+        if i or despues_de is not None:
+            instante += random.expovariate(tasa)
+        yield instante, primer_id + i, None
+
+
+def llegadas_por_hora(num_pacientes, tasa=TASA_DEFECTO, perfil=PERFIL_URGENCIAS, hora_inicio=0.0,
+                      primer_id=1, factor_intervalo=1.0, despues_de=None):
+    """
+    Proceso de Poisson no homogéneo con tasa tasa * perfil[hora del día], por thinning.
+
+    Se proponen llegadas a la tasa máxima y cada una se acepta con probabilidad
+    tasa(t) / tasa máxima (Lewis-Shedler), así que no hace falta integrar la tasa.
+
+    Args:
+        num_pacientes: Llegadas a generar
+        tasa: Tasa media en llegadas/s
+        perfil: 24 factores relativos, uno por hora (se normalizan a media 1)
+        hora_inicio: Hora del día (0-24) a la que empieza la simulación
+    """
+    if len(perfil) != 24 or min(perfil) < 0 or not any(perfil):
+        raise ValueError("El perfil horario necesita 24 factores no negativos (al menos uno positivo)")
+    media = sum(perfil) / 24
+    factores = [factor / media for factor in perfil]
+    maximo = max(factores)
+    tasa_maxima = tasa * maximo / factor_intervalo
+    instante = 0.0 if despues_de is None else despues_de
+    for i in range(num_pacientes):
+        if i or despues_de is not None:
+            while True:
+                instante += random.expovariate(tasa_maxima)
+                hora = int(hora_inicio + instante / 3600) % 24
+                if random.random() * maximo < factores[hora]:
+                    break
+        yield instante, primer_id + i, None
+
+
+def _desde_iso(valor):
+    return datetime.fromisoformat(valor).timestamp()
+
+
+def _lector_instante(primero):
+    """float si la primera fila trae segundos; si trae una fecha ISO 8601, segundos desde la época."""
+    try:
+        float(primero)
+        return float
+    except ValueError:
+        _desde_iso(primero) # Que un formato inválido falle aquí, con el valor a la vista
+        return _desde_iso
+
+
+def _mascara(valor):
+    """Máscara de síntomas de una traza (texto del CSV); ValueError si Paciente no la aceptaría."""
+    return validar_mascara(int(valor))
+
+
+def _lector_sintomas(columnas):
+    """Función fila -> síntomas según las columnas disponibles ('sintomas' como máscara, o una por síntoma)."""
+    if "sintomas" in columnas:
+        indice = columnas.index("sintomas")
+        return lambda fila: _mascara(fila[indice]) if fila[indice] != "" else None
+    if all(columna in columnas for columna in COLUMNAS_SINTOMAS):
+        indices = [columnas.index(columna) for columna in COLUMNAS_SINTOMAS]
+
+        def leer(fila):
+            valores = [fila[i] for i in indices]
+            if all(valor in ("0", "1") for valor in valores):
+                return sum(1 << bit for bit, valor in enumerate(valores) if valor == "1")
+            return {columna: float(valor) for columna, valor in zip(COLUMNAS_SINTOMAS, valores)}
+        return leer
+    return lambda fila: None
+
+
+def _normalizar(filas, num_pacientes, fragmento, fragmentos, omitir=0):
+    """
+    Toma (instante absoluto, id o None, sintomas) y los deja relativos a la primera fila del archivo.
+
+    Con varios fragmentos, cada uno se queda con las filas i % fragmentos == fragmento,
+    así que entre todos reproducen la traza completa con sus instantes originales.
+    Las primeras `omitir` filas del fragmento se saltan (ya llegaron antes del punto de control).
+    """
+    origen = None
+    entregadas = 0
+    for indice, (instante, id, sintomas) in enumerate(filas):
+        if origen is None:
+            origen = instante
+        if indice % fragmentos != fragmento:
+            continue
+        if omitir:
+            omitir -= 1
+            continue
+        if num_pacientes is not None and entregadas >= num_pacientes:
+            return
+        entregadas += 1
+        yield instante - origen, id if id is not None else indice + 1, sintomas
+        if entregadas == num_pacientes:
+            return # Sin leer (ni validar) la fila siguiente
+
+
+def leer_llegadas_csv(ruta, num_pacientes=None, fragmento=0, fragmentos=1, omitir=0):
+    """
+    Reproduce una traza de llegadas en CSV leyéndola en streaming (memoria constante).
+
+    Columnas: 'instante' (segundos o fecha ISO 8601, en orden), 'id' (opcional; por
+    defecto el número de fila) y los síntomas como 'sintomas' (máscara de bits) o como
+    una columna por síntoma (fiebre, tos, dolor, fatiga, respirar); sin síntomas se
+    generan aleatorios.
+
+    Args:
+        ruta: Archivo CSV con encabezado
+        num_pacientes: Máximo de llegadas a leer (None = todas)
+        fragmento, fragmentos: Parte de la traza que le toca a este proceso (ver simulacion_distribuida)
+        omitir: Filas del fragmento que se saltan al reanudar
+    """
+    def filas():
+        with open(ruta, newline="", encoding="utf-8") as f:
+            lector = csv.reader(f)
+            columnas = [columna.strip() for columna in next(lector, [])]
+            if "instante" not in columnas:
+                raise ValueError(f"{ruta}: falta la columna 'instante' (columnas: {columnas})")
+            i_instante = columnas.index("instante")
+            i_id = columnas.index("id") if "id" in columnas else None
+            sintomas = _lector_sintomas(columnas)
+            instante = None
+            for fila in lector:
+                if not fila:
+                    continue
+                if instante is None:
+                    instante = _lector_instante(fila[i_instante])
+                try:
+                    sintomas_fila = sintomas(fila)
+                except ValueError as e:
+                    raise ValueError(f"{ruta}, línea {lector.line_num}: {e}") from None
+                yield (instante(fila[i_instante]), int(fila[i_id]) if i_id is not None else None,
+                       sintomas_fila)
+    return _normalizar(filas(), num_pacientes, fragmento, fragmentos, omitir)
+
+
+def leer_llegadas_parquet(ruta, num_pacientes=None, fragmento=0, fragmentos=1, omitir=0,
+                          tamano_bloque=TAMANO_BLOQUE):
+    """
+    Como leer_llegadas_csv, para Parquet: lee por bloques de filas con pyarrow (dependencia opcional).
+
+    'instante' puede ser numérico (segundos) o timestamp.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Leer trazas Parquet requiere pyarrow (pip install pyarrow); use CSV o instálelo")
+
+    def filas():
+        archivo = pq.ParquetFile(ruta)
+        columnas = archivo.schema_arrow.names
+        if "instante" not in columnas:
+            raise ValueError(f"{ruta}: falta la columna 'instante' (columnas: {columnas})")
+        por_sintoma = all(columna in columnas for columna in COLUMNAS_SINTOMAS)
+        leidas = [c for c in ("instante", "id", "sintomas") if c in columnas]
+        leidas += list(COLUMNAS_SINTOMAS) if por_sintoma and "sintomas" not in columnas else []
+        leidas_antes = 0 # Filas de los bloques anteriores, para ubicar los errores
+        for bloque in archivo.iter_batches(batch_size=tamano_bloque, columns=leidas):
+            datos = bloque.to_pydict()
+            instantes = [valor.timestamp() if isinstance(valor, datetime) else float(valor)
+                         for valor in datos["instante"]]
+            ids = datos.get("id") or [None] * len(instantes)
+            if "sintomas" in datos:
+                sintomas = datos["sintomas"]
+                for i, mascara in enumerate(sintomas):
+                    if mascara is not None:
+                        try:
+                            validar_mascara(mascara)
+                        except ValueError as e:
+                            raise ValueError(f"{ruta}, fila {leidas_antes + i + 1}: {e}") from None
+            elif por_sintoma:
+                sintomas = [_sintomas_fila(valores) for valores in zip(*(datos[c] for c in COLUMNAS_SINTOMAS))]
+            else:
+                sintomas = [None] * len(instantes)
+            leidas_antes += len(instantes)
+            yield from zip(instantes, ids, sintomas)
+    return _normalizar(filas(), num_pacientes, fragmento, fragmentos, omitir)
+
+
+def _sintomas_fila(valores):
+    if all(valor in (0, 1) for valor in valores):
+        return sum(1 << bit for bit, valor in enumerate(valores) if valor == 1)
+    return dict(zip(COLUMNAS_SINTOMAS, map(float, valores)))
+
+
+def leer_llegadas(ruta, num_pacientes=None, fragmento=0, fragmentos=1, omitir=0):
+    """Elige el lector por la extensión del archivo (.parquet/.pq o CSV)."""
+    if os.path.splitext(ruta)[1].lower() in (".parquet", ".pq"):
+        return leer_llegadas_parquet(ruta, num_pacientes, fragmento, fragmentos, omitir)
+    return leer_llegadas_csv(ruta, num_pacientes, fragmento, fragmentos, omitir)
+
+
+def escribir_llegadas_csv(ruta, llegadas):
+    """
+    Guarda una fuente de llegadas como traza CSV (instante, id, sintomas); los síntomas
+    que falten se generan aleatorios, así que la traza se puede reproducir tal cual.
+
+    Returns:
+        Número de filas escritas
+    """
+    filas = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["instante", "id", "sintomas"])
+        for instante, id, sintomas in llegadas:
+            if sintomas is None:
+                sintomas = random.getrandbits(len(COLUMNAS_SINTOMAS))
+            elif isinstance(sintomas, dict):
+                raise ValueError("escribir_llegadas_csv solo admite síntomas binarios (máscara)")
+            escritor.writerow((f"{instante:.6f}", id, sintomas))
+            filas += 1
+    return filas
+
+
+def crear_llegadas(tipo=TIPO_LLEGADAS_DEFECTO, num_pacientes=None, tasa=None, archivo=None, primer_id=1,
+                   factor_intervalo=1.0, fragmento=0, fragmentos=1, omitir=0, despues_de=None):
+    """
+    Crea la fuente de llegadas de una corrida.
+
+    Args:
+        tipo: 'uniforme' (intervalos uniformes de 0.1-0.5 s), 'poisson' o 'horaria'
+              (Poisson con el perfil PERFIL_URGENCIAS); se ignora si hay archivo
+        num_pacientes: Llegadas a generar, o máximo a leer del archivo (None = todas)
+        tasa: Llegadas/s de 'poisson' y 'horaria' (por defecto TASA_DEFECTO)
+        archivo: Traza CSV o Parquet a reproducir
+        primer_id, factor_intervalo: Id del primer paciente y factor de los intervalos de los generadores
+        fragmento, fragmentos: Parte de la traza de este proceso (las trazas no usan factor_intervalo)
+        omitir, despues_de: Para continuar una corrida: llegadas que ya ocurrieron e instante
+                            de la última (ver puntos_control)
+    """
+    if archivo is not None:
+        if num_pacientes is not None:
+            num_pacientes = max(0, num_pacientes - omitir)
+        return leer_llegadas(archivo, num_pacientes, fragmento, fragmentos, omitir)
+    if num_pacientes is None:
+        raise ValueError("Sin archivo de llegadas hay que indicar el número de pacientes")
+    num_pacientes, primer_id = max(0, num_pacientes - omitir), primer_id + omitir
+    tasa = TASA_DEFECTO if tasa is None else tasa
+    if not tasa > 0 or math.isinf(tasa):
+        raise ValueError(f"Tasa de llegadas inválida: {tasa}")
+    if tipo == "uniforme":
+        return llegadas_uniformes(num_pacientes, primer_id, factor_intervalo, despues_de=despues_de)
+    if tipo == "poisson":
+        return llegadas_poisson(num_pacientes, tasa, primer_id, factor_intervalo, despues_de)
+    if tipo == "horaria":
+        return llegadas_por_hora(num_pacientes, tasa, primer_id=primer_id, factor_intervalo=factor_intervalo,
+                                 despues_de=despues_de)
+    raise ValueError(f"Tipo de llegadas desconocido '{tipo}'; use uno de {TIPOS_LLEGADAS}")
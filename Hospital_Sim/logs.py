@@ -0,0 +1,177 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from visualizacion import COLORES, COLOR_ETAPA, EMOJI_ETAPA, EtapaPaciente
+
+# Etapas conocidas y etapas que se muestran con el formato de error (precalculadas una sola vez)
+ETAPAS_CONOCIDAS = frozenset(EtapaPaciente.__args__)
+ETAPAS_ERROR = frozenset(e for e in ETAPAS_CONOCIDAS if e.startswith('error') or e.endswith('cancelado')
+                         or e == 'cama_cancelada')
+
+
+def etapa(nombre, paciente_id=None):
+    """
+    Campos `extra` de un log de etapa: logger.info("mensaje", extra=etapa('triage', paciente.id)).
+
+    Args:
+        nombre: Etapa en minúsculas (ver visualizacion.EtapaPaciente)
+        paciente_id: Id del paciente, si el mensaje es de un paciente
+    """
+    return {'etapa': nombre, 'paciente_id': paciente_id}
+
+
+class FormateadorConsola(logging.Formatter):
+    """
+    Formato de consola con color y emoji por etapa.
+
+    La etapa y el paciente vienen en los campos `etapa` y `paciente_id` del
+    registro (ver `etapa`), no se extraen del texto. Los registros sin etapa se
+    muestran como eventos generales de la simulación.
+    """
+
+    def __init__(self):
+        super().__init__("%(message)s")
+        self._segundo = None
+        self._hora = ""
+
+    def formatTime(self, record, datefmt=None):
+        # strftime solo una vez por segundo
+        segundo = int(record.created)
+        if segundo != self._segundo:
+            self._segundo = segundo
+            self._hora = time.strftime("%H:%M:%S", self.converter(record.created))
+        return f"{COLORES['orange']}{self._hora},{int(record.msecs):03d}{COLORES['reset']}"
+
+    def format(self, record):
+        mensaje = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            mensaje = f"{mensaje}\n{record.exc_text}"
+
+        etapa_registro = getattr(record, 'etapa', None)
+        paciente_id = getattr(record, 'paciente_id', None)
+        nombre = etapa_registro
+        if nombre not in ETAPAS_CONOCIDAS:
+            nombre = 'error' if nombre is not None and record.levelno >= logging.ERROR else 'simulacion'
+        prefijo = None
+        if paciente_id is not None:
+            prefijo = f"Paciente {paciente_id} [{(etapa_registro or nombre).upper()}]"
+
+        if prefijo is None or record.levelno >= logging.ERROR or nombre in ETAPAS_ERROR:
+            texto = f"{prefijo}: {mensaje}" if prefijo else mensaje
+            color = COLOR_ETAPA.get(nombre, COLORES['red'])
+            linea = f"{EMOJI_ETAPA.get(nombre, '❌')} [{record.levelname}] {color}{texto}{COLORES['reset']}"
+        else:
+            linea = (f"{EMOJI_ETAPA[nombre]} [{record.levelname}] {COLOR_ETAPA[nombre]} {prefijo}"
+                     f"{COLORES['reset']}: {mensaje}")
+        return f"{self.formatTime(record)} {linea}"
+
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro, con la etapa y el paciente como campos."""
+
+    def format(self, record):
+        datos = {
+            'ts': record.created,
+            'nivel': record.levelname,
+            'logger': record.name,
+            'etapa': getattr(record, 'etapa', None),
+            'paciente_id': getattr(record, 'paciente_id', None),
+            'mensaje': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False)
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el formato y la escritura al hilo del QueueListener.
+
+    A diferencia de QueueHandler, no formatea ni copia los registros sin
+    argumentos ni excepción (el caso de todos los logs de etapa con f-string).
+    En procesos hijos creados con fork (trabajadores del executor) no hay
+    listener, así que ahí escribe directamente en los manejadores de destino.
+    """
+
+    def __init__(self, cola, destinos=()):
+        super().__init__(cola)
+        self._pid = os.getpid()
+        self._destinos = destinos
+
+    def prepare(self, record):
+        if record.args or record.exc_info or record.stack_info:
+            return super().prepare(record)
+        return record
+
+    def emit(self, record):
+        if os.getpid() == self._pid:
+            super().emit(record)
+            return
+        for destino in self._destinos:
+            if record.levelno >= destino.level:
+                destino.handle(record)
+
+
+_listener = None
+
+
+def configurar_logging(nivel="INFO", archivo_json=None, en_cola=True):
+    """
+    Configura el logger raíz de la simulación (se llama al arrancar, no al importar).
+
+    Args:
+        nivel: Nivel del logger raíz
+        archivo_json: Archivo opcional donde escribir una línea JSON por registro
+        en_cola: Si es True, el formato y la E/S ocurren en el hilo de un QueueListener
+                 en lugar del hilo del event loop
+    """
+    global _listener
+    detener_logging()
+
+    consola = logging.StreamHandler(sys.stdout)
+    consola.setFormatter(FormateadorConsola())
+    destinos = [consola]
+    if archivo_json:
+        archivo = logging.FileHandler(archivo_json, mode="w", encoding="utf-8")
+        archivo.setFormatter(FormateadorJSON())
+        destinos.append(archivo)
+
+    raiz = logging.getLogger()
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+        manejador.close()
+    raiz.setLevel(nivel)
+
+    if en_cola:
+        cola = queue.SimpleQueue()
+        raiz.addHandler(ManejadorCola(cola, destinos))
+        _listener = logging.handlers.QueueListener(cola, *destinos, respect_handler_level=True)
+        _listener.start()
+    else:
+        for destino in destinos:
+            raiz.addHandler(destino)
+
+
+def vaciar_logs():
+    """Espera a que el listener escriba todo lo encolado (p. ej. antes de imprimir tablas con print)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def detener_logging():
+    """Vacía la cola y detiene el listener, si lo hay."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for destino in _listener.handlers:
+            destino.flush()
+        _listener = None
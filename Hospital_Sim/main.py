@@ -1,252 +1,636 @@
 import asyncio
-from concurrent.futures import ProcessPoolExecutor
 from paciente import Paciente
-from triage_ia import clasificar_prioridad
-from diagnostico_ia import diagnosticar_paciente_sincrono
-from asignacion_recursos import asignar_cama_async
+from inferencia import crear_inferencia, MAX_LOTE_DEFECTO, VENTANA_LOTE_DEFECTO
+from modelos import configurar_modelos, directorio_modelos
+from ejecucion import crear_ejecutor, BACKENDS, BACKEND_DEFECTO
+from tiempo_virtual import ejecutar_con_tiempo_virtual
+from asignacion_recursos import (asignar_cama_async, reiniciar_recursos,
+                                 CAPACIDADES_DEFECTO, ENVEJECIMIENTO_DEFECTO)
 from seguimiento import seguimiento_paciente
-from registro import registrar_paciente_async
-from visualizacion import mostrar_estadisticas, COLORES, COLOR_ETAPA, EMOJI_ETAPA, EtapaPaciente
+from registro import registrar_paciente_async, reiniciar_registro
+from visualizacion import mostrar_estadisticas, mostrar_utilizacion, mostrar_latencias
+from logs import etapa, configurar_logging, vaciar_logs, detener_logging
 import logging
-import sys
-from collections import defaultdict
+import argparse
+from collections import Counter
+from estadisticas import Estadisticas
+from metricas import latencias_etapa, en_vuelo_etapa, tareas_executor, reiniciar_metricas, LatenciasPorEtapa
+from trazas import trazador, CAPACIDAD_TRAZA_DEFECTO, FORMATOS_TRAZA
+from registro_modelos import VigilanteModelos, INTERVALO_VIGILANCIA_DEFECTO
+from persistencia import registro_persistente, TAMANO_LOTE_DEFECTO
+from llegadas import crear_llegadas, TIPOS_LLEGADAS, TIPO_LLEGADAS_DEFECTO, TASA_DEFECTO
+from duraciones import duraciones, DISTRIBUCIONES, DISTRIBUCION_DEFECTO
+from exposicion_metricas import ExposicionMetricas, INTERVALO_METRICAS_DEFECTO
+from puntos_control import (puntos_control, leer_ultimo, restaurar_rng, pacientes_en_vuelo, incrementos_en_curso,
+                            INTERVALO_DEFECTO as INTERVALO_PUNTO_CONTROL_DEFECTO)
 import time
 import random
-import re
-
-# --- Configuración de Logging Personalizada con Colores y Emojis ---
-
-class ColoredFormatter(logging.Formatter):
-
-    LOG_FORMAT = "%(message)s"
-
-    def __init__(self, fmt=LOG_FORMAT):
-        super().__init__(fmt)
-        self.fmt = fmt
-        self.time_fmt = "%H:%M:%S.%f"[:-3]
-
-    def formatTime(self, record, datefmt=None):
-        """Sobreescribe para formatear el tiempo y aplicarle color."""
-        ct = self.converter(record.created)
-        t = time.strftime(self.time_fmt, ct)
-        s = "%s,%03d" % (t, record.msecs)
-        return f"{COLORES['orange']}{s}{COLORES['reset']}"
-
-    def format(self, record):
-        """Sobreescribe para añadir color y emoji al mensaje."""
-        original_message = super().format(record)
-
-        # Intenta parsear el mensaje para encontrar la etapa (ej. Paciente X [ETAPA]: ...)
-        match = re.match(r"Paciente (\d+) \[([A-Z_]+)\]: (.*)", original_message)
-
-        etapa_key = 'simulacion'
-        paciente_id = None
-        mensaje_limpio = original_message
-
-        if match:
-            paciente_id = match.group(1)
-            etapa_mayusculas = match.group(2)
-            mensaje_limpio = match.group(3)
-            etapa_key = etapa_mayusculas.lower()
-            if etapa_key not in COLOR_ETAPA and etapa_mayusculas.lower() in map(str.lower, EtapaPaciente.__args__):
-                 etapa_key = etapa_mayusculas.lower()
-            elif etapa_mayusculas.lower() not in map(str.lower, EtapaPaciente.__args__):
-                 if record.levelno >= logging.ERROR:
-                     etapa_key = 'error'
-                 else:
-                     etapa_key = 'simulacion'
-
-        color = COLOR_ETAPA.get(etapa_key, COLORES['reset'])
-        emoji = EMOJI_ETAPA.get(etapa_key, '')
-
-        level_name = record.levelname
-
-        is_error_or_generic = (
-            not match or
-            record.levelno >= logging.ERROR or
-            etapa_key in ['error', 'error_registro', 'error_diagnostico', 'error_cama', 'error_seguimiento', 'error_desconocido',
-                          'flujo_cancelado', 'registro_cancelado', 'cama_cancelada', 'seguimiento_cancelado', 'error_triage',
-                          'error_ejecutor_diagnostico', 'error_ejecutor_cama', 'error_ejecutor_seguimiento']
-        )
-
-        if is_error_or_generic:
-             error_color = COLOR_ETAPA.get(etapa_key if etapa_key in COLOR_ETAPA else 'error', COLORES['red'])
-             error_emoji = EMOJI_ETAPA.get(etapa_key if etapa_key in EMOJI_ETAPA else 'error', '❌')
-             formatted_message = f"{error_emoji} [{level_name}] {error_color}{original_message}{COLORES['reset']}"
-        else:
-             paciente_part = f" Paciente {paciente_id}" if paciente_id else ""
-             formatted_message = f"{emoji} [{level_name}] {color}{paciente_part} [{etapa_mayusculas}]{COLORES['reset']}: {mensaje_limpio}"
-
-        return f"{self.formatTime(record)} {formatted_message}"
 
+logger = logging.getLogger(__name__)
 
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.INFO)
+# Configuración del sistema
+MAX_EN_VUELO_DEFECTO = 1000 # Pacientes simultáneos en el hospital antes de frenar las llegadas
+# cola_triage ya no se usa
 
-custom_formatter = ColoredFormatter()
+# Estadísticas globales (ver estadisticas.Estadisticas)
+estadisticas_globales = Estadisticas()
 
-if root_logger.handlers:
-    for handler in list(root_logger.handlers):
-        root_logger.removeHandler(handler)
+def actualizar_estadistica_global(etapa: str, cantidad: int = 1):
+    """
+    Actualiza las estadísticas globales.
+    Todas las etapas corren en el hilo del event loop, así que el incremento no necesita lock.
+    """
+    estadisticas_globales.incrementar(etapa, cantidad)
 
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(custom_formatter)
 
-root_logger.addHandler(console_handler)
+def contador_en_curso(paciente):
+    """
+    actualizar_estadistica_global para las etapas que cuentan eventos antes de terminar
+    (cama, seguimiento): con puntos de control, cada evento queda anotado en el paciente
+    hasta que la etapa termina, para descontarlo si la corrida se reanuda a mitad de ella.
+    """
+    if not puntos_control.activo:
+        return actualizar_estadistica_global
 
-logger = logging.getLogger(__name__)
+    def contar(etapa: str, cantidad: int = 1):
+        actualizar_estadistica_global(etapa, cantidad)
+        puntos_control.anotar(paciente, 'eventos', etapa, cantidad)
+    return contar
 
-# Configuración del sistema
-PRIORIDAD_NUMERICA = {"Crítica": 0, "Alta": 1, "Media": 2, "Baja": 3}
-# cola_triage ya no se usa
 
-# Estadísticas globales (accedidas de forma asíncrona)
-estadisticas_globales = defaultdict(int)
-estadisticas_lock = asyncio.Lock()
+def reiniciar_simulacion(capacidades=None, envejecimiento=ENVEJECIMIENTO_DEFECTO):
+    """
+    Deja el estado global listo para una nueva corrida en el event loop actual.
 
-async def actualizar_estadistica_global(etapa: str, cantidad: int = 1):
-    """Actualiza las estadísticas globales de forma segura y asíncrona."""
-    async with estadisticas_lock:
-        estadisticas_globales[etapa] += cantidad
-        logger.debug(f"Estadística '{etapa}' actualizada a {estadisticas_globales[etapa]}")
+    Returns:
+        El RegistroRecursos nuevo de asignacion_recursos
+    """
+    estadisticas_globales.limpiar()
+    reiniciar_metricas()
+    reiniciar_registro()
+    return reiniciar_recursos(capacidades, envejecimiento)
 
 # --- Flujo Asíncrono por Paciente ---
 
-async def flujo_paciente_async(paciente, cpu_executor: ProcessPoolExecutor):
+async def flujo_paciente_async(paciente, inferencia, desde: int = 0, recibio_cama: bool = False):
     """
     Maneja el flujo completo de un paciente de forma asíncrona.
-    Orquesta las diferentes etapas del proceso hospitalario.
+    Orquesta las diferentes etapas del proceso hospitalario; con --bd cada etapa
+    deja una transición en el registro persistente.
+
+    Args:
+        paciente: Objeto Paciente
+        inferencia: Servicio de triage/diagnóstico creado con inferencia.crear_inferencia
+        desde: Etapas ya completadas (puntos_control.ETAPAS_FLUJO); al reanudar una corrida,
+               el paciente sigue desde la siguiente
+        recibio_cama: Si ya recibió cama (solo al reanudar después de la etapa de cama)
+    Returns:
+        El paciente con su estado final (puede ser una copia si el diagnóstico corrió en otro proceso)
     """
-    logger.info(f"Paciente {paciente.id} [SIMULACION]: Iniciando flujo...")
+    logger.info("Iniciando flujo...", extra=etapa('simulacion', paciente.id))
+    loop = asyncio.get_running_loop()
 
     try:
         # 1. Registro (I/O bound)
-        await registrar_paciente_async(paciente, actualizar_estadistica_global)
-        if paciente.estado == "error_registro" or paciente.estado == "registro_cancelado":
-             logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo detenido debido a {paciente.estado}.")
-             return
+        if desde < 1:
+            with en_vuelo_etapa['registro']:
+                await registrar_paciente_async(paciente, actualizar_estadistica_global)
+            if paciente.estado == "error_registro" or paciente.estado == "registro_cancelado":
+                 logger.warning(f"Flujo detenido debido a {paciente.estado}.", extra=etapa('simulacion', paciente.id))
+                 return paciente
+            puntos_control.marcar(paciente, 1)
 
         # 2. Triage (CPU rápido)
-        logger.info(f"Paciente {paciente.id} [TRIAGE]: Iniciando triaje...")
-        loop = asyncio.get_running_loop()
-        try:
-            paciente.prioridad = await loop.run_in_executor(
-                cpu_executor, clasificar_prioridad, paciente.sintomas
-            )
-            logger.info(f"Paciente {paciente.id} [TRIAGE]: Prioridad {paciente.prioridad}")
-            await actualizar_estadistica_global('triage')
-        except Exception as e:
-            logger.error(f"Paciente {paciente.id} [ERROR_TRIAGE]: Error en triaje: {type(e).__name__} - {e}", exc_info=True)
-            paciente.estado = "error_triage"
-            await actualizar_estadistica_global('error_triage')
-            logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo detenido debido a error en triaje.")
-            return
+        if desde < 2:
+            logger.info("Iniciando triaje...", extra=etapa('triage', paciente.id))
+            try:
+                inicio = loop.time()
+                with en_vuelo_etapa['triage']:
+                    paciente.prioridad = await inferencia.clasificar(paciente)
+                latencias_etapa.registrar('triage', loop.time() - inicio)
+                trazador.registrar('triage', paciente.id, inicio, loop.time() - inicio,
+                                   {'modelos': paciente.version_modelos})
+                version = f" (modelos v{paciente.version_modelos})" if paciente.version_modelos else ""
+                logger.info(f"Prioridad {paciente.prioridad}{version}", extra=etapa('triage', paciente.id))
+                registro_persistente.transicion(paciente, 'triage')
+                actualizar_estadistica_global('triage')
+            except Exception as e:
+                logger.error(f"Error en triaje: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error_triage', paciente.id))
+                paciente.estado = "error_triage"
+                actualizar_estadistica_global('error_triage')
+                logger.warning("Flujo detenido debido a error en triaje.", extra=etapa('simulacion', paciente.id))
+                return paciente
+            puntos_control.marcar(paciente, 2)
 
         # 3. Diagnóstico (CPU bound)
-        logger.info(f"Paciente {paciente.id} [DIAGNOSTICO]: Iniciando diagnóstico...")
-        try:
-            paciente = await loop.run_in_executor(
-                cpu_executor, diagnosticar_paciente_sincrono, paciente
-            )
-            if paciente.estado == "diagnosticado":
-                await actualizar_estadistica_global('diagnostico')
-            elif paciente.estado == "error_diagnostico":
-                 logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo continuando sin diagnóstico debido a error.")
-
-        except Exception as e:
-            logger.error(f"Paciente {paciente.id} [ERROR_EJECUTOR_DIAGNOSTICO]: Error al ejecutar diagnóstico en executor: {type(e).__name__} - {e}", exc_info=True)
-            paciente.estado = "error_ejecutor_diagnostico"
-            await actualizar_estadistica_global('error_ejecutor_diagnostico')
-            logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo continuando sin diagnóstico debido a error en executor.")
+        if desde < 3:
+            logger.info("Iniciando diagnóstico...", extra=etapa('diagnostico', paciente.id))
+            try:
+                inicio = loop.time()
+                with en_vuelo_etapa['diagnostico']:
+                    paciente = await inferencia.diagnosticar(paciente)
+                if paciente.estado == "diagnosticado":
+                    latencias_etapa.registrar('diagnostico', loop.time() - inicio)
+                    trazador.registrar('diagnostico', paciente.id, inicio, loop.time() - inicio,
+                                       {'modelos': paciente.version_modelos})
+                    actualizar_estadistica_global('diagnostico')
+                elif paciente.estado == "error_diagnostico":
+                     logger.warning("Flujo continuando sin diagnóstico debido a error.", extra=etapa('simulacion', paciente.id))
+                registro_persistente.transicion(paciente, 'diagnostico')
+
+            except Exception as e:
+                logger.error(f"Error al ejecutar diagnóstico en executor: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error_ejecutor_diagnostico', paciente.id))
+                paciente.estado = "error_ejecutor_diagnostico"
+                actualizar_estadistica_global('error_ejecutor_diagnostico')
+                logger.warning("Flujo continuando sin diagnóstico debido a error en executor.", extra=etapa('simulacion', paciente.id))
+            puntos_control.marcar(paciente, 3)
 
         # 4. Asignación de Cama y Tratamiento (Simulación de recurso limitado)
-        recibio_cama = False
-        if paciente.estado not in ["error_registro", "error_triage", "flujo_cancelado"]:
+        if desde < 4 and paciente.estado not in ["error_registro", "error_triage", "flujo_cancelado"]:
              try:
-                recibio_cama = await asignar_cama_async(paciente, actualizar_estadistica_global)
+                with en_vuelo_etapa['cama']: # Espera de cama y tratamiento
+                    recibio_cama = await asignar_cama_async(paciente, contador_en_curso(paciente))
+                registro_persistente.transicion(paciente, 'cama')
              except Exception as e:
-                 logger.error(f"Paciente {paciente.id} [ERROR_EJECUTOR_CAMA]: Error al ejecutar asignación de cama: {type(e).__name__} - {e}", exc_info=True)
+                 logger.error(f"Error al ejecutar asignación de cama: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error_ejecutor_cama', paciente.id))
                  paciente.estado = "error_ejecutor_cama"
-                 await actualizar_estadistica_global('error_ejecutor_cama')
+                 actualizar_estadistica_global('error_ejecutor_cama')
                  recibio_cama = False
+             puntos_control.marcar(paciente, 4, recibio_cama)
 
         if paciente.estado in ["error_cama", "error_ejecutor_cama"]:
-             logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo continuando sin cama debido a error.")
+             logger.warning("Flujo continuando sin cama debido a error.", extra=etapa('simulacion', paciente.id))
 
         # 5. Seguimiento (I/O bound)
         if paciente.estado not in ["alta", "error_registro", "error_triage", "flujo_cancelado", "cama_cancelada", "error_cama", "error_ejecutor_cama"]:
-             logger.info(f"Paciente {paciente.id} [SEGUIMIENTO]: Iniciando etapa de seguimiento...")
+             logger.info("Iniciando etapa de seguimiento...", extra=etapa('seguimiento', paciente.id))
              try:
-                 await seguimiento_paciente(paciente, actualizar_estadistica_global, recibio_cama)
+                 inicio = loop.time()
+                 with en_vuelo_etapa['seguimiento']:
+                     await seguimiento_paciente(paciente, contador_en_curso(paciente), recibio_cama)
+                 registro_persistente.transicion(paciente, 'seguimiento')
+                 if paciente.estado == "alta":
+                     latencias_etapa.registrar('seguimiento', loop.time() - inicio)
+                     trazador.registrar('seguimiento', paciente.id, inicio, loop.time() - inicio)
              except Exception as e:
-                 logger.error(f"Paciente {paciente.id} [ERROR_EJECUTOR_SEGUIMIENTO]: Error al ejecutar seguimiento: {type(e).__name__} - {e}", exc_info=True)
+                 logger.error(f"Error al ejecutar seguimiento: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error_ejecutor_seguimiento', paciente.id))
                  paciente.estado = "error_ejecutor_seguimiento"
-                 await actualizar_estadistica_global('error_ejecutor_seguimiento')
+                 actualizar_estadistica_global('error_ejecutor_seguimiento')
 
         # 6. Finalización del Flujo del Paciente
         if paciente.estado not in ["error_registro", "error_triage", "error_diagnostico", "error_cama", "error_seguimiento",
                                    "flujo_cancelado", "registro_cancelado", "cama_cancelada", "seguimiento_cancelado",
                                    "error_ejecutor_diagnostico", "error_ejecutor_cama", "error_ejecutor_seguimiento"]:
-             logger.info(f"Paciente {paciente.id} [SIMULACION]: Flujo completado con estado final '{paciente.estado}'.")
+             logger.info(f"Flujo completado con estado final '{paciente.estado}'.", extra=etapa('simulacion', paciente.id))
 
     except asyncio.CancelledError:
-        logger.warning(f"Paciente {paciente.id} [SIMULACION]: Flujo cancelado.")
+        logger.warning("Flujo cancelado.", extra=etapa('simulacion', paciente.id))
         paciente.estado = "flujo_cancelado"
-        await actualizar_estadistica_global('flujo_cancelado')
+        actualizar_estadistica_global('flujo_cancelado')
     except Exception as e:
-        logger.critical(f"Paciente {paciente.id} [ERROR_DESCONOCIDO]: Excepción no manejada en el flujo principal: {type(e).__name__} - {e}", exc_info=True)
+        logger.critical(f"Excepción no manejada en el flujo principal: {type(e).__name__} - {e}", exc_info=True, extra=etapa('error_desconocido', paciente.id))
         paciente.estado = "error_desconocido"
-        await actualizar_estadistica_global('error_desconocido')
+        actualizar_estadistica_global('error_desconocido')
+    finally:
+        registro_persistente.transicion(paciente, 'fin') # Estado final, también en flujos detenidos
+        puntos_control.terminar(paciente)
+    return paciente
 
 
 
 # --- Simulación de Llegadas (Asíncrona) ---
 
-async def simular_llegadas_async(num_pacientes: int, cpu_executor: ProcessPoolExecutor):
+async def generar_llegadas(llegadas, origen=None, posicion=None):
     """
-    Simula la llegada de pacientes y lanza una tarea asíncrona para cada uno.
+    Generador asíncrono de llegadas: produce cada paciente en su instante de llegada.
+
+    Los instantes se miden desde el inicio, no desde la llegada anterior, así que
+    una pausa por backpressure no corre el resto de la traza: las llegadas
+    atrasadas entran en cuanto hay lugar.
+
+    Args:
+        llegadas: Fuente de tuplas (instante, id, sintomas) (ver llegadas.crear_llegadas)
+        origen: Instante del reloj del event loop que corresponde al instante 0 de la fuente (por defecto, ahora)
+        posicion: Diccionario opcional donde se anotan las llegadas producidas ('llegadas') y el
+                  instante de la última ('instante'), para los puntos de control
+    """
+    loop = asyncio.get_running_loop()
+    inicio = loop.time() if origen is None else origen
+    for instante, id, sintomas in llegadas:
+        espera = inicio + instante - loop.time()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        p = Paciente(id, sintomas)
+        logger.info("Paciente llega al hospital.", extra=etapa('simulacion', p.id))
+        if posicion is not None:
+            posicion['llegadas'] += 1
+            posicion['instante'] = instante
+        yield p
+
+
+async def simular_llegadas_async(llegadas, inferencia, max_en_vuelo: int = MAX_EN_VUELO_DEFECTO,
+                                 origen: float = None, reanudacion: dict = None, guardar=None):
     """
-    tasks = []
-    for i in range(num_pacientes):
-        p = Paciente(i + 1)
-        logger.info(f"Paciente {p.id} [SIMULACION]: Paciente llega al hospital.")
-        task = asyncio.create_task(flujo_paciente_async(p, cpu_executor))
-        tasks.append(task)
-        await asyncio.sleep(random.uniform(0.1, 0.5))
+    Simula la llegada de pacientes y lanza una tarea asíncrona para cada uno.
 
-    return tasks
+    Las llegadas se consumen de un generador asíncrono y a lo sumo `max_en_vuelo`
+    pacientes están en el hospital a la vez: si la ventana está llena, el generador
+    se detiene hasta que termine otro flujo (backpressure). Cada tarea se libera al
+    terminar y su resultado se acumula en un resumen, así que la memoria no crece
+    con el número total de pacientes.
+
+    Args:
+        llegadas: Fuente de llegadas (ver generar_llegadas)
+        inferencia: Servicio de triage/diagnóstico
+        max_en_vuelo: Máximo de flujos simultáneos (0 = sin límite)
+        origen: Ver generar_llegadas
+        reanudacion: Punto de control (puntos_control.leer_ultimo) del que se retoman el resumen,
+                     la posición en las llegadas y los pacientes en vuelo
+        guardar: Función (resumen, posicion) que escribe un punto de control; se llama al terminar
+                 un flujo si ya pasó el intervalo de puntos_control
+    Returns:
+        Resumen con los flujos completados, los estados finales y las excepciones no manejadas
+    """
+    resumen = {'completados': 0, 'excepciones': 0, 'max_en_vuelo': 0, 'estados_finales': Counter()}
+    posicion = {'llegadas': 0, 'instante': None}
+    reanudados = []
+    if reanudacion is not None:
+        resumen.update(reanudacion['resumen'], estados_finales=Counter(reanudacion['resumen']['estados_finales']))
+        posicion.update(reanudacion['posicion'])
+        reanudados = pacientes_en_vuelo(reanudacion)
+    ventana = asyncio.Semaphore(max_en_vuelo) if max_en_vuelo > 0 else None
+    en_vuelo = set()
+    en_hospital = en_vuelo_etapa['hospital']
+
+    def plegar_resultado(tarea):
+        en_vuelo.discard(tarea)
+        en_hospital.salir()
+        if ventana is not None:
+            ventana.release()
+        if tarea.cancelled():
+            resumen['estados_finales']['flujo_cancelado'] += 1
+        elif tarea.exception() is not None:
+            resumen['excepciones'] += 1
+            logger.error(f"Un flujo de paciente terminó con una excepción no manejada: {tarea.exception()!r}")
+        else:
+            resumen['estados_finales'][tarea.result().estado] += 1
+        resumen['completados'] += 1
+        if guardar is not None and puntos_control.toca():
+            guardar(resumen, posicion)
+
+    async def admitir(paciente, desde=0, recibio_cama=False):
+        puntos_control.marcar(paciente, desde, recibio_cama) # Ya cuenta como llegada aunque espere lugar en la ventana
+        if ventana is not None:
+            await ventana.acquire()
+        tarea = asyncio.create_task(flujo_paciente_async(paciente, inferencia, desde, recibio_cama))
+        en_vuelo.add(tarea)
+        en_hospital.entrar()
+        tarea.add_done_callback(plegar_resultado)
+        resumen['max_en_vuelo'] = max(resumen['max_en_vuelo'], len(en_vuelo))
+
+    # Al reanudar, primero los pacientes que estaban en vuelo, desde la última etapa que completaron
+    for paciente, desde, recibio_cama in reanudados:
+        await admitir(paciente, desde, recibio_cama)
+    async for paciente in generar_llegadas(llegadas, origen, posicion):
+        await admitir(paciente)
+
+    while en_vuelo:
+        await asyncio.wait(set(en_vuelo))
+
+    return resumen
 
 # --- Función Principal de Ejecución ---
 
-async def main(num_pacientes: int):
-    """Función principal asíncrona para ejecutar la simulación."""
+async def main(num_pacientes: int, modo_inferencia: str = "tabla",
+               max_lote: int = MAX_LOTE_DEFECTO, ventana_lote: float = VENTANA_LOTE_DEFECTO,
+               dir_modelos: str = None, mmap_modelos: str = None,
+               max_en_vuelo: int = MAX_EN_VUELO_DEFECTO, capacidades: dict = None,
+               envejecimiento: float = ENVEJECIMIENTO_DEFECTO, cambios_capacidad: list = None,
+               traza: str = None, formato_traza: str = "chrome", capacidad_traza: int = CAPACIDAD_TRAZA_DEFECTO,
+               registro_modelos: str = None, intervalo_registro: float = INTERVALO_VIGILANCIA_DEFECTO,
+               ejecutor: str = BACKEND_DEFECTO, trabajadores: int = None, max_tareas_por_hijo: int = None,
+               primer_id: int = 1, factor_intervalo: float = 1.0, bd: str = None,
+               lote_bd: int = TAMANO_LOTE_DEFECTO, llegadas: str = TIPO_LLEGADAS_DEFECTO,
+               tasa_llegadas: float = None, archivo_llegadas: str = None, fragmento: int = 0,
+               fragmentos: int = 1, puerto_metricas: int = None, archivo_metricas: str = None,
+               intervalo_metricas: float = INTERVALO_METRICAS_DEFECTO, punto_control: str = None,
+               intervalo_punto_control: float = INTERVALO_PUNTO_CONTROL_DEFECTO, reanudar: bool = False,
+               distribucion_tiempos: str = DISTRIBUCION_DEFECTO, escala_tiempos: float = 1.0,
+               reporte: bool = True):
+    """
+    Función principal asíncrona para ejecutar la simulación.
+
+    ejecutor, trabajadores y max_tareas_por_hijo eligen el backend de las llamadas CPU bound
+    (ver ejecucion.crear_ejecutor). Con registro_modelos se sirve la última versión del registro y se cambia en caliente
+    (en el proceso principal y en cada trabajador) cuando se publica una nueva.
+    Con bd, los registros y las transiciones de etapa se guardan en ese archivo SQLite
+    en transacciones de hasta lote_bd filas (ver persistencia.RegistroPersistente).
+    llegadas, tasa_llegadas y archivo_llegadas eligen la fuente de llegadas (ver llegadas.crear_llegadas;
+    con archivo, num_pacientes=None reproduce la traza completa); primer_id, factor_intervalo, fragmento
+    y fragmentos reparten las llegadas entre procesos. Con puerto_metricas y/o archivo_metricas se exponen
+    métricas en vivo cada intervalo_metricas segundos (ver exposicion_metricas). Con punto_control se agrega un
+    punto de control a ese archivo cada intervalo_punto_control segundos reales, y con reanudar la corrida
+    continúa desde el último (ver puntos_control). distribucion_tiempos y escala_tiempos eligen las duraciones
+    simuladas de las etapas (ver duraciones.DuracionesEtapa). Con reporte=False no se imprimen
+    las tablas finales (simulacion_distribuida las imprime una sola vez, ya fusionadas).
+
+    Returns:
+        Diccionario con el tiempo real, el tiempo simulado (reloj del event loop), el resumen de flujos,
+        las latencias por etapa (metricas.LatenciasPorEtapa.resumen), las predicciones por versión de modelos,
+        los contadores de estadísticas, el resumen de recursos y los histogramas de latencia
+    """
+    # Los modelos se cargan en los trabajadores (inicializar_trabajador); el proceso
+    # principal solo los carga si necesita inferir en línea (p. ej. síntomas no binarios en modo 'tabla')
+    vigilante = version = None
+    if registro_modelos is not None:
+        vigilante = VigilanteModelos(registro_modelos, intervalo=intervalo_registro)
+        version = vigilante.cargar()
+        dir_modelos = version.directorio
+    configurar_modelos(dir_modelos, mmap_modelos)
+    configuracion = {'num_pacientes': num_pacientes, 'llegadas': llegadas, 'tasa_llegadas': tasa_llegadas,
+                     'archivo_llegadas': archivo_llegadas, 'primer_id': primer_id,
+                     'factor_intervalo': factor_intervalo, 'fragmento': fragmento, 'fragmentos': fragmentos}
+    reanudacion = None
+    if reanudar:
+        if punto_control is None:
+            raise ValueError("Para reanudar hay que indicar el archivo de puntos de control")
+        reanudacion = leer_ultimo(punto_control)
+        if reanudacion['configuracion'] != configuracion:
+            raise ValueError(f"El punto de control de {punto_control} es de otra corrida: "
+                             f"{reanudacion['configuracion']}")
+    posicion = reanudacion['posicion'] if reanudacion else {'llegadas': 0, 'instante': None}
+    transcurrido = reanudacion['tiempo_simulado'] if reanudacion else 0.0
+    fuente = crear_llegadas(llegadas, num_pacientes, tasa_llegadas, archivo_llegadas, primer_id,
+                            factor_intervalo, fragmento, fragmentos, posicion['llegadas'], posicion['instante'])
+    recursos = reiniciar_simulacion(capacidades, envejecimiento)
+    duraciones.configurar(distribucion_tiempos, escala_tiempos)
+    if reanudacion is not None:
+        estadisticas_globales.fusionar(reanudacion['eventos'])
+        latencias_etapa.restaurar(reanudacion['latencias'])
+        recursos.restaurar_contadores(reanudacion['recursos'])
+        # Los pacientes en vuelo repiten su etapa en curso: se descuenta lo que ya había contado
+        for seccion, clave, valor in incrementos_en_curso(reanudacion):
+            if seccion == 'eventos':
+                estadisticas_globales.incrementar(clave, -valor)
+            elif seccion == 'latencias':
+                latencias_etapa[clave].descontar(valor)
+            else:
+                recursos[clave].descontar_asignacion(valor)
+        restaurar_rng(reanudacion)
+
     tiempo_inicio = time.time()
+    loop = asyncio.get_running_loop()
+    reloj_inicio = loop.time() - transcurrido # Al reanudar, el reloj simulado sigue donde quedó
+    # Spans por etapa sobre el reloj del event loop (solo si se pidió un archivo de traza)
+    trazador.configurar(traza is not None, capacidad_traza, loop.time)
+    if bd is not None:
+        registro_persistente.abrir(bd, lote_bd)
     logger.info("=== SIMULACIÓN HOSPITALARIA INICIADA ===")
-    logger.info(f"Pacientes a simular: {num_pacientes}")
+    if archivo_llegadas is not None:
+        logger.info(f"Llegadas: traza {archivo_llegadas} ({num_pacientes or 'todas las'} filas)")
+    else:
+        logger.info(f"Pacientes a simular: {num_pacientes} (llegadas '{llegadas}')")
+    logger.info(f"Modo de inferencia: {modo_inferencia} | Ejecutor: {ejecutor}")
+    logger.info(f"Recursos: {', '.join(f'{n}={recursos[n].capacidad}' for n in recursos)}")
+    if distribucion_tiempos != DISTRIBUCION_DEFECTO or escala_tiempos != 1.0:
+        logger.info(f"Duraciones de etapas: {distribucion_tiempos} (escala {escala_tiempos:g})")
+    logger.info(f"Directorio de modelos: {directorio_modelos()}")
+    if bd is not None:
+        logger.info(f"Registro persistente: {bd} (lotes de hasta {lote_bd})")
+    if reanudacion is not None:
+        logger.info(f"Reanudando desde {punto_control}: {reanudacion['resumen']['completados']} flujos "
+                    f"completados, {len(reanudacion['en_vuelo'])} en vuelo, {transcurrido:.0f} s simulados")
     logger.info("====================================")
 
-    with ProcessPoolExecutor() as cpu_executor:
-        patient_flow_tasks = await simular_llegadas_async(num_pacientes, cpu_executor)
-        results = await asyncio.gather(*patient_flow_tasks, return_exceptions=True)
-
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"La tarea del paciente {i+1} terminó con una excepción no manejada en gather: {result}", exc_info=True)
+    # Cambios de capacidad programados (recurso, capacidad, segundos desde el inicio);
+    # al reanudar, los ya aplicados vienen en la capacidad restaurada
+    for pool, capacidad, retraso in cambios_capacidad or []:
+        if retraso >= transcurrido:
+            loop.call_later(retraso - transcurrido, recursos.redimensionar, pool, capacidad)
+
+    with crear_ejecutor(ejecutor, trabajadores, max_tareas_por_hijo, dir_modelos, mmap_modelos) as cpu_executor:
+        exposicion = None
+        if puerto_metricas is not None or archivo_metricas is not None:
+            def recolectar():
+                return {'eventos': estadisticas_globales.instantanea(), 'en_etapa': en_vuelo_etapa.resumen(),
+                        'recursos': recursos.resumen(), 'latencias': latencias_etapa.resumen(),
+                        'cola_ejecutor': tareas_executor.valor,
+                        'tiempo_simulado': loop.time() - reloj_inicio}
+            exposicion = ExposicionMetricas(recolectar, puerto_metricas, archivo_metricas, intervalo_metricas)
+            exposicion.iniciar(loop)
+        inferencia = await crear_inferencia(modo_inferencia, cpu_executor, max_lote, ventana_lote, version)
+        if vigilante is not None:
+            vigilante.al_cambiar = inferencia.cambiar_version
+            vigilante.iniciar()
+        guardar = None
+        if reanudacion is not None:
+            inferencia.predicciones_por_version.update(reanudacion['predicciones_por_version'])
+        if punto_control is not None:
+            puntos_control.abrir(punto_control, intervalo_punto_control)
+
+            def guardar(resumen, posicion):
+                puntos_control.guardar({
+                    'configuracion': configuracion, 'tiempo_simulado': loop.time() - reloj_inicio,
+                    'posicion': posicion, 'resumen': resumen, 'eventos': estadisticas_globales.instantanea(),
+                    'latencias': latencias_etapa.estado(), 'recursos': recursos.contadores(),
+                    'predicciones_por_version': inferencia.predicciones_por_version})
+        try:
+            resumen = await simular_llegadas_async(fuente, inferencia, max_en_vuelo, reloj_inicio,
+                                                   reanudacion, guardar)
+        finally:
+            puntos_control.cerrar()
+        if vigilante is not None:
+            await vigilante.detener()
+        await inferencia.cerrar()
+        if exposicion is not None:
+            exposicion.detener()
+    await registro_persistente.cerrar()
 
     tiempo_total = time.time() - tiempo_inicio
+    tiempo_simulado = loop.time() - reloj_inicio
     logger.info("\n=== SIMULACIÓN COMPLETADA ===")
-    mostrar_estadisticas(estadisticas_globales)
+    if reporte:
+        vaciar_logs() # Que las tablas no se intercalen con logs aún en la cola
+        mostrar_estadisticas(estadisticas_globales.instantanea())
+        mostrar_utilizacion(recursos.resumen(), recursos.cuello_de_botella())
+        mostrar_latencias(latencias_etapa.resumen())
+    logger.info("Predicciones por versión de modelos: "
+                + ", ".join(f"{v}={n}" for v, n in sorted(inferencia.predicciones_por_version.items())))
     logger.info(f"⏱️ Tiempo total del proceso: {tiempo_total:.2f} segundos")
+    if abs(tiempo_simulado - tiempo_total) > 1:
+        logger.info(f"⏱️ Tiempo simulado: {tiempo_simulado:.2f} segundos")
+    if resumen['excepciones']:
+        logger.error(f"{resumen['excepciones']} flujos terminaron con excepciones no manejadas.")
+    histogramas = LatenciasPorEtapa() # Copia: latencias_etapa se limpia en la siguiente corrida
+    histogramas.combinar(latencias_etapa)
+    if traza is not None:
+        escritos = trazador.exportar(traza, formato_traza)
+        logger.info(f"Traza {formato_traza} guardada en {traza} ({escritos} spans, {trazador.descartados} descartados)")
+        trazador.configurar(False)
+    return {'tiempo_real': tiempo_total, 'tiempo_simulado': tiempo_simulado, 'resumen': resumen,
+            'latencias': latencias_etapa.resumen(),
+            'predicciones_por_version': dict(inferencia.predicciones_por_version),
+            'estadisticas': estadisticas_globales.instantanea(), 'recursos': recursos.resumen(),
+            'histogramas': histogramas}
 
 # --- Punto de Entrada del Script ---
 
+def leer_capacidades(valores):
+    """Convierte ['uci=4', ...] en un diccionario de capacidades sobre los valores por defecto."""
+    capacidades = dict(CAPACIDADES_DEFECTO)
+    for valor in valores:
+        nombre, _, cantidad = valor.partition("=")
+        if nombre not in capacidades or not cantidad:
+            raise ValueError(f"Capacidad inválida '{valor}'; use RECURSO=N con RECURSO en {list(capacidades)}")
+        capacidades[nombre] = int(cantidad)
+    return capacidades
+
+
+def leer_cambios_capacidad(valores):
+    """Convierte ['uci=4@3600', ...] en una lista de (recurso, capacidad, segundos)."""
+    cambios = []
+    for valor in valores:
+        asignacion, _, instante = valor.partition("@")
+        nombre, _, cantidad = asignacion.partition("=")
+        if nombre not in CAPACIDADES_DEFECTO or not cantidad or not instante:
+            raise ValueError(f"Cambio de capacidad inválido '{valor}'; use RECURSO=N@SEGUNDOS")
+        cambios.append((nombre, int(cantidad), float(instante)))
+    return cambios
+
+
+def crear_parser():
+    """Define los argumentos de línea de comandos de la simulación."""
+    parser = argparse.ArgumentParser(description="Simulación concurrente de un sistema hospitalario.")
+    parser.add_argument("num_pacientes", nargs="?", type=int, default=None,
+                        help="Número de pacientes a simular (por defecto 10, o todas las filas de --archivo-llegadas)")
+    parser.add_argument("--llegadas", choices=TIPOS_LLEGADAS, default=TIPO_LLEGADAS_DEFECTO,
+                        help="Modelo de llegadas: 'uniforme' (intervalos de 0.1 a 0.5 s), 'poisson' o 'horaria' "
+                             f"(Poisson con tasa según la hora del día). Por defecto '{TIPO_LLEGADAS_DEFECTO}'")
+    parser.add_argument("--tasa-llegadas", type=float, default=None,
+                        help=f"Llegadas por segundo de 'poisson' y 'horaria' (por defecto {TASA_DEFECTO:.2f})")
+    parser.add_argument("--archivo-llegadas", default=None, metavar="ARCHIVO",
+                        help="Reproduce una traza de llegadas CSV o Parquet (columnas instante, id opcional y "
+                             "síntomas) leyéndola en streaming; reemplaza a --llegadas")
+    parser.add_argument("--modo-inferencia", choices=["tabla", "lotes", "ejecutor"], default="tabla",
+                        help="'tabla' usa resultados precalculados en línea; 'lotes' agrupa triage/diagnóstico "
+                             "en micro-lotes; 'ejecutor' hace una llamada por paciente")
+    parser.add_argument("--ejecutor", choices=BACKENDS, default=BACKEND_DEFECTO,
+                        help="Dónde corren triage y diagnóstico: 'procesos' (pool de procesos), 'hilos' (pool de "
+                             "hilos), 'hilos-libres' (un hilo por CPU, para Python free-threaded) o 'en-linea' "
+                             f"(en el event loop, sin IPC). Por defecto '{BACKEND_DEFECTO}'")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Procesos o hilos del ejecutor (por defecto, el del backend)")
+    parser.add_argument("--max-tareas-por-hijo", type=int, default=None,
+                        help="Tareas tras las que se reemplaza cada proceso (solo --ejecutor procesos)")
+    parser.add_argument("--lote-max", type=int, default=MAX_LOTE_DEFECTO,
+                        help=f"Tamaño máximo de un micro-lote (por defecto {MAX_LOTE_DEFECTO})")
+    parser.add_argument("--lote-ventana-ms", type=float, default=VENTANA_LOTE_DEFECTO * 1000,
+                        help=f"Ventana de espera de un micro-lote en ms (por defecto {VENTANA_LOTE_DEFECTO * 1000:g})")
+    parser.add_argument("--modelos-dir", default=None,
+                        help="Directorio con los modelos .pkl (por defecto, el directorio del código)")
+    parser.add_argument("--registro-modelos", default=None, metavar="DIRECTORIO",
+                        help="Sirve la última versión de un registro de modelos (registro_modelos.py) y cambia "
+                             "en caliente cuando se publica otra (reemplaza a --modelos-dir)")
+    parser.add_argument("--intervalo-registro", type=float, default=INTERVALO_VIGILANCIA_DEFECTO,
+                        help=f"Segundos entre sondeos del registro de modelos (por defecto {INTERVALO_VIGILANCIA_DEFECTO:g})")
+    parser.add_argument("--mmap-modelos", action="store_const", const="r", default=None,
+                        help="Cargar los arreglos de los modelos con memory-mapping (joblib mmap_mode='r')")
+    parser.add_argument("--max-en-vuelo", type=int, default=MAX_EN_VUELO_DEFECTO,
+                        help=f"Máximo de pacientes en el hospital a la vez; las llegadas esperan si se alcanza "
+                             f"(0 = sin límite, por defecto {MAX_EN_VUELO_DEFECTO})")
+    parser.add_argument("--capacidad", action="append", default=[], metavar="RECURSO=N",
+                        help="Capacidad de un recurso (uci, general, observacion, medicos); se puede repetir. "
+                             f"Por defecto: {', '.join(f'{k}={v}' for k, v in CAPACIDADES_DEFECTO.items())}")
+    parser.add_argument("--cambio-capacidad", action="append", default=[], metavar="RECURSO=N@SEGUNDOS",
+                        help="Redimensiona un recurso durante la corrida, p. ej. uci=4@3600; se puede repetir")
+    parser.add_argument("--envejecimiento", type=float, default=ENVEJECIMIENTO_DEFECTO,
+                        help="Segundos de espera que equivalen a subir un nivel de prioridad al pedir cama "
+                             f"('inf' = prioridad estricta, por defecto {ENVEJECIMIENTO_DEFECTO:g})")
+    parser.add_argument("--tiempos", choices=DISTRIBUCIONES, default=DISTRIBUCION_DEFECTO,
+                        help="Distribución de las duraciones de registro, tratamiento, seguimiento y observación; "
+                             f"todas con la misma media (por defecto '{DISTRIBUCION_DEFECTO}')")
+    parser.add_argument("--escala-tiempos", type=float, default=1.0,
+                        help="Factor sobre las duraciones de las etapas (por defecto 1)")
+    parser.add_argument("--traza", default=None, metavar="ARCHIVO",
+                        help="Registra un span por etapa y paciente y los guarda en ARCHIVO (JSON) al terminar")
+    parser.add_argument("--formato-traza", choices=FORMATOS_TRAZA, default="chrome",
+                        help="'chrome' (trace-event, para chrome://tracing o Perfetto) u 'otlp' (JSON de OpenTelemetry)")
+    parser.add_argument("--traza-capacidad", type=int, default=CAPACIDAD_TRAZA_DEFECTO,
+                        help=f"Spans retenidos en el buffer circular (por defecto {CAPACIDAD_TRAZA_DEFECTO})")
+    parser.add_argument("--bd", default=None, metavar="ARCHIVO",
+                        help="Guarda los registros de pacientes y sus transiciones de etapa en ARCHIVO (SQLite, "
+                             "modo WAL) en lugar de simular la latencia de registro")
+    parser.add_argument("--lote-bd", type=int, default=TAMANO_LOTE_DEFECTO,
+                        help=f"Filas máximas por transacción del registro persistente (por defecto {TAMANO_LOTE_DEFECTO})")
+    parser.add_argument("--metricas-puerto", type=int, default=None, metavar="PUERTO",
+                        help="Expone métricas en vivo en http://127.0.0.1:PUERTO/metrics (Prometheus) y /json")
+    parser.add_argument("--metricas-json", default=None, metavar="ARCHIVO",
+                        help="Reescribe ARCHIVO con la última muestra de métricas en JSON")
+    parser.add_argument("--metricas-intervalo", type=float, default=INTERVALO_METRICAS_DEFECTO,
+                        help=f"Segundos reales entre muestras de métricas (por defecto {INTERVALO_METRICAS_DEFECTO:g})")
+    parser.add_argument("--punto-control", default=None, metavar="ARCHIVO",
+                        help="Agrega periódicamente a ARCHIVO (JSON lines) un punto de control de la corrida")
+    parser.add_argument("--punto-control-intervalo", type=float, default=INTERVALO_PUNTO_CONTROL_DEFECTO,
+                        help="Segundos reales entre puntos de control "
+                             f"(por defecto {INTERVALO_PUNTO_CONTROL_DEFECTO:g})")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Continúa la corrida desde el último punto de control de --punto-control "
+                             "(con los mismos argumentos de llegadas y número de pacientes)")
+    parser.add_argument("--fragmentos", type=int, default=1,
+                        help="Reparte los pacientes y la capacidad entre N procesos, cada uno con su event loop, "
+                             "y fusiona el reporte al final (0 = uno por CPU, por defecto 1)")
+    parser.add_argument("--tiempo-virtual", action="store_true",
+                        help="Simulación de eventos discretos: las esperas avanzan un reloj virtual al instante")
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="Semilla del generador aleatorio para corridas reproducibles")
+    parser.add_argument("--nivel-log", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Nivel de logging (por defecto INFO)")
+    parser.add_argument("--log-json", default=None, metavar="ARCHIVO",
+                        help="Escribe además cada registro como una línea JSON (etapa y paciente como campos)")
+    parser.add_argument("--log-sincrono", action="store_true",
+                        help="Formatea y escribe los logs en el hilo del event loop en lugar de un QueueListener")
+    return parser
+
+
 if __name__ == "__main__":
+    args = crear_parser().parse_args()
+    configurar_logging(args.nivel_log, args.log_json, en_cola=not args.log_sincrono)
+    if args.semilla is not None:
+        random.seed(args.semilla)
     try:
-        num_pacientes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
-        asyncio.run(main(num_pacientes))
-    except ValueError:
-        logger.error("Por favor, proporcione un número válido de pacientes como argumento.")
+        capacidades = leer_capacidades(args.capacidad)
+        cambios_capacidad = leer_cambios_capacidad(args.cambio_capacidad)
+        opciones = dict(modo_inferencia=args.modo_inferencia, max_lote=args.lote_max,
+                        ventana_lote=args.lote_ventana_ms / 1000, dir_modelos=args.modelos_dir,
+                        mmap_modelos=args.mmap_modelos, max_en_vuelo=args.max_en_vuelo,
+                        envejecimiento=args.envejecimiento, traza=args.traza, formato_traza=args.formato_traza,
+                        capacidad_traza=args.traza_capacidad, registro_modelos=args.registro_modelos,
+                        intervalo_registro=args.intervalo_registro, ejecutor=args.ejecutor,
+                        trabajadores=args.trabajadores, max_tareas_por_hijo=args.max_tareas_por_hijo,
+                        bd=args.bd, lote_bd=args.lote_bd, llegadas=args.llegadas,
+                        tasa_llegadas=args.tasa_llegadas, archivo_llegadas=args.archivo_llegadas,
+                        puerto_metricas=args.metricas_puerto, archivo_metricas=args.metricas_json,
+                        intervalo_metricas=args.metricas_intervalo, punto_control=args.punto_control,
+                        intervalo_punto_control=args.punto_control_intervalo, reanudar=args.reanudar,
+                        distribucion_tiempos=args.tiempos, escala_tiempos=args.escala_tiempos)
+        num_pacientes = args.num_pacientes
+        if num_pacientes is None and args.archivo_llegadas is None:
+            num_pacientes = 10
+        if args.fragmentos != 1:
+            from simulacion_distribuida import simular_distribuida
+            simular_distribuida(num_pacientes, args.fragmentos or None, capacidades, cambios_capacidad,
+                                args.semilla, args.tiempo_virtual, args.nivel_log, **opciones)
+        elif args.tiempo_virtual:
+            ejecutar_con_tiempo_virtual(main(num_pacientes, capacidades=capacidades,
+                                             cambios_capacidad=cambios_capacidad, **opciones))
+        else:
+            asyncio.run(main(num_pacientes, capacidades=capacidades,
+                             cambios_capacidad=cambios_capacidad, **opciones))
+    except ValueError as e:
+        logger.error(f"Configuración inválida: {e}")
     except KeyboardInterrupt:
         logger.info("\nSimulación interrumpida por el usuario.")
     except Exception as e:
-        logger.critical(f"Error crítico no manejado durante la ejecución principal: {type(e).__name__} - {e}", exc_info=True)
\ No newline at end of file
+        logger.critical(f"Error crítico no manejado durante la ejecución principal: {type(e).__name__} - {e}", exc_info=True)
+    finally:
+        detener_logging()
\ No newline at end of file
@@ -0,0 +1,210 @@
+import math
+
+# Rango y resolución del histograma logarítmico
+LATENCIA_MINIMA = 1e-6 # 1 µs
+LATENCIA_MAXIMA = 1e6 # ~11.5 días
+SUBDIVISIONES_POR_OCTAVA = 16 # Error relativo máximo ~2.2 %
+
+ETAPAS_LATENCIA = ('registro', 'triage', 'diagnostico', 'espera_cama', 'tratamiento', 'seguimiento')
+
+
+class HistogramaLatencia:
+    """
+    Métrica de latencia en streaming con memoria constante.
+
+    Lleva total, suma, mínimo y máximo exactos, y un histograma de cubetas
+    logarítmicas (estilo HDR) para estimar percentiles. Cada registro es O(1);
+    la consulta de un percentil recorre un número fijo de cubetas.
+    """
+
+    _factor = SUBDIVISIONES_POR_OCTAVA / math.log(2)
+    _num_cubetas = int(math.ceil(math.log(LATENCIA_MAXIMA / LATENCIA_MINIMA) * _factor)) + 1
+
+    def __init__(self):
+        self.total = 0
+        self.suma = 0.0
+        self.minimo = math.inf
+        self.maximo = 0.0
+        self._cubetas = [0] * self._num_cubetas
+
+    def _indice(self, valor):
+        if valor <= LATENCIA_MINIMA:
+            return 0
+        return min(int(math.log(valor / LATENCIA_MINIMA) * self._factor), self._num_cubetas - 1)
+
+    def _representante(self, indice):
+        # Punto medio geométrico de la cubeta: error relativo <= la mitad del ancho
+        return LATENCIA_MINIMA * math.exp((indice + 0.5) / self._factor)
+
+    def registrar(self, valor):
+        """Agrega una observación (segundos)."""
+        self.total += 1
+        self.suma += valor
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        self._cubetas[self._indice(valor)] += 1
+
+    @property
+    def media(self):
+        return self.suma / self.total if self.total else 0.0
+
+    def percentil(self, q):
+        """Estimación del percentil q (0-100), acotada por el mínimo y el máximo exactos."""
+        if not self.total:
+            return 0.0
+        objetivo = max(1, math.ceil(q / 100 * self.total))
+        acumulado = 0
+        for indice, cantidad in enumerate(self._cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(max(self._representante(indice), self.minimo), self.maximo)
+        return self.maximo
+
+    def combinar(self, otro):
+        """Suma otro histograma a este (p. ej. el de otro proceso)."""
+        self.total += otro.total
+        self.suma += otro.suma
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        for indice, cantidad in enumerate(otro._cubetas):
+            if cantidad:
+                self._cubetas[indice] += cantidad
+
+    def descontar(self, valor):
+        """Quita una observación registrada antes; el mínimo y el máximo no se recalculan."""
+        self.total -= 1
+        self.suma -= valor
+        self._cubetas[self._indice(valor)] -= 1
+
+    def limpiar(self):
+        self.__init__()
+
+    def estado(self):
+        """Estado serializable en JSON (solo las cubetas no vacías), para puntos de control."""
+        return {'total': self.total, 'suma': self.suma, 'minimo': self.minimo, 'maximo': self.maximo,
+                'cubetas': [[indice, cantidad] for indice, cantidad in enumerate(self._cubetas) if cantidad]}
+
+    def restaurar(self, estado):
+        """Inversa de estado()."""
+        self.limpiar()
+        self.total = estado['total']
+        self.suma = estado['suma']
+        self.minimo = estado['minimo']
+        self.maximo = estado['maximo']
+        for indice, cantidad in estado['cubetas']:
+            self._cubetas[indice] = cantidad
+
+    def resumen(self):
+        if not self.total:
+            return {'total': 0, 'promedio': 0, 'max': 0, 'min': 0, 'p50': 0, 'p95': 0, 'p99': 0}
+        return {
+            'total': self.total,
+            'promedio': self.media,
+            'max': self.maximo,
+            'min': self.minimo,
+            'p50': self.percentil(50),
+            'p95': self.percentil(95),
+            'p99': self.percentil(99),
+        }
+
+
+class LatenciasPorEtapa:
+    """Un HistogramaLatencia por etapa del flujo del paciente."""
+
+    def __init__(self, etapas=ETAPAS_LATENCIA):
+        self.histogramas = {etapa: HistogramaLatencia() for etapa in etapas}
+
+    def __getitem__(self, etapa):
+        return self.histogramas[etapa]
+
+    def registrar(self, etapa, segundos):
+        histograma = self.histogramas.get(etapa)
+        if histograma is None:
+            histograma = self.histogramas[etapa] = HistogramaLatencia()
+        histograma.registrar(segundos)
+
+    def combinar(self, otras):
+        for etapa, histograma in otras.histogramas.items():
+            if etapa not in self.histogramas:
+                self.histogramas[etapa] = HistogramaLatencia()
+            self.histogramas[etapa].combinar(histograma)
+
+    def limpiar(self):
+        for histograma in self.histogramas.values():
+            histograma.limpiar()
+
+    def estado(self):
+        return {etapa: histograma.estado() for etapa, histograma in self.histogramas.items()}
+
+    def restaurar(self, estado):
+        for etapa, datos in estado.items():
+            if etapa not in self.histogramas:
+                self.histogramas[etapa] = HistogramaLatencia()
+            self.histogramas[etapa].restaurar(datos)
+
+    def resumen(self):
+        return {etapa: histograma.resumen() for etapa, histograma in self.histogramas.items()}
+
+
+class ContadorEnVuelo:
+    """Gauge de pacientes dentro de una etapa; `with contador:` entra y sale."""
+
+    __slots__ = ("valor",)
+
+    def __init__(self):
+        self.valor = 0
+
+    def entrar(self):
+        self.valor += 1
+
+    def salir(self):
+        self.valor -= 1
+
+    def __enter__(self):
+        self.valor += 1
+
+    def __exit__(self, *exc):
+        self.valor -= 1
+        return False
+
+
+class EnVueloPorEtapa:
+    """
+    Un ContadorEnVuelo por etapa ('hospital' cuenta a todos los pacientes en el flujo).
+
+    Cada etapa reutiliza su contador, así que marcar la entrada y la salida cuesta
+    dos sumas; quien exporta las métricas solo lee los valores al muestrear.
+    Como el resto de las métricas, solo se actualiza desde el hilo del event loop.
+    """
+
+    def __init__(self, etapas=('hospital', 'registro', 'triage', 'diagnostico', 'cama', 'seguimiento')):
+        self.contadores = {etapa: ContadorEnVuelo() for etapa in etapas}
+
+    def __getitem__(self, etapa):
+        contador = self.contadores.get(etapa)
+        if contador is None:
+            contador = self.contadores[etapa] = ContadorEnVuelo()
+        return contador
+
+    def limpiar(self):
+        for contador in self.contadores.values():
+            contador.valor = 0
+
+    def resumen(self):
+        return {etapa: contador.valor for etapa, contador in self.contadores.items()}
+
+
+# Latencias de la corrida en curso (se limpian con reiniciar_metricas, nunca se reemplazan)
+latencias_etapa = LatenciasPorEtapa()
+# Pacientes en cada etapa en este momento
+en_vuelo_etapa = EnVueloPorEtapa()
+# Tareas enviadas al executor de inferencia que aún no terminaron (en cola o corriendo)
+tareas_executor = ContadorEnVuelo()
+
+
+def reiniciar_metricas():
+    latencias_etapa.limpiar()
+    en_vuelo_etapa.limpiar()
+    tareas_executor.valor = 0
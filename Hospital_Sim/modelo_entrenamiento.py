@@ -1,84 +1,214 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
 import joblib
-import random
-
-def generar_datos(n=1000):
-    """Genera datos sintéticos de pacientes"""
-    sintomas = []
-    enfermedades = []
-    prioridades = []
-
-    for _ in range(n):
-        fiebre = random.randint(0, 1)
-        tos = random.randint(0, 1)
-        dolor = random.randint(0, 1)
-        fatiga = random.randint(0, 1)
-        respirar = random.randint(0, 1)
-
-        # Reglas simples para prioridad y diagnóstico
-        if respirar and fiebre:
-            enfermedad = "COVID-19"
-            prioridad = "Crítica"
-        elif fiebre and tos:
-            enfermedad = "Gripe"
-            prioridad = "Alta"
-        elif dolor and fatiga:
-            enfermedad = "Infección"
-            prioridad = "Media"
-        else:
-            enfermedad = "Común"
-            prioridad = "Baja"
-
-        sintomas.append([fiebre, tos, dolor, fatiga, respirar])
-        enfermedades.append(enfermedad)
-        prioridades.append(prioridad)
-
-    return pd.DataFrame(
-        sintomas, 
-        columns=["fiebre", "tos", "dolor", "fatiga", "respirar"]
-    ).assign(
-        enfermedad=enfermedades,
-        prioridad=prioridades
+from paciente import COLUMNAS_SINTOMAS
+from modelos import directorio_modelos
+from arbol_plano import exportar_arbol, guardar_arbol
+from registro_modelos import sha256_archivo
+
+# Árboles exportados junto a cada pickle: (modelo, codificador, archivo .npz)
+ARBOLES = (
+    ("modelo_diagnostico.pkl", "label_enfermedad.pkl", "arbol_diagnostico.npz"),
+    ("modelo_triage.pkl", "label_prioridad.pkl", "arbol_triage.npz"),
+)
+
+# Reglas simples para prioridad y diagnóstico, en orden de precedencia:
+# (síntomas que deben estar presentes, enfermedad, prioridad). Si ninguna aplica: Común / Baja
+REGLAS = (
+    (("respirar", "fiebre"), "COVID-19", "Crítica"),
+    (("fiebre", "tos"), "Gripe", "Alta"),
+    (("dolor", "fatiga"), "Infección", "Media"),
+)
+ENFERMEDADES = tuple(enfermedad for _, enfermedad, _ in REGLAS) + ("Común",)
+PRIORIDADES = tuple(prioridad for _, _, prioridad in REGLAS) + ("Baja",)
+
+TAMANO_BLOQUE_DEFECTO = 1_000_000
+PROFUNDIDAD_DIAGNOSTICO = 5
+PROFUNDIDAD_TRIAGE = 4
+
+
+def generar_bloque(n, rng, columnas=COLUMNAS_SINTOMAS):
+    """
+    Genera n filas sintéticas de forma vectorizada.
+
+    Args:
+        n: Número de filas
+        rng: numpy.random.Generator
+        columnas: Síntomas a generar; deben incluir los de REGLAS y pueden agregar otros
+    Returns:
+        (sintomas uint8 de forma (n, len(columnas)), índice de regla por fila en ENFERMEDADES/PRIORIDADES)
+    """
+    sintomas = rng.integers(0, 2, size=(n, len(columnas)), dtype=np.uint8)
+    columna = {nombre: sintomas[:, i].astype(bool) for i, nombre in enumerate(columnas)}
+    condiciones = [np.logical_and.reduce([columna[s] for s in requeridos]) for requeridos, _, _ in REGLAS]
+    regla = np.select(condiciones, range(len(REGLAS)), default=len(REGLAS)).astype(np.uint8)
+    return sintomas, regla
+
+
+def generar_bloques(n, semilla=None, tamano_bloque=TAMANO_BLOQUE_DEFECTO, columnas=COLUMNAS_SINTOMAS):
+    """Genera n filas en bloques de a lo sumo tamano_bloque, cada uno con su propio flujo aleatorio derivado de la semilla."""
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n // tamano_bloque))
+    for i, semilla_bloque in enumerate(semillas):
+        tamano = min(tamano_bloque, n - i * tamano_bloque)
+        yield generar_bloque(tamano, np.random.default_rng(semilla_bloque), columnas)
+
+
+def generar_datos(n=1000, semilla=None, tamano_bloque=TAMANO_BLOQUE_DEFECTO, columnas=COLUMNAS_SINTOMAS):
+    """
+    Genera datos sintéticos de pacientes (enfermedad y prioridad como columnas categóricas).
+
+    Cada bloque se copia en arreglos reservados de antemano, así que la generación
+    usa el resultado más un bloque (no el doble del resultado). Los árboles de sklearn
+    no se ajustan por partes: el entrenamiento necesita la matriz completa.
+    """
+    faltantes = {s for requeridos, _, _ in REGLAS for s in requeridos} - set(columnas)
+    if faltantes:
+        raise ValueError(f"Faltan los síntomas de las reglas: {sorted(faltantes)}")
+    sintomas = np.empty((n, len(columnas)), dtype=np.uint8)
+    regla = np.empty(n, dtype=np.uint8)
+    inicio = 0
+    for sintomas_bloque, regla_bloque in generar_bloques(n, semilla, tamano_bloque, columnas):
+        fin = inicio + len(regla_bloque)
+        sintomas[inicio:fin], regla[inicio:fin] = sintomas_bloque, regla_bloque
+        inicio = fin
+    return pd.DataFrame(sintomas, columns=list(columnas), copy=False).assign(
+        enfermedad=pd.Categorical.from_codes(regla, ENFERMEDADES),
+        prioridad=pd.Categorical.from_codes(regla, PRIORIDADES),
     )
 
-def entrenar_modelos():
-    """Entrena y guarda los modelos de clasificación"""
-    df = generar_datos()
-    
+
+def _codificar(categorias):
+    """LabelEncoder ajustado a las categorías y códigos por fila, sin recorrer las cadenas de cada fila."""
+    codificador = LabelEncoder().fit(np.asarray(categorias.cat.categories))
+    codigos = codificador.transform(np.asarray(categorias.cat.categories))
+    return codificador, codigos[categorias.cat.codes.to_numpy()]
+
+
+def _entrenar_arbol(X, y, profundidad, semilla):
+    """Corre en un proceso aparte: separa entrenamiento/prueba, ajusta el árbol y mide su exactitud."""
+    inicio = time.perf_counter()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=semilla)
+    clf = DecisionTreeClassifier(max_depth=profundidad, random_state=semilla)
+    clf.fit(X_train, y_train)
+    return clf, clf.score(X_test, y_test), time.perf_counter() - inicio
+
+
+def entrenar_modelos(n=1000, semilla=None, salida=None, procesos=2, tamano_bloque=TAMANO_BLOQUE_DEFECTO,
+                     columnas=COLUMNAS_SINTOMAS):
+    """
+    Entrena y guarda los modelos de clasificación
+
+    Args:
+        n: Filas sintéticas de entrenamiento
+        semilla: Semilla de la generación y del entrenamiento (None = aleatoria)
+        salida: Directorio donde guardar los .pkl (por defecto, el directorio de modelos)
+        procesos: Procesos para entrenar triage y diagnóstico en paralelo (1 = secuencial)
+        tamano_bloque: Filas por bloque de generación
+        columnas: Síntomas de entrenamiento; deben incluir los de REGLAS. La simulación solo
+                  sirve modelos entrenados con COLUMNAS_SINTOMAS (en ese orden)
+    Returns:
+        Diccionario con los tiempos de cada fase (segundos) y la exactitud de cada modelo
+    """
+    salida = salida or directorio_modelos()
+    os.makedirs(salida, exist_ok=True)
+    tiempos = {}
+
+    inicio = time.perf_counter()
+    df = generar_datos(n, semilla, tamano_bloque, columnas)
+    tiempos['generacion'] = time.perf_counter() - inicio
+
     # Codificación de etiquetas
-    le_enf = LabelEncoder()
-    le_prio = LabelEncoder()
-    
-    df["enfermedad_cod"] = le_enf.fit_transform(df["enfermedad"])
-    df["prioridad_cod"] = le_prio.fit_transform(df["prioridad"])
-    
-    # Datos para entrenamiento
-    X = df[["fiebre", "tos", "dolor", "fatiga", "respirar"]]
-    y_diag = df["enfermedad_cod"]
-    y_prio = df["prioridad_cod"]
-    
-    # Modelo de diagnóstico
-    X_train, X_test, y_train, y_test = train_test_split(X, y_diag, test_size=0.2)
-    clf_diag = DecisionTreeClassifier(max_depth=5)
-    clf_diag.fit(X_train, y_train)
-    
-    # Modelo de triage
-    X_train2, X_test2, y_train2, y_test2 = train_test_split(X, y_prio, test_size=0.2)
-    clf_triage = DecisionTreeClassifier(max_depth=4)
-    clf_triage.fit(X_train2, y_train2)
-    
+    inicio = time.perf_counter()
+    le_enf, y_diag = _codificar(df["enfermedad"])
+    le_prio, y_prio = _codificar(df["prioridad"])
+    X = df[list(columnas)] # DataFrame: los modelos guardan los nombres de columna
+    tiempos['codificacion'] = time.perf_counter() - inicio
+
+    # Modelos de diagnóstico y triage (en paralelo si procesos > 1)
+    inicio = time.perf_counter()
+    trabajos = [(X, y_diag, PROFUNDIDAD_DIAGNOSTICO, semilla), (X, y_prio, PROFUNDIDAD_TRIAGE, semilla)]
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(trabajos))) as executor:
+            resultados = list(executor.map(_entrenar_arbol, *zip(*trabajos)))
+    else:
+        resultados = [_entrenar_arbol(*trabajo) for trabajo in trabajos]
+    (clf_diag, exactitud_diag, tiempos['arbol_diagnostico']), (clf_triage, exactitud_triage, tiempos['arbol_triage']) = resultados
+    tiempos['entrenamiento'] = time.perf_counter() - inicio
+
     # Guardar modelos
-    joblib.dump(clf_diag, "modelo_diagnostico.pkl")
-    joblib.dump(clf_triage, "modelo_triage.pkl")
-    joblib.dump(le_enf, "label_enfermedad.pkl")
-    joblib.dump(le_prio, "label_prioridad.pkl")
-    
-    print("✅ Modelos entrenados y guardados")
+    inicio = time.perf_counter()
+    joblib.dump(clf_diag, os.path.join(salida, "modelo_diagnostico.pkl"))
+    joblib.dump(clf_triage, os.path.join(salida, "modelo_triage.pkl"))
+    joblib.dump(le_enf, os.path.join(salida, "label_enfermedad.pkl"))
+    joblib.dump(le_prio, os.path.join(salida, "label_prioridad.pkl"))
+    if tuple(columnas) == COLUMNAS_SINTOMAS: # El árbol plano solo evalúa las columnas de la simulación
+        guardar_arbol(os.path.join(salida, "arbol_diagnostico.npz"), exportar_arbol(clf_diag, le_enf),
+                      huella=sha256_archivo(os.path.join(salida, "modelo_diagnostico.pkl")))
+        guardar_arbol(os.path.join(salida, "arbol_triage.npz"), exportar_arbol(clf_triage, le_prio),
+                      huella=sha256_archivo(os.path.join(salida, "modelo_triage.pkl")))
+    tiempos['guardado'] = time.perf_counter() - inicio
+
+    print(f"✅ Modelos entrenados y guardados en {salida}")
+    if tuple(columnas) != COLUMNAS_SINTOMAS:
+        print(f"   ⚠️ Entrenados con {len(columnas)} síntomas (sin árboles .npz): main.py solo sirve modelos "
+              f"con {COLUMNAS_SINTOMAS}")
+    print(f"   Exactitud (20 % de prueba): diagnóstico {exactitud_diag:.3f} | triage {exactitud_triage:.3f}")
+    for fase, segundos in tiempos.items():
+        print(f"   ⏱️ {fase:<18} {segundos:>8.2f} s")
+    return {'tiempos': tiempos, 'exactitud_diagnostico': exactitud_diag, 'exactitud_triage': exactitud_triage}
+
+
+def exportar_arboles(directorio=None):
+    """
+    Exporta a .npz los árboles de los .pkl ya entrenados de un directorio, sin reentrenar.
+
+    Args:
+        directorio: Directorio con los .pkl (por defecto, el directorio de modelos)
+    Returns:
+        Lista de rutas .npz escritas
+    """
+    directorio = directorio or directorio_modelos()
+    rutas = []
+    for modelo, codificador, archivo in ARBOLES:
+        arreglos = exportar_arbol(joblib.load(os.path.join(directorio, modelo)),
+                                  joblib.load(os.path.join(directorio, codificador)))
+        rutas.append(os.path.join(directorio, archivo))
+        guardar_arbol(rutas[-1], arreglos, huella=sha256_archivo(os.path.join(directorio, modelo)))
+        print(f"✅ {modelo} -> {archivo} ({len(arreglos['umbral'])} nodos)")
+    return rutas
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos y entrena los modelos de triage y diagnóstico.")
+    parser.add_argument("--n", type=int, default=1000, help="Filas sintéticas de entrenamiento (por defecto 1000)")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla para datos y modelos reproducibles")
+    parser.add_argument("--salida", default=None,
+                        help="Directorio donde guardar los .pkl (por defecto, el directorio de modelos)")
+    parser.add_argument("--procesos", type=int, default=2,
+                        help="Procesos para entrenar ambos modelos en paralelo (1 = secuencial)")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE_DEFECTO,
+                        help=f"Filas generadas por bloque (por defecto {TAMANO_BLOQUE_DEFECTO})")
+    parser.add_argument("--sintomas", nargs="+", default=list(COLUMNAS_SINTOMAS), metavar="SINTOMA",
+                        help="Síntomas a generar y usar como columnas (deben incluir los de las reglas; por "
+                             f"defecto {' '.join(COLUMNAS_SINTOMAS)})")
+    parser.add_argument("--exportar-arboles", action="store_true",
+                        help="Solo exporta a .npz los .pkl existentes de --salida, sin reentrenar")
+    return parser
+
 
 if __name__ == "__main__":
-    entrenar_modelos()
+    args = crear_parser().parse_args()
+    if args.exportar_arboles:
+        exportar_arboles(args.salida)
+    else:
+        try:
+            entrenar_modelos(args.n, args.semilla, args.salida, args.procesos, args.bloque, args.sintomas)
+        except ValueError as e:
+            raise SystemExit(f"Configuración inválida: {e}")
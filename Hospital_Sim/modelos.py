@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+import logging # Importar logging
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+# Variable de entorno para indicar el directorio de modelos (la heredan los procesos hijos)
+ENV_DIRECTORIO_MODELOS = "HOSPITAL_SIM_MODELOS"
+ENV_MMAP_MODELOS = "HOSPITAL_SIM_MMAP"
+
+# Por defecto los modelos viven junto al código, sin depender del directorio de trabajo
+DIRECTORIO_POR_DEFECTO = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos de cada modelo: (árbol exportado, pickle de sklearn, LabelEncoder)
+ARCHIVOS_MODELOS = {
+    'triage': ("arbol_triage.npz", "modelo_triage.pkl", "label_prioridad.pkl"),
+    'diagnostico': ("arbol_diagnostico.npz", "modelo_diagnostico.pkl", "label_enfermedad.pkl"),
+}
+
+# Modelos de cada directorio ya cargados en este proceso (ver asegurar_modelos)
+MAX_DIRECTORIOS_CARGADOS = 2 # La versión en servicio y la anterior, mientras terminan sus tareas
+_modelos_por_directorio = {}
+_lock_recarga = threading.Lock() # Serializa las cargas cuando varios hilos del executor comparten el caché
+
+
+def configurar_modelos(directorio=None, mmap_mode=None):
+    """
+    Fija el directorio de modelos y el modo de memory-mapping para este proceso y sus hijos.
+
+    Args:
+        directorio: Directorio con los .pkl (None = directorio del código)
+        mmap_mode: Modo de joblib.load ('r', 'c', ...) o None para cargar en memoria
+    """
+    if directorio:
+        os.environ[ENV_DIRECTORIO_MODELOS] = os.path.abspath(directorio)
+    else:
+        os.environ.pop(ENV_DIRECTORIO_MODELOS, None)
+    if mmap_mode:
+        os.environ[ENV_MMAP_MODELOS] = mmap_mode
+    else:
+        os.environ.pop(ENV_MMAP_MODELOS, None)
+
+
+def directorio_modelos():
+    """Directorio absoluto desde el que se cargan los modelos."""
+    return os.path.abspath(os.environ.get(ENV_DIRECTORIO_MODELOS, DIRECTORIO_POR_DEFECTO))
+
+
+def modo_mmap():
+    """Modo de memory-mapping configurado (None = sin mmap)."""
+    return os.environ.get(ENV_MMAP_MODELOS) or None
+
+
+def ruta_modelo(nombre, directorio=None):
+    return os.path.join(directorio or directorio_modelos(), nombre)
+
+
+def cargar_artefacto(nombre, directorio=None):
+    """
+    Carga un artefacto con joblib desde el directorio de modelos.
+
+    Con mmap_mode los arreglos NumPy grandes del pickle se mapean desde disco, de
+    modo que varios procesos comparten las mismas páginas en lugar de copiarlas.
+    """
+    import joblib
+    return joblib.load(ruta_modelo(nombre, directorio), mmap_mode=modo_mmap())
+
+
+def _arbol_vigente(ruta_arbol, ruta_pickle):
+    """
+    True si el .npz existe y se exportó del .pkl actual del mismo modelo.
+
+    Se compara el sha256 del .pkl con el que guardar_arbol registró en el .npz; las
+    fechas de modificación no sirven porque los checkouts y copias las alteran.
+    """
+    from arbol_plano import leer_huella
+    from registro_modelos import sha256_archivo
+    if not os.path.exists(ruta_arbol):
+        return False
+    if not os.path.exists(ruta_pickle):
+        return True
+    huella = leer_huella(ruta_arbol)
+    if huella == sha256_archivo(ruta_pickle):
+        return True
+    archivo = os.path.basename(ruta_pickle)
+    motivo = (f"no registra el sha256 de {archivo}" if huella is None
+              else f"se exportó de otra versión de {archivo}")
+    logger.warning(f"Se ignora {ruta_arbol}: {motivo} "
+                   f"(reexporte los árboles con modelo_entrenamiento.py --exportar-arboles)")
+    return False
+
+
+def cargar_arbol(modelo, directorio=None):
+    """
+    Carga un modelo como ArbolPlano desde el directorio de modelos.
+
+    Prefiere el árbol exportado (.npz, sin sklearn) si se exportó del .pkl actual; si
+    no, carga el pickle de sklearn y lo convierte en memoria. Las columnas se
+    verifican una sola vez al convertir (ver arbol_plano.exportar_arbol).
+
+    Args:
+        modelo: 'triage' o 'diagnostico' (ver ARCHIVOS_MODELOS)
+        directorio: Directorio de los archivos (None = directorio_modelos())
+    Returns:
+        El ArbolPlano del modelo
+    Raises:
+        ImportError: Si faltan los archivos o el modelo no es compatible
+    """
+    from arbol_plano import ArbolPlano, exportar_arbol
+    archivo_arbol, archivo_pickle, archivo_etiquetas = ARCHIVOS_MODELOS[modelo]
+    nombre = "diagnóstico" if modelo == "diagnostico" else modelo # Para los logs
+    directorio = directorio or directorio_modelos()
+    try:
+        if _arbol_vigente(ruta_modelo(archivo_arbol, directorio), ruta_modelo(archivo_pickle, directorio)):
+            arbol = ArbolPlano.cargar(ruta_modelo(archivo_arbol, directorio), mmap_mode=modo_mmap())
+            formato = archivo_arbol
+        else:
+            arbol = ArbolPlano(**exportar_arbol(cargar_artefacto(archivo_pickle, directorio),
+                                                cargar_artefacto(archivo_etiquetas, directorio)))
+            formato = archivo_pickle
+    except ValueError as e:
+        # Columnas incompatibles con COLUMNAS_SINTOMAS
+        logger.critical(f"Modelo de {nombre} incompatible: {e}")
+        raise ImportError(f"Modelo de {nombre} incompatible: {e}")
+    except FileNotFoundError:
+        logger.critical(f"Modelos de {nombre} no encontrados. Ejecute modelo_entrenamiento.py primero.", exc_info=True)
+        raise ImportError(f"Modelos de {nombre} no encontrados. Ejecute modelo_entrenamiento.py primero")
+    except Exception as e:
+        logger.critical(f"Error al cargar modelos de {nombre}: {type(e).__name__} - {str(e)}", exc_info=True)
+        raise # Re-lanzar la excepción
+    logger.info(f"Modelos de {nombre} cargados exitosamente ({formato}).")
+    return arbol
+
+
+def inicializar_trabajador(directorio=None, mmap_mode=None, nivel_log=None):
+    """
+    Inicializador de los procesos del ProcessPoolExecutor.
+
+    Carga los modelos de triage y diagnóstico una sola vez por trabajador, hace una
+    predicción ficticia para precalentarlos y reporta el tiempo de carga.
+
+    Los trabajadores creados con spawn (p. ej. con max_tasks_per_child) no heredan
+    el logging del proceso principal: con nivel_log se configura aquí, escribiendo
+    directo en la consola porque el proceso termina con os._exit y un QueueListener
+    propio perdería lo que quedara en su cola.
+    """
+    if nivel_log is not None and not logging.getLogger().handlers:
+        from logs import configurar_logging
+        configurar_logging(nivel_log, en_cola=False)
+    configurar_modelos(directorio, mmap_mode)
+    import numpy as np
+    from paciente import COLUMNAS_SINTOMAS
+    import triage_ia
+    import diagnostico_ia
+
+    inicio = time.perf_counter()
+    triage_ia.cargar_modelos()
+    diagnostico_ia.cargar_modelos()
+    tiempo_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    fila_vacia = np.zeros((1, len(COLUMNAS_SINTOMAS)), dtype=np.float32)
+    triage_ia.clasificar_prioridad_lote(fila_vacia)
+    diagnostico_ia.diagnosticar_lote(fila_vacia)
+    tiempo_calentamiento = time.perf_counter() - inicio
+
+    # Las tareas versionadas con el directorio inicial reutilizan estos mismos árboles
+    _modelos_por_directorio[directorio_modelos()] = ModelosCargados(triage_ia.arbol_triage,
+                                                                    diagnostico_ia.arbol_diagnostico)
+    logger.info(f"Trabajador {os.getpid()}: Modelos listos desde {directorio_modelos()} "
+                f"(carga {tiempo_carga * 1000:.1f} ms, precalentamiento {tiempo_calentamiento * 1000:.1f} ms)")
+
+
+class ModelosCargados:
+    """Árboles (ArbolPlano) de triage y diagnóstico cargados desde un mismo directorio."""
+
+    __slots__ = ("triage", "diagnostico")
+
+    def __init__(self, triage, diagnostico):
+        self.triage = triage
+        self.diagnostico = diagnostico
+
+
+def asegurar_modelos(directorio):
+    """
+    Retorna los ModelosCargados de directorio, cargándolos la primera vez que se piden.
+
+    Corre en el trabajador antes de cada tarea versionada: cuando el registro cambia de
+    versión, cada proceso carga la nueva con su siguiente tarea, sin reiniciar el pool.
+    No toca los modelos globales de triage_ia/diagnostico_ia ni el entorno del proceso,
+    así que con executors de hilos cada tarea usa exactamente los modelos de la versión
+    con la que se envió, aunque otra tarea cargue una versión nueva al mismo tiempo.
+    """
+    modelos = _modelos_por_directorio.get(directorio)
+    if modelos is not None:
+        return modelos
+    with _lock_recarga:
+        modelos = _modelos_por_directorio.get(directorio)
+        if modelos is not None:
+            return modelos # Otro hilo ya la cargó
+        inicio = time.perf_counter()
+        modelos = ModelosCargados(cargar_arbol("triage", directorio), cargar_arbol("diagnostico", directorio))
+        while len(_modelos_por_directorio) >= MAX_DIRECTORIOS_CARGADOS:
+            # Las tareas que aún usan una versión descartada conservan su referencia
+            del _modelos_por_directorio[next(iter(_modelos_por_directorio))]
+        _modelos_por_directorio[directorio] = modelos
+        logger.info(f"Proceso {os.getpid()}: Modelos cargados desde {directorio} "
+                    f"({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+        return modelos
+
+
+def ejecutar_con_modelos(directorio, funcion, *args):
+    """Ejecuta funcion(*args, modelos=...) con los ModelosCargados de directorio (ver asegurar_modelos)."""
+    return funcion(*args, modelos=asegurar_modelos(directorio))
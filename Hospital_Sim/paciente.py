@@ -1,31 +1,292 @@
 import random
+from enum import IntEnum
+
+# Orden de columnas esperado por los modelos ML (ver modelo_entrenamiento.py)
+COLUMNAS_SINTOMAS = ("fiebre", "tos", "dolor", "fatiga", "respirar")
+
+
+class Prioridad(IntEnum):
+    """Prioridad de triage; el valor coincide con el nivel de asignacion_recursos (menor = más urgente)."""
+    CRITICA = 0
+    ALTA = 1
+    MEDIA = 2
+    BAJA = 3
+
+
+class Diagnostico(IntEnum):
+    COVID_19 = 0
+    COMUN = 1
+    GRIPE = 2
+    INFECCION = 3
+
+
+class EstadoPaciente(IntEnum):
+    REGISTRADO = 0
+    DIAGNOSTICADO = 1
+    TRATAMIENTO_COMPLETADO = 2
+    OBSERVACION = 3
+    ALTA = 4
+    REGISTRO_CANCELADO = 5
+    CAMA_CANCELADA = 6
+    SEGUIMIENTO_CANCELADO = 7
+    FLUJO_CANCELADO = 8
+    ERROR_REGISTRO = 9
+    ERROR_TRIAGE = 10
+    ERROR_DIAGNOSTICO = 11
+    ERROR_EJECUTOR_DIAGNOSTICO = 12
+    ERROR_CAMA = 13
+    ERROR_EJECUTOR_CAMA = 14
+    ERROR_SEGUIMIENTO = 15
+    ERROR_EJECUTOR_SEGUIMIENTO = 16
+    ERROR_DESCONOCIDO = 17
+
+
+# Etiquetas de texto (las que usan los modelos y los logs) <-> códigos
+ETIQUETAS_PRIORIDAD = {Prioridad.CRITICA: "Crítica", Prioridad.ALTA: "Alta",
+                       Prioridad.MEDIA: "Media", Prioridad.BAJA: "Baja"}
+ETIQUETAS_DIAGNOSTICO = {Diagnostico.COVID_19: "COVID-19", Diagnostico.COMUN: "Común",
+                         Diagnostico.GRIPE: "Gripe", Diagnostico.INFECCION: "Infección"}
+ETIQUETAS_ESTADO = {estado: estado.name.lower() for estado in EstadoPaciente}
+
+_CODIGOS_PRIORIDAD = {etiqueta: codigo for codigo, etiqueta in ETIQUETAS_PRIORIDAD.items()}
+_CODIGOS_DIAGNOSTICO = {etiqueta: codigo for codigo, etiqueta in ETIQUETAS_DIAGNOSTICO.items()}
+_CODIGOS_ESTADO = {etiqueta: codigo for codigo, etiqueta in ETIQUETAS_ESTADO.items()}
+
+# Código de "sin valor" en las columnas de PacienteBatch
+SIN_CODIGO = -1
+
+
+def vector_sintomas(sintomas_dict):
+    """Convierte el diccionario de síntomas en una lista en el orden de COLUMNAS_SINTOMAS."""
+    return [sintomas_dict.get(columna, 0) for columna in COLUMNAS_SINTOMAS]
+
+
+def empaquetar_sintomas(sintomas_dict):
+    """
+    Empaqueta síntomas binarios en un entero (bit i = columna i de COLUMNAS_SINTOMAS).
+
+    Returns:
+        La máscara de bits, o None si algún síntoma no es 0/1
+    """
+    mascara = 0
+    for bit, columna in enumerate(COLUMNAS_SINTOMAS):
+        valor = sintomas_dict.get(columna, 0)
+        if valor == 1:
+            mascara |= 1 << bit
+        elif valor != 0:
+            return None
+    return mascara
+
+
+def validar_mascara(mascara):
+    """
+    Comprueba que una máscara de síntomas solo tenga bits de COLUMNAS_SINTOMAS.
+
+    Returns:
+        La misma máscara
+    Raises:
+        ValueError: Si no es un entero (los bool no cuentan) o está fuera de 0..2^n - 1
+    """
+    if isinstance(mascara, bool) or not isinstance(mascara, int):
+        raise ValueError(f"La máscara de síntomas debe ser un entero, se recibió {mascara!r}")
+    if not 0 <= mascara < 2 ** len(COLUMNAS_SINTOMAS):
+        raise ValueError(f"máscara de síntomas {mascara} fuera de rango (0 a {2 ** len(COLUMNAS_SINTOMAS) - 1})")
+    return mascara
+
+
+def desempaquetar_sintomas(mascara):
+    """Inversa de empaquetar_sintomas."""
+    return {columna: (mascara >> bit) & 1 for bit, columna in enumerate(COLUMNAS_SINTOMAS)}
+
+
+def matriz_desde_mascaras(mascaras):
+    """Convierte un arreglo de máscaras de síntomas en la matriz (n, 5) float32 que esperan los modelos."""
+    import numpy as np
+    mascaras = np.asarray(mascaras, dtype=np.uint8)
+    return ((mascaras[:, None] >> np.arange(len(COLUMNAS_SINTOMAS), dtype=np.uint8)) & 1).astype(np.float32)
+
 
 class Paciente:
+    """
+    Representa un paciente en el sistema hospitalario.
+
+    Representación compacta: sin __dict__, los síntomas binarios se guardan en
+    una máscara de 5 bits y prioridad/diagnóstico/estado como códigos IntEnum.
+    Las propiedades conservan la API de texto y diccionario de siempre; las
+    etiquetas que no tienen código (p. ej. de un modelo reentrenado) y los
+    síntomas no binarios se guardan tal cual. version_modelos es el número de
+    la versión de modelos (registro_modelos) que sirvió su última predicción.
+    """
+
+    __slots__ = ("id", "_sintomas", "_prioridad", "_diagnostico", "_estado", "version_modelos")
+
     def __init__(self, id, sintomas=None):
         """
-        Representa un paciente en el sistema hospitalario.
-
         Args:
             id: Identificador único del paciente
-            sintomas: Diccionario de síntomas (opcional, se generan aleatorios si no se proporciona)
+            sintomas: Diccionario de síntomas o máscara de bits (opcional, se generan aleatorios si no se proporciona)
         """
         self.id = id
-        self.sintomas = sintomas if sintomas else self.generar_sintomas()
-        self.prioridad = None
-        self.diagnostico = None
-        self.estado = "registrado" # Estado inicial
+        self.sintomas = sintomas if sintomas or sintomas == 0 else self.generar_sintomas()
+        self._prioridad = None
+        self._diagnostico = None
+        self._estado = EstadoPaciente.REGISTRADO # Estado inicial
+        self.version_modelos = None
 
     def generar_sintomas(self):
-        """Genera síntomas aleatorios para simulación"""
-        # Asegurarse de que los síntomas estén en el orden esperado por los modelos ML
-        return {
-            "fiebre": random.randint(0, 1),
-            "tos": random.randint(0, 1),
-            "dolor": random.randint(0, 1),
-            "fatiga": random.randint(0, 1),
-            "respirar": random.randint(0, 1)
-        }
+        """Genera síntomas aleatorios para simulación (como máscara de bits)"""
+        return random.getrandbits(len(COLUMNAS_SINTOMAS))
+
+    @property
+    def sintomas(self):
+        """Diccionario de síntomas en el orden de COLUMNAS_SINTOMAS (copia: modificarlo no cambia al paciente)."""
+        if isinstance(self._sintomas, int):
+            return desempaquetar_sintomas(self._sintomas)
+        return dict(zip(COLUMNAS_SINTOMAS, self._sintomas))
+
+    @sintomas.setter
+    def sintomas(self, valor):
+        if isinstance(valor, int):
+            self._sintomas = validar_mascara(valor)
+            return
+        mascara = empaquetar_sintomas(valor)
+        self._sintomas = mascara if mascara is not None else tuple(vector_sintomas(valor))
+
+    @property
+    def mascara_sintomas(self):
+        """Máscara de 5 bits de los síntomas, o None si no son binarios."""
+        return self._sintomas if isinstance(self._sintomas, int) else None
+
+    @property
+    def prioridad(self):
+        return ETIQUETAS_PRIORIDAD.get(self._prioridad, self._prioridad)
+
+    @prioridad.setter
+    def prioridad(self, valor):
+        self._prioridad = _CODIGOS_PRIORIDAD.get(valor, valor)
+
+    @property
+    def diagnostico(self):
+        return ETIQUETAS_DIAGNOSTICO.get(self._diagnostico, self._diagnostico)
+
+    @diagnostico.setter
+    def diagnostico(self, valor):
+        self._diagnostico = _CODIGOS_DIAGNOSTICO.get(valor, valor)
+
+    @property
+    def estado(self):
+        return ETIQUETAS_ESTADO.get(self._estado, self._estado)
+
+    @estado.setter
+    def estado(self, valor):
+        self._estado = _CODIGOS_ESTADO.get(valor, valor)
+
+    def __reduce__(self):
+        # Al executor viajan solo enteros pequeños (o las etiquetas sin código)
+        return (_reconstruir_paciente, (self.id, self._sintomas, _a_entero(self._prioridad),
+                                        _a_entero(self._diagnostico), _a_entero(self._estado),
+                                        self.version_modelos))
 
     def __str__(self):
         return (f"Paciente {self.id} | Prioridad: {self.prioridad} | "
-                f"Diagnóstico: {self.diagnostico} | Estado: {self.estado}")
\ No newline at end of file
+                f"Diagnóstico: {self.diagnostico} | Estado: {self.estado}")
+
+
+def _a_entero(codigo):
+    return int(codigo) if isinstance(codigo, IntEnum) else codigo
+
+
+def _reconstruir_paciente(id, sintomas, prioridad, diagnostico, estado, version_modelos=None):
+    paciente = Paciente.__new__(Paciente)
+    paciente.id = id
+    paciente._sintomas = sintomas
+    paciente._prioridad = Prioridad(prioridad) if isinstance(prioridad, int) else prioridad
+    paciente._diagnostico = Diagnostico(diagnostico) if isinstance(diagnostico, int) else diagnostico
+    paciente._estado = EstadoPaciente(estado) if isinstance(estado, int) else estado
+    paciente.version_modelos = version_modelos
+    return paciente
+
+
+class PacienteBatch:
+    """
+    Almacén columnar de pacientes sobre un arreglo estructurado de NumPy.
+
+    Cada paciente ocupa 8 bytes (id uint32, síntomas uint8 y códigos int8 de
+    prioridad, diagnóstico y estado; SIN_CODIGO = sin valor). Las etapas por
+    lotes leen la columna de síntomas como matriz (`matriz_sintomas`) y
+    escriben sus resultados de una vez (`asignar_prioridades`, ...).
+    Solo admite síntomas binarios y etiquetas con código.
+    """
+
+    DTYPE = [("id", "<u4"), ("sintomas", "u1"), ("prioridad", "i1"), ("diagnostico", "i1"), ("estado", "i1")]
+
+    def __init__(self, tamano):
+        import numpy as np
+        self.datos = np.zeros(tamano, dtype=self.DTYPE)
+        self.datos["prioridad"] = SIN_CODIGO
+        self.datos["diagnostico"] = SIN_CODIGO
+
+    @classmethod
+    def desde_pacientes(cls, pacientes):
+        """Copia una lista de Paciente al almacén columnar."""
+        lote = cls(len(pacientes))
+        for i, paciente in enumerate(pacientes):
+            mascara = paciente.mascara_sintomas
+            if mascara is None:
+                raise ValueError(f"Paciente {paciente.id}: PacienteBatch solo admite síntomas binarios")
+            lote.datos[i] = (paciente.id, mascara, _codigo_columna(paciente._prioridad),
+                             _codigo_columna(paciente._diagnostico), _codigo_columna(paciente._estado))
+        return lote
+
+    @classmethod
+    def aleatorio(cls, tamano, primer_id=1, rng=None):
+        """Genera `tamano` pacientes con síntomas aleatorios sin crear objetos Paciente."""
+        import numpy as np
+        rng = rng if rng is not None else np.random.default_rng()
+        lote = cls(tamano)
+        lote.datos["id"] = np.arange(primer_id, primer_id + tamano)
+        lote.datos["sintomas"] = rng.integers(0, 2 ** len(COLUMNAS_SINTOMAS), size=tamano)
+        return lote
+
+    def __len__(self):
+        return len(self.datos)
+
+    @property
+    def nbytes(self):
+        return self.datos.nbytes
+
+    def matriz_sintomas(self):
+        """Matriz (n, 5) float32 para los modelos."""
+        return matriz_desde_mascaras(self.datos["sintomas"])
+
+    def asignar_prioridades(self, etiquetas):
+        self.datos["prioridad"] = [_CODIGOS_PRIORIDAD[e] for e in etiquetas]
+
+    def asignar_diagnosticos(self, etiquetas):
+        self.datos["diagnostico"] = [_CODIGOS_DIAGNOSTICO[e] for e in etiquetas]
+
+    def asignar_estado(self, estado, seleccion=slice(None)):
+        """Fija el mismo estado (texto) a todos los pacientes o a una selección (máscara o índices)."""
+        self.datos["estado"][seleccion] = _CODIGOS_ESTADO[estado]
+
+    def paciente(self, indice):
+        """Materializa un Paciente a partir de una fila."""
+        fila = self.datos[indice]
+        return _reconstruir_paciente(int(fila["id"]), int(fila["sintomas"]), _valor_columna(fila["prioridad"]),
+                                     _valor_columna(fila["diagnostico"]), _valor_columna(fila["estado"]))
+
+    def a_pacientes(self):
+        return [self.paciente(i) for i in range(len(self))]
+
+
+def _codigo_columna(codigo):
+    if codigo is None:
+        return SIN_CODIGO
+    if not isinstance(codigo, IntEnum):
+        raise ValueError(f"Etiqueta sin código para PacienteBatch: {codigo!r}")
+    return int(codigo)
+
+
+def _valor_columna(codigo):
+    codigo = int(codigo)
+    return None if codigo == SIN_CODIGO else codigo
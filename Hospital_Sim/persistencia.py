@@ -0,0 +1,222 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+import logging # Importar logging
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+TAMANO_LOTE_DEFECTO = 256 # Filas máximas por transacción
+ESPERA_LOTE_DEFECTO = 0.002 # segundos que el escritor espera para juntar más filas
+TIMEOUT_BLOQUEO = 30.0 # segundos (varios procesos, p. ej. --fragmentos, comparten el archivo)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pacientes (
+    id INTEGER PRIMARY KEY,
+    sintomas INTEGER,          -- máscara de 5 bits (NULL si no son binarios)
+    sintomas_json TEXT,        -- síntomas no binarios
+    registrado REAL            -- reloj del event loop
+);
+CREATE TABLE IF NOT EXISTS transiciones (
+    paciente_id INTEGER NOT NULL,
+    etapa TEXT NOT NULL,
+    estado TEXT,
+    instante REAL,
+    version_modelos INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_transiciones_paciente ON transiciones (paciente_id);
+"""
+
+_FIN = object() # Centinela de cierre en la cola del escritor
+
+
+class RegistroPersistente:
+    """
+    Registro de pacientes en SQLite (modo WAL) con un hilo escritor y group commit.
+
+    El event loop solo encola filas; el hilo escritor las agrupa en una transacción
+    de hasta `tamano_lote` filas (esperando a lo sumo `espera_lote` a que lleguen más)
+    y al confirmarla resuelve los acuses de todo el lote con un único
+    call_soon_threadsafe. Los registros de pacientes devuelven un future que se
+    resuelve cuando la fila está en disco; las transiciones de etapa no esperan acuse.
+
+    Mientras no se abre, `activo` es False y transicion() no hace nada.
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.ruta = None
+        self.lotes = 0
+        self.filas = 0
+        self._cola = None
+        self._hilo = None
+        self._loop = None
+        self._cerrado = None
+
+    def abrir(self, ruta, tamano_lote=TAMANO_LOTE_DEFECTO, espera_lote=ESPERA_LOTE_DEFECTO):
+        """
+        Crea el esquema y arranca el hilo escritor (llamar desde el event loop).
+
+        Args:
+            ruta: Archivo SQLite
+            tamano_lote: Filas máximas por transacción (1 = un commit por fila)
+            espera_lote: Segundos que el escritor espera a juntar un lote incompleto
+        """
+        if self.activo:
+            raise RuntimeError(f"El registro persistente ya está abierto en {self.ruta}")
+        if tamano_lote < 1:
+            raise ValueError("tamano_lote debe ser al menos 1")
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.lotes = self.filas = 0
+        self._loop = asyncio.get_running_loop()
+        self._cola = queue.SimpleQueue()
+        self._cerrado = self._loop.create_future()
+        conexion = self._conectar() # Errores de ruta/esquema se reportan aquí y no en el hilo
+        self._hilo = threading.Thread(target=self._escribir, args=(conexion,), name="registro-persistente",
+                                      daemon=True)
+        self._hilo.start()
+        self.activo = True
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=TIMEOUT_BLOQUEO, isolation_level=None,
+                                   check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL") # Con WAL: durable ante caídas del proceso
+        conexion.executescript(ESQUEMA)
+        return conexion
+
+    def _trabajo_real(self, futuro):
+        # Con --tiempo-virtual el reloj no debe avanzar mientras hay escrituras pendientes
+        registrar = getattr(self._loop, "registrar_trabajo_real", None)
+        if registrar is not None:
+            registrar(futuro)
+        return futuro
+
+    def registrar(self, paciente, instante=None):
+        """
+        Encola el registro de un paciente.
+
+        Returns:
+            asyncio.Future que se resuelve cuando la transacción que lo contiene se confirma
+        """
+        mascara = paciente.mascara_sintomas
+        fila = (paciente.id, mascara, None if mascara is not None else json.dumps(paciente.sintomas),
+                self._loop.time() if instante is None else instante)
+        futuro = self._trabajo_real(self._loop.create_future())
+        self._cola.put(("paciente", fila, futuro))
+        return futuro
+
+    def transicion(self, paciente, etapa, instante=None):
+        """Encola una transición de etapa (sin acuse). No hace nada si el registro no está abierto."""
+        if not self.activo:
+            return
+        self._cola.put(("transicion", (paciente.id, etapa, paciente.estado,
+                                       self._loop.time() if instante is None else instante,
+                                       paciente.version_modelos), None))
+
+    async def cerrar(self):
+        """Escribe lo pendiente, detiene el hilo escritor y cierra la conexión."""
+        if not self.activo:
+            return
+        self.activo = False
+        self._cola.put(_FIN)
+        await self._trabajo_real(self._cerrado)
+        logger.info(f"Registro persistente {self.ruta}: {self.filas} filas en {self.lotes} transacciones")
+
+    def _tomar_lote(self, lote):
+        """Completa lote hasta tamano_lote elementos: lo que ya está en cola y lo que llegue durante espera_lote."""
+        limite = time.monotonic() + self.espera_lote
+        while len(lote) < self.tamano_lote:
+            try:
+                restante = limite - time.monotonic()
+                elemento = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            lote.append(elemento)
+            if elemento is _FIN:
+                break
+        return lote
+
+    def _escribir(self, conexion):
+        """
+        Hilo escritor: una transacción por lote y un solo salto al event loop para los acuses.
+
+        Un error al escribir un lote falla solo los acuses de ese lote. Si el hilo
+        termina por cualquier otro motivo, _detener falla todo lo que quedó en cola
+        y desactiva el registro, para que nadie espere un acuse que no llegará.
+        """
+        fallo = None
+        lote = []
+        try:
+            terminar = False
+            while not terminar:
+                lote = [self._cola.get()] # En mano hasta confirmarlo; si el hilo cae, lo falla _detener
+                self._tomar_lote(lote)
+                if lote[-1] is _FIN:
+                    lote.pop()
+                    terminar = True
+                if not lote:
+                    continue
+                pacientes = [fila for tipo, fila, _ in lote if tipo == "paciente"]
+                transiciones = [fila for tipo, fila, _ in lote if tipo == "transicion"]
+                futuros = [futuro for _, _, futuro in lote if futuro is not None]
+                error = None
+                try:
+                    conexion.execute("BEGIN")
+                    if pacientes:
+                        conexion.executemany("INSERT OR REPLACE INTO pacientes VALUES (?, ?, ?, ?)", pacientes)
+                    if transiciones:
+                        conexion.executemany("INSERT INTO transiciones VALUES (?, ?, ?, ?, ?)", transiciones)
+                    conexion.execute("COMMIT")
+                    self.lotes += 1
+                    self.filas += len(lote)
+                except Exception as e: # sqlite3.Error, pero también p. ej. OverflowError con un id fuera de rango
+                    if conexion.in_transaction:
+                        conexion.execute("ROLLBACK")
+                    logger.error(f"Error al escribir un lote de {len(lote)} filas: {type(e).__name__} - {e}")
+                    error = e
+                if futuros:
+                    self._loop.call_soon_threadsafe(_confirmar, futuros, error)
+                lote = []
+        except BaseException as e:
+            fallo = e
+            logger.critical(f"El escritor del registro persistente terminó: {type(e).__name__} - {e}", exc_info=True)
+        finally:
+            conexion.close()
+            if fallo is not None:
+                en_mano = [elemento[2] for elemento in lote if elemento is not _FIN and elemento[2] is not None]
+                self._loop.call_soon_threadsafe(self._detener, fallo, en_mano)
+            self._loop.call_soon_threadsafe(_confirmar, [self._cerrado], None)
+
+    def _detener(self, fallo, futuros):
+        """Corre en el event loop tras la caída del escritor: falla los acuses pendientes (futuros y la cola)."""
+        self.activo = False # Desde aquí registrar_paciente_async ya no encola
+        error = RuntimeError(f"El escritor del registro persistente terminó: {type(fallo).__name__} - {fallo}")
+        while True:
+            try:
+                elemento = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if elemento is not _FIN and elemento[2] is not None:
+                futuros.append(elemento[2])
+        _confirmar(futuros, error)
+
+
+def _confirmar(futuros, error):
+    """Corre en el event loop: resuelve los acuses de un lote (salvo los ya cancelados)."""
+    for futuro in futuros:
+        if futuro.done():
+            continue
+        if error is None:
+            futuro.set_result(None)
+        else:
+            futuro.set_exception(error)
+
+
+# Registro global de la simulación (inactivo hasta que main.py lo abre con --bd)
+registro_persistente = RegistroPersistente()
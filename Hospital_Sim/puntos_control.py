@@ -0,0 +1,166 @@
+import json
+import os
+import random
+import time
+import logging # Importar logging
+from paciente import Paciente
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+VERSION_FORMATO = 2
+INTERVALO_DEFECTO = 30.0 # segundos reales entre puntos de control
+
+# Etapas del flujo en orden; un paciente en vuelo se guarda con cuántas completó
+ETAPAS_FLUJO = ('registro', 'triage', 'diagnostico', 'cama', 'seguimiento')
+
+
+class PuntosControl:
+    """
+    Puntos de control de una corrida en un archivo JSON lines de solo agregado.
+
+    Cada punto es una línea completa (contadores, histogramas, recursos, estado del
+    generador aleatorio, reloj simulado, posición en la fuente de llegadas y los
+    pacientes en vuelo con la última etapa que completaron), así que nunca se
+    reescribe nada: si el proceso muere a mitad de una escritura, la línea
+    incompleta se ignora al reanudar y vale la anterior.
+
+    Un paciente reanudado repite entera la etapa que tenía en curso, así que los
+    incrementos que esa etapa ya hizo (cama asignada, espera de cama, ...) se
+    guardan con el paciente (`anotar`) y se descuentan al reanudar.
+
+    El costo en el camino rápido es un dict por paciente en vuelo (solo con el
+    archivo abierto) y una lectura del reloj por flujo terminado; el punto se
+    arma y se escribe cada `intervalo` segundos reales.
+    """
+
+    def __init__(self):
+        self.activo = False
+        self.ruta = None
+        self.intervalo = INTERVALO_DEFECTO
+        self.escritos = 0
+        self.progreso = {} # id -> (etapas completadas, paciente, recibió cama, incrementos de la etapa en curso)
+        self._archivo = None
+        self._ultimo = 0.0
+
+    def abrir(self, ruta, intervalo=INTERVALO_DEFECTO):
+        """Abre el archivo para agregar puntos (los anteriores se conservan)."""
+        if intervalo <= 0:
+            raise ValueError("El intervalo de los puntos de control debe ser positivo")
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.escritos = 0
+        self.progreso = {}
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        self._ultimo = time.perf_counter()
+        self.activo = True
+
+    def marcar(self, paciente, etapas, recibio_cama=False):
+        """Anota que el paciente completó `etapas` etapas (0 = recién llegado)."""
+        if self.activo:
+            self.progreso[paciente.id] = (etapas, paciente, recibio_cama, [])
+
+    def anotar(self, paciente, seccion, clave, valor=None):
+        """
+        Anota un incremento hecho a mitad de la etapa en curso del paciente.
+
+        Args:
+            paciente: Paciente en vuelo
+            seccion: 'eventos' (contador), 'latencias' (histograma) o 'recursos' (asignación)
+            clave: Evento, etapa de latencia o nombre del recurso
+            valor: Latencia registrada, o espera de la asignación (None = sin espera)
+        """
+        if self.activo:
+            progreso = self.progreso.get(paciente.id)
+            if progreso is not None:
+                progreso[3].append([seccion, clave, valor])
+
+    def terminar(self, paciente):
+        if self.activo:
+            self.progreso.pop(paciente.id, None)
+
+    def toca(self):
+        """True si pasó el intervalo desde el último punto."""
+        return self.activo and time.perf_counter() - self._ultimo >= self.intervalo
+
+    def en_vuelo(self):
+        """
+        Pacientes en vuelo como listas [id, etapas, síntomas, prioridad, diagnóstico, estado,
+        versión, recibió cama, incrementos de la etapa en curso].
+        """
+        filas = []
+        for id, (etapas, paciente, recibio_cama, incrementos) in self.progreso.items():
+            mascara = paciente.mascara_sintomas
+            filas.append([id, etapas, mascara if mascara is not None else paciente.sintomas,
+                          paciente.prioridad, paciente.diagnostico, paciente.estado, paciente.version_modelos,
+                          recibio_cama, incrementos])
+        return filas
+
+    def guardar(self, estado):
+        """Agrega un punto de control y lo lleva a disco (fsync)."""
+        estado = dict(estado, version=VERSION_FORMATO, instante=time.time(),
+                      rng=random.getstate(), en_vuelo=self.en_vuelo())
+        linea = json.dumps(estado, ensure_ascii=False, separators=(",", ":"))
+        self._archivo.write(linea + "\n")
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self.escritos += 1
+        self._ultimo = time.perf_counter()
+        logger.debug(f"Punto de control {self.escritos}: {len(linea)} bytes, {len(estado['en_vuelo'])} en vuelo")
+
+    def cerrar(self):
+        if not self.activo:
+            return
+        self.activo = False
+        self.progreso = {}
+        self._archivo.close()
+        logger.info(f"Puntos de control: {self.escritos} escritos en {self.ruta}")
+
+
+def leer_ultimo(ruta):
+    """
+    Último punto de control completo de un archivo.
+
+    Raises:
+        ValueError: Si el archivo no tiene ningún punto válido
+    """
+    ultimo = None
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                estado = json.loads(linea)
+            except json.JSONDecodeError:
+                continue # Línea truncada por una caída a mitad de escritura
+            if isinstance(estado, dict) and estado.get('version') == VERSION_FORMATO:
+                ultimo = estado
+    if ultimo is None:
+        raise ValueError(f"{ruta} no contiene puntos de control válidos")
+    return ultimo
+
+
+def restaurar_rng(estado):
+    """random.setstate con el estado guardado en JSON (las tuplas vuelven como listas)."""
+    version, interno, gauss = estado['rng']
+    random.setstate((version, tuple(interno), gauss))
+
+
+def pacientes_en_vuelo(estado):
+    """Reconstruye los pacientes en vuelo de un punto: lista de (Paciente, etapas completadas, recibió cama)."""
+    pacientes = []
+    for id, etapas, sintomas, prioridad, diagnostico, estado_paciente, version, recibio_cama, _ in estado['en_vuelo']:
+        paciente = Paciente(id, sintomas)
+        paciente.prioridad = prioridad
+        paciente.diagnostico = diagnostico
+        paciente.estado = estado_paciente
+        paciente.version_modelos = version
+        pacientes.append((paciente, etapas, recibio_cama))
+    return pacientes
+
+
+def incrementos_en_curso(estado):
+    """Incrementos (sección, clave, valor) de las etapas que los pacientes en vuelo repetirán al reanudar."""
+    return [incremento for fila in estado['en_vuelo'] for incremento in fila[-1]]
+
+
+# Puntos de control de la simulación (inactivos hasta que main.py los abre con --punto-control)
+puntos_control = PuntosControl()
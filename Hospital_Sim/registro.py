@@ -1,74 +1,77 @@
 
-import time
-import random
 import logging # Importar logging
 import asyncio # Importar asyncio
+from metricas import latencias_etapa
+from trazas import trazador
+from logs import etapa
+from persistencia import registro_persistente
+from duraciones import duraciones
 
 # Configurar un logger
 logger = logging.getLogger(__name__)
 
-# Estadísticas de registro (tiempos). Accedido solo desde el contexto asíncrono principal ahora.
-tiempos_registro = []
-registro_lock = asyncio.Lock() # Cambiar a asyncio.Lock
+# Estadísticas de registro: histograma en streaming (memoria constante, actualización O(1)).
+# Solo se actualiza desde el hilo del event loop, así que no necesita lock.
+metricas_registro = latencias_etapa['registro']
+
+
+def reiniciar_registro():
+    """Limpia las métricas de registro para una nueva corrida."""
+    metricas_registro.limpiar()
 
 async def registrar_paciente_async(paciente, actualizar_estadisticas_func):
     """
-    Simula el registro de un paciente con latencia aleatoria de forma asíncrona.
-    Operación I/O bound - adecuada para asyncio.
+    Registra un paciente de forma asíncrona. Operación I/O bound - adecuada para asyncio.
+
+    Con el registro persistente abierto (--bd) espera el acuse de la escritura en
+    SQLite; si no, simula la latencia de red/DB con un retardo aleatorio.
 
     Args:
         paciente: Objeto Paciente a registrar
-        actualizar_estadisticas_func: Función asíncrona para actualizar estadísticas globales.
+        actualizar_estadisticas_func: Función (síncrona) para actualizar estadísticas globales.
     """
-    inicio = time.time() # time.time() es síncrono, lo cual está bien aquí
+    # Reloj del event loop: monotónico en ejecución real y simulado con --tiempo-virtual
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
 
     try:
-        # Simular latencia de red/DB
-        latencia = random.uniform(0.5, 2.0)
-        await asyncio.sleep(latencia) # Usar await asyncio.sleep
-
-        # Registrar tiempo (protegido por lock asíncrono)
-        duracion = time.time() - inicio
-        async with registro_lock: # Usar async with para asyncio.Lock
-            tiempos_registro.append(duracion)
-            # El cálculo del promedio no modifica la lista, puede llamarse sin lock *si no se modifica la lista*
-            # Pero aquí es seguro dentro del lock.
-            avg_actual = promedio_registro_sincrono()
+        if registro_persistente.activo:
+            await registro_persistente.registrar(paciente, inicio) # Acuse del group commit
+        else:
+            # Simular latencia de red/DB
+            latencia = duraciones.muestrear('registro')
+            await asyncio.sleep(latencia) # Usar await asyncio.sleep
+
+        # Registrar tiempo
+        duracion = loop.time() - inicio
+        metricas_registro.registrar(duracion)
+        trazador.registrar('registro', paciente.id, inicio, duracion)
+        avg_actual = promedio_registro_sincrono()
 
         # Log exitoso
-        logger.info(f"Paciente {paciente.id} [REGISTRO]: Registrado en {duracion:.2f}s | Avg: {avg_actual:.2f}s")
+        logger.info(f"Registrado en {duracion:.2f}s | Avg: {avg_actual:.2f}s", extra=etapa('registro', paciente.id))
 
         paciente.estado = "registrado"
-        await actualizar_estadisticas_func('registro') # Actualizar estadística centralizadamente
+        registro_persistente.transicion(paciente, 'registro')
+        actualizar_estadisticas_func('registro') # Actualizar estadística centralizadamente
 
     except asyncio.CancelledError:
-         logger.warning(f"Paciente {paciente.id} [REGISTRO]: Tarea de registro cancelada.")
+         logger.warning("Tarea de registro cancelada.", extra=etapa('registro', paciente.id))
          paciente.estado = "registro_cancelado"
          # No actualizar estadística de error si fue cancelado
     except Exception as e:
         # Loguear el error específico y actualizar estado/estadística de error
         error_msg = f"Error en registro: {type(e).__name__} - {str(e)}"
-        logger.error(f"Paciente {paciente.id} [ERROR]: {error_msg}", exc_info=True) # exc_info=True para loguear traceback
+        logger.error(error_msg, exc_info=True, extra=etapa('error', paciente.id)) # exc_info=True para loguear traceback
         paciente.estado = "error_registro"
-        await actualizar_estadisticas_func('error_registro')
+        actualizar_estadisticas_func('error_registro')
 
 
 def promedio_registro_sincrono():
-    """Calcula el tiempo promedio de registro (debe llamarse con el lock adquirido o en un contexto seguro)"""
-    # Esta función es síncrona y accede a tiempos_registro.
-    # Si se llama fuera del lock, debe ser llamada con el lock adquirido.
-    # Asumiremos que las llamadas relevantes se hacen de forma segura.
-    if not tiempos_registro:
-        return 0
-    return sum(tiempos_registro) / len(tiempos_registro)
+    """Tiempo promedio de registro (media acumulada, O(1))"""
+    return metricas_registro.media
 
 
 def estadisticas_registro():
-    if not tiempos_registro:
-        return {'total': 0, 'promedio': 0, 'max': 0, 'min': 0}
-    return {
-        'total': len(tiempos_registro),
-        'promedio': promedio_registro_sincrono(), # Usar la función auxiliar
-        'max': max(tiempos_registro),
-        'min': min(tiempos_registro)
-    }
\ No newline at end of file
+    """Total, promedio, mínimo, máximo y percentiles p50/p95/p99 de los tiempos de registro."""
+    return metricas_registro.resumen()
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import logging # Importar logging
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+# Estructura del registro:
+#   <raiz>/v0001/manifiesto.json   {"version": 1, "creado": ..., "artefactos": {"arbol_triage.npz": "<sha256>", ...}}
+#   <raiz>/v0001/arbol_triage.npz ...
+# Cada versión se escribe en un directorio temporal dentro de la raíz y se publica con
+# un rename atómico, así que un lector nunca ve una versión a medio copiar.
+MANIFIESTO = "manifiesto.json"
+PREFIJO_VERSION = "v"
+ARTEFACTOS = ("modelo_triage.pkl", "label_prioridad.pkl", "arbol_triage.npz",
+              "modelo_diagnostico.pkl", "label_enfermedad.pkl", "arbol_diagnostico.npz")
+# Cada modelo necesita su árbol exportado o, en su defecto, los dos .pkl
+REQUERIDOS = {
+    'triage': (("arbol_triage.npz",), ("modelo_triage.pkl", "label_prioridad.pkl")),
+    'diagnostico': (("arbol_diagnostico.npz",), ("modelo_diagnostico.pkl", "label_enfermedad.pkl")),
+}
+INTERVALO_VIGILANCIA_DEFECTO = 5.0 # segundos del reloj del event loop
+VERSION_LOCAL = 0 # Modelos servidos desde --modelos-dir, fuera del registro
+
+
+class VersionModelos:
+    """Versión de modelos en servicio: número en el registro y directorio con sus artefactos."""
+
+    __slots__ = ("numero", "directorio")
+
+    def __init__(self, numero, directorio):
+        self.numero = numero
+        self.directorio = os.path.abspath(directorio)
+
+    @property
+    def etiqueta(self):
+        return f"{PREFIJO_VERSION}{self.numero}" if self.numero != VERSION_LOCAL else "local"
+
+    def __repr__(self):
+        return f"VersionModelos({self.etiqueta}, {self.directorio!r})"
+
+
+def sha256_archivo(ruta, tamano_bloque=1 << 20):
+    suma = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            suma.update(bloque)
+    return suma.hexdigest()
+
+
+def directorio_version(raiz, numero):
+    return os.path.join(os.path.abspath(raiz), f"{PREFIJO_VERSION}{numero:04d}")
+
+
+def listar_versiones(raiz):
+    """Números de versión publicados (con manifiesto), en orden creciente."""
+    if not os.path.isdir(raiz):
+        return []
+    versiones = []
+    for nombre in os.listdir(raiz):
+        if (nombre.startswith(PREFIJO_VERSION) and nombre[len(PREFIJO_VERSION):].isdigit()
+                and os.path.exists(os.path.join(raiz, nombre, MANIFIESTO))):
+            versiones.append(int(nombre[len(PREFIJO_VERSION):]))
+    return sorted(versiones)
+
+
+def ultima_version(raiz):
+    """Número de la versión más reciente o None si el registro está vacío."""
+    versiones = listar_versiones(raiz)
+    return versiones[-1] if versiones else None
+
+
+def leer_manifiesto(raiz, numero):
+    with open(os.path.join(directorio_version(raiz, numero), MANIFIESTO), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verificar_version(raiz, numero):
+    """
+    Comprueba el sha256 de cada artefacto del manifiesto.
+
+    Returns:
+        VersionModelos lista para servir
+    Raises:
+        ValueError: Si falta un artefacto o su checksum no coincide
+    """
+    directorio = directorio_version(raiz, numero)
+    manifiesto = leer_manifiesto(raiz, numero)
+    for nombre, esperado in manifiesto["artefactos"].items():
+        ruta = os.path.join(directorio, nombre)
+        if not os.path.exists(ruta):
+            raise ValueError(f"Versión {numero}: falta el artefacto {nombre}")
+        if sha256_archivo(ruta) != esperado:
+            raise ValueError(f"Versión {numero}: checksum inválido en {nombre}")
+    return VersionModelos(numero, directorio)
+
+
+def publicar_version(raiz, origen):
+    """
+    Copia los artefactos de origen a una versión nueva del registro.
+
+    Args:
+        raiz: Directorio del registro (se crea si no existe)
+        origen: Directorio con los .pkl y/o .npz (p. ej. la salida de modelo_entrenamiento)
+    Returns:
+        Número de la versión publicada
+    """
+    presentes = [nombre for nombre in ARTEFACTOS if os.path.exists(os.path.join(origen, nombre))]
+    for modelo, opciones in REQUERIDOS.items():
+        if not any(all(nombre in presentes for nombre in grupo) for grupo in opciones):
+            raise ValueError(f"{origen} no contiene los artefactos del modelo de {modelo}")
+
+    os.makedirs(raiz, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix=".publicando-", dir=raiz)
+    try:
+        artefactos = {}
+        for nombre in presentes:
+            shutil.copy2(os.path.join(origen, nombre), temporal)
+            artefactos[nombre] = sha256_archivo(os.path.join(temporal, nombre))
+        numero = (ultima_version(raiz) or 0) + 1
+        while True:
+            with open(os.path.join(temporal, MANIFIESTO), "w", encoding="utf-8") as f:
+                json.dump({'version': numero, 'creado': time.time(), 'origen': os.path.abspath(origen),
+                           'artefactos': artefactos}, f, indent=2)
+            try:
+                os.rename(temporal, directorio_version(raiz, numero))
+                return numero
+            except OSError:
+                if not os.path.exists(directorio_version(raiz, numero)):
+                    raise
+                numero += 1 # Otro proceso publicó el mismo número primero
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+
+class VigilanteModelos:
+    """
+    Sondea el registro y cambia la versión en servicio cuando aparece una nueva.
+
+    El cambio se delega en al_cambiar (p. ej. el cambiar_version del servicio de
+    inferencia), que debe reemplazar el estado en una sola asignación; los pacientes
+    en vuelo terminan con la versión con la que empezó su predicción.
+    """
+
+    def __init__(self, raiz, al_cambiar=None, intervalo=INTERVALO_VIGILANCIA_DEFECTO):
+        """
+        Args:
+            raiz: Directorio del registro
+            al_cambiar: Corrutina que recibe la nueva VersionModelos
+            intervalo: Segundos entre sondeos (reloj del event loop)
+        """
+        self.raiz = os.path.abspath(raiz)
+        self.al_cambiar = al_cambiar
+        self.intervalo = intervalo
+        self.version = None
+        self.cambios = 0
+        self._rechazadas = set()
+        self._tarea = None
+
+    def cargar(self):
+        """Verifica y retorna la versión más reciente del registro."""
+        numero = ultima_version(self.raiz)
+        if numero is None:
+            raise FileNotFoundError(f"No hay versiones publicadas en {self.raiz}")
+        self.version = verificar_version(self.raiz, numero)
+        return self.version
+
+    async def revisar(self):
+        """Un sondeo: si hay una versión más nueva y válida, la pone en servicio. Retorna True si cambió."""
+        numero = ultima_version(self.raiz)
+        if numero is None or numero in self._rechazadas or (self.version and numero <= self.version.numero):
+            return False
+        try:
+            nueva = verificar_version(self.raiz, numero)
+        except (ValueError, OSError) as e:
+            self._rechazadas.add(numero)
+            logger.error(f"Versión de modelos {numero} rechazada: {e}")
+            return False
+        if self.al_cambiar is not None:
+            await self.al_cambiar(nueva)
+        anterior, self.version = self.version, nueva
+        self.cambios += 1
+        logger.info(f"🔁 Modelos {anterior.etiqueta if anterior else '-'} -> {nueva.etiqueta} ({nueva.directorio})")
+        return True
+
+    async def _vigilar(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await self.revisar()
+            except Exception as e:
+                logger.error(f"Error al cambiar de versión de modelos: {type(e).__name__} - {e}", exc_info=True)
+
+    def iniciar(self):
+        self._tarea = asyncio.get_running_loop().create_task(self._vigilar())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Registro de versiones de modelos (manifiesto + sha256).")
+    parser.add_argument("registro", help="Directorio del registro")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    publicar = subcomandos.add_parser("publicar", help="Publica los artefactos de un directorio como versión nueva")
+    publicar.add_argument("origen", help="Directorio con los .pkl/.npz entrenados")
+    subcomandos.add_parser("listar", help="Lista las versiones y verifica sus checksums")
+    return parser
+
+
+if __name__ == "__main__":
+    args = crear_parser().parse_args()
+    if args.comando == "publicar":
+        numero = publicar_version(args.registro, args.origen)
+        print(f"✅ Versión {numero} publicada en {directorio_version(args.registro, numero)}")
+    else:
+        for numero in listar_versiones(args.registro):
+            manifiesto = leer_manifiesto(args.registro, numero)
+            try:
+                verificar_version(args.registro, numero)
+                estado = "ok"
+            except ValueError as e:
+                estado = str(e)
+            creado = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(manifiesto["creado"]))
+            print(f"{PREFIJO_VERSION}{numero:<4} {creado}  {len(manifiesto['artefactos'])} artefactos  {estado}")
@@ -0,0 +1,188 @@
+import asyncio
+import logging # Importar logging
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from asignacion_recursos import CAPACIDADES_DEFECTO
+from estadisticas import Estadisticas
+from metricas import LatenciasPorEtapa
+from visualizacion import mostrar_estadisticas, mostrar_utilizacion, mostrar_latencias
+from logs import configurar_logging, vaciar_logs
+
+# Configurar un logger
+logger = logging.getLogger(__name__)
+
+
+def repartir(total, partes):
+    """Divide total en partes enteras lo más parejas posible (las primeras reciben el resto)."""
+    base, resto = divmod(total, partes)
+    return [base + (1 if i < resto else 0) for i in range(partes)]
+
+
+def repartir_capacidades(capacidades, fragmentos):
+    """
+    Reparte la capacidad de cada recurso entre los fragmentos.
+
+    Cada fragmento recibe al menos una unidad de cada recurso con capacidad; si no
+    alcanza, la capacidad total efectiva sube y se avisa.
+
+    Returns:
+        Lista con un diccionario de capacidades por fragmento
+    """
+    por_fragmento = [{} for _ in range(fragmentos)]
+    for nombre, capacidad in capacidades.items():
+        partes = repartir(capacidad, fragmentos)
+        if 0 < capacidad < fragmentos:
+            logger.warning(f"Capacidad de '{nombre}' ({capacidad}) menor que los fragmentos ({fragmentos}): "
+                           f"cada fragmento recibe 1 (total efectivo {fragmentos})")
+            partes = [1] * fragmentos
+        for fragmento, parte in zip(por_fragmento, partes):
+            fragmento[nombre] = parte
+    return por_fragmento
+
+
+def fusionar_recursos(resumenes):
+    """
+    Combina los resúmenes de recursos de varios fragmentos (ver RegistroRecursos.resumen).
+
+    Capacidades, colas y asignaciones se suman; la espera media se pondera por
+    asignaciones y la utilización por capacidad. max_esperando es el mayor pico
+    de un fragmento: los picos de cada uno ocurren en momentos distintos, así que
+    sumarlos exageraría la cola máxima.
+    """
+    fusion = {}
+    for resumen in resumenes:
+        for nombre, datos in resumen.items():
+            total = fusion.setdefault(nombre, {'capacidad': 0, 'en_uso': 0, 'esperando': 0, 'max_esperando': 0,
+                                               'asignaciones': 0, 'asignaciones_con_espera': 0,
+                                               'espera_media': 0.0, 'utilizacion': 0.0})
+            for clave in ('capacidad', 'en_uso', 'esperando', 'asignaciones', 'asignaciones_con_espera'):
+                total[clave] += datos[clave]
+            total['max_esperando'] = max(total['max_esperando'], datos['max_esperando'])
+            total['espera_media'] += datos['espera_media'] * datos['asignaciones']
+            total['utilizacion'] += datos['utilizacion'] * datos['capacidad']
+    for total in fusion.values():
+        total['espera_media'] = total['espera_media'] / total['asignaciones'] if total['asignaciones'] else 0.0
+        total['utilizacion'] = total['utilizacion'] / total['capacidad'] if total['capacidad'] else 0.0
+    return fusion
+
+
+def _ruta_fragmento(ruta, indice):
+    """traza.json -> traza.f0.json"""
+    if ruta is None:
+        return None
+    base, extension = os.path.splitext(ruta)
+    return f"{base}.f{indice}{extension}"
+
+
+def _ejecutar_fragmento(indice, num_pacientes, primer_id, fragmentos, capacidades, cambios_capacidad,
+                        semilla, tiempo_virtual, nivel_log, opciones):
+    """Corre en un proceso aparte: una simulación completa (su propio event loop) sobre un rango de pacientes."""
+    import main
+    from tiempo_virtual import ejecutar_con_tiempo_virtual
+    if not logging.getLogger().handlers:
+        configurar_logging(nivel_log, en_cola=False) # Proceso creado con spawn: sin logging heredado
+    if semilla is not None:
+        random.seed(f"{semilla}-{indice}")
+    opciones = dict(opciones, traza=_ruta_fragmento(opciones.get('traza'), indice),
+                    archivo_metricas=_ruta_fragmento(opciones.get('archivo_metricas'), indice),
+                    punto_control=_ruta_fragmento(opciones.get('punto_control'), indice))
+    if opciones.get('puerto_metricas'):
+        opciones['puerto_metricas'] += indice # Un puerto por fragmento
+    corrutina = main.main(num_pacientes, capacidades=capacidades, cambios_capacidad=cambios_capacidad,
+                          primer_id=primer_id, factor_intervalo=fragmentos, fragmento=indice,
+                          fragmentos=fragmentos, reporte=False, **opciones)
+    resultado = ejecutar_con_tiempo_virtual(corrutina) if tiempo_virtual else asyncio.run(corrutina)
+    resultado['fragmento'] = indice
+    resultado['pacientes'] = resultado['resumen']['completados']
+    return resultado
+
+
+def simular_distribuida(num_pacientes, fragmentos=None, capacidades=None, cambios_capacidad=None,
+                        semilla=None, tiempo_virtual=False, nivel_log="INFO", reporte=True, **opciones):
+    """
+    Reparte los pacientes entre varios procesos, cada uno con su event loop y su parte de la capacidad.
+
+    Las llegadas de cada fragmento se espacian `fragmentos` veces, así que el hospital
+    completo recibe la misma tasa de llegadas que una corrida de un solo proceso; con
+    archivo_llegadas, el fragmento i reproduce las filas i, i + N, i + 2N... de la traza.
+    Al terminar se fusionan estadísticas, recursos, histogramas de latencia y
+    predicciones por versión en un solo reporte.
+
+    Args:
+        num_pacientes: Pacientes en total (None con archivo_llegadas = toda la traza)
+        fragmentos: Procesos (por defecto, uno por CPU)
+        capacidades: Capacidad total de cada recurso (se reparte con repartir_capacidades)
+        cambios_capacidad: Lista de (recurso, capacidad total, segundos); también se reparte
+        semilla: Semilla base; cada fragmento usa una derivada
+        tiempo_virtual: Cada fragmento corre sobre un BucleTiempoVirtual
+        nivel_log: Nivel de logging de los fragmentos creados con spawn
+        reporte: Si es True, imprime las tablas fusionadas
+        **opciones: Demás argumentos de main.main (modo_inferencia, ejecutor, traza, ...); con
+                    traza, archivo_metricas o punto_control, cada fragmento escribe su propio archivo
+                    (traza.f0.json, ...)
+                    y con puerto_metricas el fragmento i escucha en puerto + i
+    Returns:
+        Diccionario como el de main.main, con los valores fusionados y 'fragmentos' (resultado de cada uno)
+    """
+    fragmentos = max(1, fragmentos or os.cpu_count() or 1)
+    if num_pacientes is not None:
+        fragmentos = min(fragmentos, num_pacientes or 1)
+    capacidades_fragmento = repartir_capacidades(capacidades or CAPACIDADES_DEFECTO, fragmentos)
+    cambios_fragmento = [[] for _ in range(fragmentos)]
+    for recurso, capacidad, instante in cambios_capacidad or []:
+        for cambios, parte in zip(cambios_fragmento, repartir(capacidad, fragmentos)):
+            cambios.append((recurso, max(parte, 1 if capacidad else 0), instante))
+    if opciones.get('ejecutor', 'procesos') == 'procesos' and not opciones.get('trabajadores'):
+        # Sin esto cada fragmento abriría un proceso de inferencia por CPU
+        opciones['trabajadores'] = max(1, (os.cpu_count() or 1) // fragmentos)
+
+    if num_pacientes is None:
+        pacientes, primeros = [None] * fragmentos, [1] * fragmentos
+    else:
+        pacientes = repartir(num_pacientes, fragmentos)
+        primeros = [1 + sum(pacientes[:i]) for i in range(fragmentos)]
+    logger.info(f"Simulación distribuida: {num_pacientes or 'todos los'} pacientes en {fragmentos} fragmentos")
+    inicio = time.time()
+    with ProcessPoolExecutor(max_workers=fragmentos) as executor:
+        futuros = [executor.submit(_ejecutar_fragmento, i, pacientes[i], primeros[i], fragmentos,
+                                   capacidades_fragmento[i], cambios_fragmento[i], semilla, tiempo_virtual,
+                                   nivel_log, opciones)
+                   for i in range(fragmentos)]
+        resultados = [futuro.result() for futuro in futuros]
+    tiempo_total = time.time() - inicio
+    num_pacientes = sum(resultado['pacientes'] for resultado in resultados)
+
+    estadisticas = Estadisticas()
+    histogramas = LatenciasPorEtapa()
+    predicciones = Counter()
+    resumen = {'completados': 0, 'excepciones': 0, 'max_en_vuelo': 0, 'estados_finales': Counter()}
+    for resultado in resultados:
+        estadisticas.fusionar(resultado['estadisticas'])
+        histogramas.combinar(resultado['histogramas'])
+        predicciones.update(resultado['predicciones_por_version'])
+        for clave in ('completados', 'excepciones', 'max_en_vuelo'):
+            resumen[clave] += resultado['resumen'][clave]
+        resumen['estados_finales'].update(resultado['resumen']['estados_finales'])
+    recursos = fusionar_recursos([resultado['recursos'] for resultado in resultados])
+    cuello = max(recursos, key=lambda n: (recursos[n]['utilizacion'], recursos[n]['espera_media'])) if recursos else None
+    tiempo_simulado = max(resultado['tiempo_simulado'] for resultado in resultados)
+
+    if reporte:
+        vaciar_logs()
+        mostrar_estadisticas(estadisticas.instantanea())
+        mostrar_utilizacion(recursos, cuello)
+        mostrar_latencias(histogramas.resumen())
+        for resultado in resultados:
+            logger.info(f"Fragmento {resultado['fragmento']}: {resultado['pacientes']} pacientes en "
+                        f"{resultado['tiempo_real']:.2f} s")
+        logger.info(f"⏱️ Tiempo total del proceso: {tiempo_total:.2f} segundos ({fragmentos} fragmentos, "
+                    f"{num_pacientes / tiempo_total:.0f} pacientes/s)")
+        if abs(tiempo_simulado - tiempo_total) > 1:
+            logger.info(f"⏱️ Tiempo simulado: {tiempo_simulado:.2f} segundos")
+    return {'tiempo_real': tiempo_total, 'tiempo_simulado': tiempo_simulado, 'resumen': resumen,
+            'latencias': histogramas.resumen(), 'predicciones_por_version': dict(predicciones),
+            'estadisticas': estadisticas.instantanea(), 'recursos': recursos, 'histogramas': histogramas,
+            'fragmentos': resultados}
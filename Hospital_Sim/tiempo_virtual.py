@@ -0,0 +1,107 @@
+import asyncio
+import selectors
+
+# Espera real máxima mientras hay trabajo real pendiente (executor, hilos)
+ESPERA_REAL_MAXIMA = 1.0
+
+
+class _SelectorVirtual(selectors.BaseSelector):
+    """
+    Selector que, en lugar de bloquear hasta el siguiente temporizador, adelanta
+    el reloj virtual del bucle. Solo bloquea de verdad cuando hay trabajo real
+    pendiente (por ejemplo, una llamada en el executor) o no quedan temporizadores.
+    """
+
+    def __init__(self, bucle):
+        self._bucle = bucle
+        self._real = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self._real.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._real.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._real.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self._real.get_map()
+
+    def close(self):
+        self._real.close()
+
+    def select(self, timeout=None):
+        # Solo el self-pipe del bucle registrado y sin trabajo real: no hace falta consultar al SO
+        solo_reloj = not self._bucle.trabajos_reales_pendientes and len(self._real.get_map()) <= 1
+        if timeout is not None and solo_reloj:
+            if timeout > 0:
+                self._bucle.avanzar(timeout)
+            return []
+
+        eventos = self._real.select(0)
+        if eventos or (timeout is not None and timeout <= 0):
+            return eventos
+        if timeout is None or self._bucle.trabajos_reales_pendientes:
+            # El trabajo real (CPU en executor, E/S en hilos) no consume tiempo simulado
+            return self._real.select(ESPERA_REAL_MAXIMA if timeout is not None else None)
+        self._bucle.avanzar(timeout)
+        return []
+
+
+class BucleTiempoVirtual(asyncio.SelectorEventLoop):
+    """
+    Event loop de simulación de eventos discretos.
+
+    loop.time() devuelve un reloj virtual que salta directamente al siguiente
+    temporizador cuando no hay nada listo para ejecutarse, de modo que
+    asyncio.sleep(5) termina de inmediato pero avanza 5 segundos simulados.
+    Las corrutinas de las etapas no necesitan cambios.
+    """
+
+    def __init__(self, inicio=0.0):
+        self._ahora = float(inicio)
+        self.trabajos_reales_pendientes = 0
+        super().__init__(selector=_SelectorVirtual(self))
+
+    def time(self):
+        return self._ahora
+
+    def avanzar(self, segundos):
+        self._ahora += segundos
+
+    def registrar_trabajo_real(self, futuro):
+        """Marca un future resuelto desde otro hilo/proceso para no adelantar el reloj mientras está pendiente."""
+        self.trabajos_reales_pendientes += 1
+        futuro.add_done_callback(self._trabajo_real_terminado)
+        return futuro
+
+    def _trabajo_real_terminado(self, _futuro):
+        self.trabajos_reales_pendientes -= 1
+
+    def run_in_executor(self, executor, func, *args):
+        return self.registrar_trabajo_real(super().run_in_executor(executor, func, *args))
+
+
+def _cancelar_tareas(bucle):
+    pendientes = [tarea for tarea in asyncio.all_tasks(bucle) if not tarea.done()]
+    for tarea in pendientes:
+        tarea.cancel()
+    if pendientes:
+        bucle.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+
+
+def ejecutar_con_tiempo_virtual(corrutina, inicio=0.0):
+    """Equivalente a asyncio.run(corrutina) usando un BucleTiempoVirtual."""
+    bucle = BucleTiempoVirtual(inicio)
+    try:
+        asyncio.set_event_loop(bucle)
+        return bucle.run_until_complete(corrutina)
+    finally:
+        try:
+            _cancelar_tareas(bucle)
+            bucle.run_until_complete(bucle.shutdown_asyncgens())
+            bucle.run_until_complete(bucle.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            bucle.close()
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from collections import deque
+
+# Spans retenidos en memoria; al llenarse se descartan los más antiguos
+CAPACIDAD_TRAZA_DEFECTO = 100_000
+FORMATOS_TRAZA = ("chrome", "otlp")
+SERVICIO = "hospital_sim"
+
+
+def _medir(func, *args):
+    """Corre en el trabajador: retorna el resultado y los instantes (monotónicos) de inicio y fin del cómputo."""
+    inicio = time.monotonic()
+    resultado = func(*args)
+    return resultado, inicio, time.monotonic()
+
+
+class Trazador:
+    """
+    Registro de spans por etapa en un buffer circular.
+
+    Cada span es una tupla (nombre, paciente_id, inicio, duracion, atributos) con
+    tiempos en segundos del reloj configurado (loop.time(): monotónico en ejecución
+    real, virtual con --tiempo-virtual). Desactivado, `registrar` retorna de
+    inmediato y `ejecutar_en` delega directamente en run_in_executor.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_TRAZA_DEFECTO):
+        self.activo = False
+        self.reloj = time.monotonic
+        self.spans = deque(maxlen=capacidad)
+        self.total = 0
+        self._origen_epoch = time.time() - self.reloj()
+
+    def configurar(self, activo, capacidad=CAPACIDAD_TRAZA_DEFECTO, reloj=time.monotonic):
+        """Activa o desactiva las trazas para una corrida y vacía el buffer."""
+        self.activo = activo
+        self.reloj = reloj
+        self.spans = deque(maxlen=capacidad)
+        self.total = 0
+        self._origen_epoch = time.time() - reloj()
+
+    @property
+    def descartados(self):
+        return self.total - len(self.spans)
+
+    def registrar(self, nombre, paciente_id, inicio, duracion, atributos=None):
+        """Agrega un span terminado (no hace nada si las trazas están desactivadas)."""
+        if not self.activo:
+            return
+        self.spans.append((nombre, paciente_id, inicio, duracion, atributos))
+        self.total += 1
+
+    async def ejecutar_en(self, loop, executor, nombre, paciente_id, func, *args, atributos=None):
+        """
+        run_in_executor que, con trazas activas, separa la espera en cola del cómputo.
+
+        El trabajador mide el cómputo con time.monotonic (reloj común a todos los
+        procesos en el mismo equipo); los spans `<nombre>.cola`, `<nombre>.computo`
+        y `<nombre>.retorno` se ubican a partir del instante de envío.
+        """
+        if not self.activo:
+            return await loop.run_in_executor(executor, func, *args)
+        base = self.reloj()
+        enviado = time.monotonic()
+        resultado, inicio, fin = await loop.run_in_executor(executor, _medir, func, *args)
+        recibido = time.monotonic()
+        self.registrar(f"{nombre}.cola", paciente_id, base, inicio - enviado, atributos)
+        self.registrar(f"{nombre}.computo", paciente_id, base + (inicio - enviado), fin - inicio, atributos)
+        self.registrar(f"{nombre}.retorno", paciente_id, base + (fin - enviado), recibido - fin, atributos)
+        return resultado
+
+    def a_chrome(self):
+        """Trace-event JSON (chrome://tracing, Perfetto): un carril por paciente, el carril 0 para lotes."""
+        eventos = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': SERVICIO}}]
+        for nombre, paciente_id, inicio, duracion, atributos in self.spans:
+            evento = {'name': nombre, 'cat': nombre.split('.')[0], 'ph': 'X', 'pid': os.getpid(),
+                      'tid': paciente_id or 0, 'ts': inicio * 1e6, 'dur': duracion * 1e6}
+            if atributos:
+                evento['args'] = atributos
+            eventos.append(evento)
+        return {'traceEvents': eventos, 'displayTimeUnit': 'ms',
+                'otherData': {'spans_descartados': self.descartados}}
+
+    def a_otlp(self):
+        """JSON compatible con OTLP/HTTP (ExportTraceServiceRequest): una traza por paciente (la 1 agrupa los lotes)."""
+        spans = []
+        for indice, (nombre, paciente_id, inicio, duracion, atributos) in enumerate(self.spans, start=1):
+            inicio_ns = int((inicio + self._origen_epoch) * 1e9)
+            claves = dict(atributos or {})
+            if paciente_id is not None:
+                claves['paciente.id'] = paciente_id
+            spans.append({
+                'traceId': f"{(paciente_id or 0) + 1:032x}",
+                'spanId': f"{indice:016x}",
+                'name': nombre,
+                'kind': 1, # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(inicio_ns),
+                'endTimeUnixNano': str(inicio_ns + int(duracion * 1e9)),
+                'attributes': [_atributo_otlp(k, v) for k, v in claves.items()],
+            })
+        return {'resourceSpans': [{
+            'resource': {'attributes': [_atributo_otlp('service.name', SERVICIO)]},
+            'scopeSpans': [{'scope': {'name': f"{SERVICIO}.trazas"}, 'spans': spans}],
+        }]}
+
+    def exportar(self, ruta, formato="chrome"):
+        """
+        Escribe los spans del buffer en un archivo JSON.
+
+        Args:
+            ruta: Archivo de salida
+            formato: 'chrome' (trace-event) u 'otlp'
+        Returns:
+            Número de spans escritos
+        """
+        if formato == "chrome":
+            contenido = self.a_chrome()
+        elif formato == "otlp":
+            contenido = self.a_otlp()
+        else:
+            raise ValueError(f"Formato de traza desconocido: {formato}")
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(contenido, f)
+        return len(self.spans)
+
+
+def _atributo_otlp(clave, valor):
+    if isinstance(valor, bool):
+        return {'key': clave, 'value': {'boolValue': valor}}
+    if isinstance(valor, int):
+        return {'key': clave, 'value': {'intValue': str(valor)}}
+    if isinstance(valor, float):
+        return {'key': clave, 'value': {'doubleValue': valor}}
+    return {'key': clave, 'value': {'stringValue': str(valor)}}
+
+
+# Trazador de la corrida en curso (se reconfigura en main.main, nunca se reemplaza)
+trazador = Trazador()
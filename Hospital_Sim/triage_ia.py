@@ -1,33 +1,56 @@
 
-import joblib
-from sklearn.tree import DecisionTreeClassifier
 import logging # Importar logging
+from paciente import vector_sintomas
+from modelos import cargar_arbol, directorio_modelos, modo_mmap
 
 # Configurar un logger
 logger = logging.getLogger(__name__)
 
-# Cargar modelo pre-entrenado
-try:
-    modelo_triage = joblib.load("modelo_triage.pkl")
-    label_prioridad = joblib.load("label_prioridad.pkl")
-    logger.info("Modelos de triage cargados exitosamente.")
-except FileNotFoundError:
-    logger.critical("Modelos de triage no encontrados. Ejecute modelo_entrenamiento.py primero.", exc_info=True)
-    raise ImportError("Modelos de triage no encontrados. Ejecute modelo_entrenamiento.py primero")
-except Exception as e:
-    logger.critical(f"Error al cargar modelos de triage: {type(e).__name__} - {str(e)}", exc_info=True)
-    raise # Re-lanzar la excepción
-
-
-def clasificar_prioridad(sintomas_dict):
-    sintomas = [
-        sintomas_dict.get("fiebre", 0),
-        sintomas_dict.get("tos", 0),
-        sintomas_dict.get("dolor", 0),
-        sintomas_dict.get("fatiga", 0),
-        sintomas_dict.get("respirar", 0),
-    ]
+arbol_triage = None # ArbolPlano que sirve todas las predicciones
+_origen_modelos = None # (directorio, mmap_mode) de los modelos cargados
 
+
+def cargar_modelos(forzar=False):
+    """
+    Carga el modelo de triage desde el directorio configurado en modelos.py
+    (ver modelos.cargar_arbol).
+    No hace nada si ya están cargados desde el mismo origen, salvo con forzar=True.
+    """
+    global arbol_triage, _origen_modelos
+    origen = (directorio_modelos(), modo_mmap())
+    if not forzar and _origen_modelos == origen:
+        return
+    arbol_triage = cargar_arbol("triage")
+    _origen_modelos = origen
+
+
+def obtener_modelos():
+    """
+    Accesor perezoso del árbol de triage (ArbolPlano).
+    La carga ocurre en la primera inferencia, no al importar el módulo.
+    """
+    if arbol_triage is None:
+        cargar_modelos()
+    return arbol_triage
+
+
+def _arbol(modelos):
+    return modelos.triage if modelos is not None else obtener_modelos()
+
+
+def clasificar_prioridad(sintomas_dict, modelos=None):
     # No loguear el triaje aquí, se hará en main.py después de obtener el resultado.
-    pred = modelo_triage.predict([sintomas])[0]
-    return label_prioridad.inverse_transform([pred])[0]
\ No newline at end of file
+    return _arbol(modelos).predecir_fila(vector_sintomas(sintomas_dict))
+
+
+def clasificar_prioridad_lote(matriz, modelos=None):
+    """
+    Clasifica la prioridad de varios pacientes con una sola pasada vectorizada por el árbol.
+
+    Args:
+        matriz: Arreglo (n, 5) con los síntomas en el orden de COLUMNAS_SINTOMAS
+        modelos: ModelosCargados de una versión (None = los del directorio configurado)
+    Returns:
+        Lista con la prioridad de cada fila
+    """
+    return _arbol(modelos).predecir_lote(matriz).tolist()
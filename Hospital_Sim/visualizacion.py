@@ -124,4 +124,51 @@ def mostrar_estadisticas(estadisticas):
     print(f"│ {'Errores durante seguimiento:':<30} {estadisticas.get('error_seguimiento', 0):>25} │")
     total_errores_cancelaciones = sum(v for k, v in estadisticas.items() if k.startswith(('error_', 'flujo_cancelado', 'registro_cancelado', 'cama_cancelada', 'seguimiento_cancelado')))
     print(f"│ {'Pacientes con errores/cancelados:':<30} {total_errores_cancelaciones:>25} │")
-    print("="*60)
\ No newline at end of file
+    print("="*60)
+
+
+def mostrar_utilizacion(resumen, cuello_de_botella=None):
+    """Muestra la utilización de cada recurso (ver asignacion_recursos.RegistroRecursos.resumen)."""
+    print("\n" + "="*60)
+    print("UTILIZACIÓN DE RECURSOS".center(60))
+    print("="*60)
+    print(f"│ {'Recurso':<12} {'Cap.':>5} {'Asign.':>8} {'Util.':>7} {'Espera med.':>12} {'Cola máx.':>9} │")
+    for nombre, datos in resumen.items():
+        marca = " ◀" if nombre == cuello_de_botella else "  "
+        print(f"│ {nombre:<12} {datos['capacidad']:>5} {datos['asignaciones']:>8} {datos['utilizacion']:>7.1%} "
+              f"{datos['espera_media']:>11.1f}s {datos['max_esperando']:>9} │{marca}")
+    if cuello_de_botella:
+        print(f"│ {'Cuello de botella:':<30} {cuello_de_botella:>25} │")
+    print("="*60)
+
+
+def mostrar_latencias(resumen):
+    """Muestra la latencia por etapa (ver metricas.LatenciasPorEtapa.resumen)."""
+    print("\n" + "="*60)
+    print("LATENCIA POR ETAPA (segundos)".center(60))
+    print("="*60)
+    print(f"│ {'Etapa':<12} {'N':>7} {'Media':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'Máx.':>7} │")
+    for etapa, datos in resumen.items():
+        if not datos['total']:
+            continue
+        print(f"│ {etapa:<12} {datos['total']:>7} {datos['promedio']:>7.2f} {datos['p50']:>7.2f} "
+              f"{datos['p95']:>7.2f} {datos['p99']:>7.2f} {datos['max']:>7.2f} │")
+    print("="*60)
+
+
+def mostrar_barrido(filas, etiquetas, confianza=0.95):
+    """Muestra la media ± semiancho del intervalo de confianza de cada configuración (ver barrido.barrer)."""
+    ancho = max([28] + [len(etiqueta) for etiqueta in etiquetas])
+    total = ancho + 70
+    print("\n" + "="*total)
+    print(f"BARRIDO DE CAPACIDAD (media ± IC {confianza:.0%})".center(total))
+    print("="*total)
+    print(f"│ {'Configuración':<{ancho}} {'N':>4} {'Espera cama (s)':>17} {'p95 espera (s)':>17} "
+          f"{'Util. camas':>13} {'Altas/h':>13} │")
+    for etiqueta, fila in zip(etiquetas, filas):
+        print(f"│ {etiqueta:<{ancho}} {fila['replicas']:>4} "
+              f"{fila['espera_cama']:>8.1f} ± {fila['espera_cama_ic']:<6.1f} "
+              f"{fila['espera_cama_p95']:>8.1f} ± {fila['espera_cama_p95_ic']:<6.1f} "
+              f"{fila['utilizacion_camas']:>6.1%} ± {fila['utilizacion_camas_ic']:<4.1%} "
+              f"{fila['altas_hora']:>6.0f} ± {fila['altas_hora_ic']:<4.0f} │")
+    print("="*total)